@@ -0,0 +1,124 @@
+"""
+Aggregates precomputed over the catalog held by `MovieStore`.
+
+They turn the counting endpoints into array lookups: nothing is parsed or
+filtered per request.
+"""
+import calendar
+
+import numpy as np
+import pandas as pd
+
+
+class ReleaseCube:
+    """
+    Release counts by day of month, month, year, year-month and weekday.
+
+    Release dates are parsed once into integer year/month/day/weekday arrays
+    (0, or -1 for the weekday, where the date is missing or invalid) and every
+    histogram is counted from them with `np.bincount` at load time.
+
+    Attributes:
+        years (np.ndarray): The release year of every row.
+        months (np.ndarray): The release month (1-12) of every row.
+        days (np.ndarray): The release day of the month (1-31) of every row.
+        weekdays (np.ndarray): The release weekday (0 = Monday) of every row.
+        day_counts (np.ndarray): Releases per day of the month, indexed 0-31 (index 0 unused).
+        month_counts (np.ndarray): Releases per month, indexed 0-12 (index 0 unused).
+        weekday_counts (np.ndarray): Releases per weekday, indexed 0-6.
+        first_year (int): The earliest release year, 0 if no date is known.
+        year_counts (np.ndarray): Releases per year, index 0 being `first_year`.
+        year_month_counts (np.ndarray): Releases per year and month, shape (years, 12).
+    """
+
+    def __init__(self, release_dates):
+        """
+        Builds the cube.
+
+        Args:
+            release_dates (sequence of str): The release date of every catalog row.
+        """
+        dates = pd.to_datetime(pd.Series(release_dates), errors='coerce')
+        known = dates.notna().to_numpy()
+
+        # Parse the dates once into integer component arrays
+        self.years = dates.dt.year.fillna(0).to_numpy(dtype=np.int32)
+        self.months = dates.dt.month.fillna(0).to_numpy(dtype=np.int32)
+        self.days = dates.dt.day.fillna(0).to_numpy(dtype=np.int32)
+        self.weekdays = dates.dt.weekday.fillna(-1).to_numpy(dtype=np.int32)
+
+        # One-dimensional histograms
+        self.day_counts = np.bincount(self.days[known], minlength=32)
+        self.month_counts = np.bincount(self.months[known], minlength=13)
+        self.weekday_counts = np.bincount(self.weekdays[known], minlength=7)
+
+        # Per-year and per-year-month histograms, offset by the earliest year
+        years = self.years[known]
+        self.first_year = int(years.min()) if len(years) else 0
+        span = int(years.max()) - self.first_year + 1 if len(years) else 0
+        self.year_counts = np.bincount(years - self.first_year, minlength=span)
+        cells = (years - self.first_year) * 12 + self.months[known] - 1
+        self.year_month_counts = np.bincount(cells, minlength=span * 12).reshape(span, 12)
+
+    @property
+    def last_year(self) -> int:
+        """The latest release year."""
+        return self.first_year + len(self.year_counts) - 1
+
+    def per_day(self, day: int) -> int:
+        """Returns the number of movies released on the given day of any month."""
+        return int(self.day_counts[day]) if 1 <= day <= 31 else 0
+
+    def per_month(self, month: int) -> int:
+        """Returns the number of movies released in the given month of any year."""
+        return int(self.month_counts[month]) if 1 <= month <= 12 else 0
+
+    def per_year(self, year: int) -> int:
+        """Returns the number of movies released in the given year."""
+        offset = year - self.first_year
+        return int(self.year_counts[offset]) if 0 <= offset < len(self.year_counts) else 0
+
+    def _year_range(self, start: int = None, end: int = None) -> range:
+        # Clip the requested years to the ones the cube holds
+        start = self.first_year if start is None else max(start, self.first_year)
+        end = self.last_year if end is None else min(end, self.last_year)
+        return range(start, end + 1)
+
+    def year_histogram(self, start: int = None, end: int = None) -> dict:
+        """
+        Returns the releases per year over an inclusive range of years.
+
+        Args:
+            start (int): The first year, defaults to the earliest release.
+            end (int): The last year, defaults to the latest release.
+
+        Returns:
+            dict: Year (as a string) to release count.
+        """
+        years = self._year_range(start, end)
+        counts = self.year_counts[years.start - self.first_year:years.stop - self.first_year]
+        return dict(zip(map(str, years), counts.tolist()))
+
+    def year_month_histogram(self, start: int = None, end: int = None) -> dict:
+        """
+        Returns the releases per month of every year over an inclusive range of years.
+
+        Args:
+            start (int): The first year, defaults to the earliest release.
+            end (int): The last year, defaults to the latest release.
+
+        Returns:
+            dict: Year (as a string) to a list of 12 monthly release counts.
+        """
+        years = self._year_range(start, end)
+        counts = self.year_month_counts[years.start - self.first_year:years.stop - self.first_year]
+        return dict(zip(map(str, years), counts.tolist()))
+
+    def weekday_histogram(self) -> dict:
+        """
+        Returns the releases per weekday.
+
+        Returns:
+            dict: Weekday name to release count, Monday first.
+        """
+        return dict(zip(calendar.day_name, self.weekday_counts.tolist()))
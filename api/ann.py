@@ -0,0 +1,129 @@
+"""
+Approximate nearest neighbor search for the recommender.
+
+Movies are embedded as dense, L2-normalized vectors by a TruncatedSVD of the
+TF-IDF matrix, then hashed with random-projection LSH: every table assigns a
+movie the sign pattern of its projections on `bits` random hyperplanes. A query
+only compares itself with the movies sharing a bucket with it in some table, so
+its cost depends on the bucket sizes rather than on the catalog size.
+
+Two knobs trade recall for latency:
+
+    tables   more tables give every neighbor more chances to share a bucket
+    probes   per table, also visit the buckets that differ in the `probes` bits
+             the query is least sure about (multi-probe LSH)
+"""
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+
+
+def fit_embeddings(matrix, components: int = 128, seed: int = 0):
+    """
+    Reduces the TF-IDF matrix to dense embeddings.
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): The TF-IDF matrix.
+        components (int): The embedding dimension.
+        seed (int): Random seed of the SVD solver.
+
+    Returns:
+        tuple: The L2-normalized embeddings (float32, shape (n, components)) and the
+            SVD components (float32, shape (components, vocabulary size)), which map
+            new TF-IDF rows into the same space.
+    """
+    components = min(components, min(matrix.shape) - 1)
+    svd = TruncatedSVD(n_components=components, random_state=seed)
+    embeddings = svd.fit_transform(matrix).astype(np.float32)
+    return normalize_rows(embeddings), svd.components_.astype(np.float32)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scales every row to unit length, leaving all-zero rows untouched.
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class LSHIndex:
+    """
+    Random-projection LSH index over unit vectors, queried by cosine similarity.
+    """
+
+    def __init__(self, vectors: np.ndarray, tables: int = 8, bits: int = 12, probes: int = 0, seed: int = 0):
+        """
+        Builds the index.
+
+        Args:
+            vectors (np.ndarray): The L2-normalized embeddings, one row per movie, in float32 or float16.
+            tables (int): The number of hash tables.
+            bits (int): The number of hyperplanes, i.e. code bits, per table.
+            probes (int): The default number of extra buckets visited per table.
+            seed (int): Random seed of the hyperplanes.
+        """
+        rng = np.random.default_rng(seed)
+        self.vectors = vectors
+        self.tables = tables
+        self.bits = bits
+        self.probes = probes
+        self._planes = rng.standard_normal((tables, vectors.shape[1], bits)).astype(np.float32)
+        self._powers = np.left_shift(1, np.arange(bits, dtype=np.int64))
+
+        # Per table, the movies sorted by bucket code, so a bucket is a searchsorted range
+        self._orders = []
+        self._codes = []
+        for table in range(tables):
+            codes = (vectors @ self._planes[table] > 0) @ self._powers
+            order = np.argsort(codes, kind='stable')
+            self._orders.append(order.astype(np.int32))
+            self._codes.append(codes[order])
+
+    def candidates(self, query: np.ndarray, probes: int = None) -> np.ndarray:
+        """
+        Returns the movies sharing a probed bucket with the query in any table.
+
+        Args:
+            query (np.ndarray): A unit vector.
+            probes (int): Extra buckets per table; defaults to the index setting.
+
+        Returns:
+            np.ndarray: Sorted, unique candidate positions.
+        """
+        probes = self.probes if probes is None else min(probes, self.bits)
+        found = []
+        for table in range(self.tables):
+            projections = query @ self._planes[table]
+            code = int((projections > 0) @ self._powers)
+
+            # Besides the query's own bucket, flip the bits closest to the hyperplanes
+            flips = np.argsort(np.abs(projections))[:probes]
+            keys = np.concatenate(([code], code ^ self._powers[flips]))
+
+            starts = np.searchsorted(self._codes[table], keys, side='left')
+            stops = np.searchsorted(self._codes[table], keys, side='right')
+            found.extend(self._orders[table][start:stop] for start, stop in zip(starts, stops))
+        return np.unique(np.concatenate(found))
+
+    def query(self, query: np.ndarray, k: int, exclude: int = None, probes: int = None):
+        """
+        Returns the approximate k most similar movies to the query.
+
+        Args:
+            query (np.ndarray): A unit vector.
+            k (int): The number of neighbors.
+            exclude (int): A position never returned, typically the query movie itself.
+            probes (int): Extra buckets per table; defaults to the index setting.
+
+        Returns:
+            tuple: Neighbor positions and cosine similarities, best first. Fewer than k
+                are returned when the probed buckets hold fewer candidates.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        candidates = self.candidates(query, probes)
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+
+        # Rank the candidates exactly on the embeddings, in single precision (NumPy has no fast half-precision product)
+        similarities = self.vectors[candidates].astype(np.float32) @ query
+        best = np.argsort(-similarities, kind='stable')[:k]
+        return candidates[best], similarities[best]
@@ -1,6 +1,5 @@
 import sys
 import os
-import json
 from fastapi import FastAPI, Response, APIRouter
 
 # Get the path of the main directory
@@ -11,10 +10,142 @@ sys.path.append(BASE_DIR)
 
 # Import the FastAPI framework and other necessary modules
 from fastapi import FastAPI
-from api.routes import get_actor, get_director, shoots_per_day, shoots_per_month, title_score, title_votes, movies_by_genre, recommendations, get_movie, recommendations2
+from fastapi.middleware.gzip import GZipMiddleware
+from api import config
+from api.executor import Overloaded, get_executor
+from api.cache import ResponseCache, SQLiteBackend, etag_matches
+from api.responses import JSONResponse, prettify
+from api.store import get_store
+from api.indexes import TitleNotFound, AmbiguousTitle
+from api.serializers import UnknownField
+
+# Load the movie catalog once for the whole process; every router reads from this shared store
+get_store()
+
+from api.routes import get_actor, get_director, shoots_per_day, shoots_per_month, shoots_per_year, shoots_histogram, title_score, title_votes, movies_by_genre, recommendations, get_movie, search
 
 app = FastAPI()
 
+# Headers every rebuilt response computes again rather than copies
+REBUILT_HEADERS = ("content-length", "content-type", "etag")
+
+async def read_body(response) -> bytes:
+    # Drain the streamed body of a response returned by call_next
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+def buffered_response(body: bytes, status_code: int, media_type: str = None, headers=()) -> Response:
+    """
+    Builds a response whose body is sent in one message.
+
+    Responses returned by `call_next` are streamed, and the compression middleware compresses
+    streamed bodies whatever their size; a buffered body lets it honour COMPRESSION_MIN_SIZE.
+
+    Args:
+        body (bytes): The response body.
+        status_code (int): The response status.
+        media_type (str): The content type, if any.
+        headers (iterable of tuple): Further (name, value) pairs; Content-Length is recomputed.
+
+    Returns:
+        Response: The response.
+    """
+    response = Response(content=body, status_code=status_code, media_type=media_type)
+    response.raw_headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers
+        if name.lower() != "content-length"
+    ]
+    return response
+
+def route_headers(response) -> list:
+    # The headers a route set, without those describing the body
+    return [(name, value) for name, value in response.headers.items() if name.lower() not in REBUILT_HEADERS]
+
+@app.middleware("http")
+async def pretty_responses(request, call_next):
+    # Bodies are compact by default; ?pretty=1 re-indents them for human readers
+    response = await call_next(request)
+    if request.query_params.get("pretty") not in ("1", "true") or response.headers.get("content-type") != "application/json":
+        return response
+    body = prettify(b"".join([chunk async for chunk in response.body_iterator]))
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content=body, status_code=response.status_code, headers=headers, media_type="application/json")
+
+# Version of the data the responses are computed from. build_neighbors.py and update_model.py republish
+# the model under the same catalog version, so the model generation this process serves (and the backend
+# answering deep queries) is part of it; otherwise the shared cache would outlive a rebuild until its TTL
+DATA_VERSION = f"{get_store().version}:{os.path.basename(recommendations.model.generation)}:{config.RECOMMENDER_BACKEND}"
+
+# Cache of the GET responses, keyed by path, query and data version
+cache = None
+if config.CACHE_MAX_BYTES > 0:
+    cache = ResponseCache(
+        config.CACHE_MAX_BYTES,
+        config.CACHE_TTL,
+        SQLiteBackend(config.CACHE_PATH, config.CACHE_BACKEND_MAX_ROWS, config.CACHE_PURGE_EVERY) if config.CACHE_BACKEND == 'sqlite' else None,
+    )
+
+@app.middleware("http")
+async def cache_responses(request, call_next):
+    # This middleware runs right under the compression one, so every response leaves it buffered
+
+    # Only successful GET responses of the data routes are cached
+    if cache is None or request.method != "GET" or request.url.path.startswith(("/api/v1/cache", "/api/v1/executor")):
+        response = await call_next(request)
+        return buffered_response(await read_body(response), response.status_code, headers=response.headers.items())
+
+    key = cache.key(request.url.path, request.url.query, DATA_VERSION)
+    entry = cache.get(key)
+    status = "hit"
+
+    if entry is None:
+        status = "miss"
+        response = await call_next(request)
+        body = await read_body(response)
+        if response.status_code != 200:
+            return buffered_response(body, response.status_code, headers=response.headers.items())
+        entry = cache.put(key, body, response.headers.get("content-type", "application/json"), route_headers(response))
+
+    # Send the route's own headers with the cached body, fresh or not
+    headers = [*entry.headers, ("ETag", entry.etag), ("X-Cache", status)]
+
+    # The client's copy is still current: answer without a body
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return buffered_response(b"", 304, headers=headers)
+
+    return buffered_response(entry.body, 200, entry.media_type, headers)
+
+@app.get("/api/v1/cache/stats")
+def cache_stats():
+    # Expose the hit/miss counters of the response cache
+    data = cache.stats() if cache is not None else {"enabled": False}
+    return JSONResponse(data)
+
+@app.get("/api/v1/executor/stats")
+def executor_stats():
+    # Expose the load of the executor running the heavy requests
+    return JSONResponse(get_executor().stats())
+
+@app.exception_handler(Overloaded)
+def overloaded(request, exc):
+    # Heavy requests beyond the executor's capacity are shed instead of queued without bound
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(TitleNotFound)
+def title_not_found(request, exc):
+    # Unknown titles are reported as 404 instead of failing with an IndexError
+    return JSONResponse({"detail": str(exc)}, status_code=404)
+
+@app.exception_handler(AmbiguousTitle)
+def ambiguous_title(request, exc):
+    # Duplicate titles return the candidates so the client can retry with ?year=
+    return JSONResponse({"detail": str(exc), "matches": exc.matches}, status_code=300)
+
+@app.exception_handler(UnknownField)
+def unknown_field(request, exc):
+    # Misspelled projections are rejected instead of silently returning fewer fields
+    return JSONResponse({"detail": str(exc), "fields": exc.fields}, status_code=400)
+
 @app.get("/api/v1")
 def read_root():
     data = {
@@ -27,14 +158,15 @@ def read_root():
             "Get a movie": "/api/v1/movie/Star%20Wars",
             "Shoots per month": '/api/v1/shoots_per_month/5',
             "Shoots per day": '/api/v1/shoots_per_day/4',
+            "Shoots per year": '/api/v1/shoots_per_year/1977',
+            "Shoots per year histogram": '/api/v1/shoots_histogram/year?start=1970&end=1980',
+            "Shoots per year and month histogram": '/api/v1/shoots_histogram/year_month?start=1977&end=1977',
+            "Shoots per weekday histogram": '/api/v1/shoots_histogram/weekday',
         }]
     }
     
-    # Convert the data dictionary to a JSON string with proper indentation
-    json_data = json.dumps(data, indent=4)
-    
-    # Create a response object with the JSON data and the appropriate media type
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
 
     # Return the response object
     return response
@@ -43,9 +175,21 @@ app.include_router(get_actor.router)            # /api/v1/actor/Mark%20Hamill
 app.include_router(get_director.router)         # /api/v1/director/George%20Lucas
 app.include_router(shoots_per_day.router)       # /api/v1/shoots_per_day/13
 app.include_router(shoots_per_month.router)     # /api/v1/shoots_per_month/1
+app.include_router(shoots_per_year.router)      # /api/v1/shoots_per_year/1977
+app.include_router(shoots_histogram.router)     # /api/v1/shoots_histogram/year?start=1970&end=1980, /year_month, /weekday
 app.include_router(title_score.router)          # /api/v1/title_score/Star%20Wars
 app.include_router(title_votes.router)          # /api/v1/title_votes/Star%20Wars
 app.include_router(movies_by_genre.router)      # /api/v1/movies_by_genre/Cience%20Fiction
-app.include_router(recommendations.router)      # /api/v1/recommendations/5/Star%20Wars
-app.include_router(recommendations2.router)     # /api/v1/recommendations2/5/Star%20Wars
-app.include_router(get_movie.router)            # /api/v1/movie/Star%20Wars
\ No newline at end of file
+app.include_router(recommendations.router)      # /api/v1/recommendations/5/Star%20Wars, POST /api/v1/recommendations/batch
+app.include_router(get_movie.router)            # /api/v1/movie/Star%20Wars
+app.include_router(search.router)               # /api/v1/search?q=star&kind=title,actor
+
+# Compress large bodies for clients that accept it; added last so it wraps the cache and sees its bodies
+if config.COMPRESSION_MIN_SIZE > 0:
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        app.add_middleware(GZipMiddleware, minimum_size=config.COMPRESSION_MIN_SIZE)
+    else:
+        # BrotliMiddleware falls back to gzip for clients that do not accept br
+        app.add_middleware(BrotliMiddleware, minimum_size=config.COMPRESSION_MIN_SIZE)
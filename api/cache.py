@@ -0,0 +1,278 @@
+"""
+Response cache shared by every GET route of the API.
+
+Responses only change when the cleaning pipeline produces a new catalog or
+republishes the model, so a response is cached under its route, its query
+parameters and the version of that data. Entries live in a bounded in-memory LRU and, optionally, in a SQLite
+file that every uvicorn worker on the host shares. The SQLite file is purged of
+expired entries, which include those of older catalog versions once their TTL
+has passed, and capped in rows, so it does not grow without bound.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CachedResponse:
+    """
+    A cached response body with its weak ETag.
+
+    Attributes:
+        body (bytes): The response body.
+        media_type (str): The response content type.
+        etag (str): The weak ETag, a hash of the body.
+        expires (float): The `time.time()` after which the entry is stale.
+        headers (tuple): The other headers the route set, as (name, value) pairs.
+    """
+    __slots__ = ('body', 'media_type', 'etag', 'expires', 'headers')
+
+    def __init__(self, body: bytes, media_type: str, etag: str, expires: float, headers=()):
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag
+        self.expires = expires
+        self.headers = tuple(headers)
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Returns the weak ETag of a response body.
+
+    The ETag is weak because the compression middleware sends it unchanged with the
+    gzip or br encoding of the body, and a strong ETag must differ per content coding.
+
+    Args:
+        body (bytes): The response body.
+
+    Returns:
+        str: The ETag, e.g. 'W/"abc"'.
+    """
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Checks an `If-None-Match` header against an ETag.
+
+    Args:
+        if_none_match (str): The header value, e.g. '"abc", W/"def"' or '*'.
+        etag (str): The ETag of the current representation.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    # The weak comparison of RFC 9110 applies to If-None-Match
+    return '*' in candidates or etag.removeprefix('W/') in [candidate.removeprefix('W/') for candidate in candidates]
+
+
+class SQLiteBackend:
+    """
+    Cache entries stored in a SQLite file, shared by all worker processes of a host.
+    """
+
+    def __init__(self, path: str, max_rows: int = 100000, purge_every: int = 1000):
+        """
+        Opens (and creates if needed) the cache database, and purges it.
+
+        Args:
+            path (str): Location of the SQLite file.
+            max_rows (int): The number of entries kept; a purge drops those closest to expiry beyond it.
+            purge_every (int): The number of puts between two purges.
+        """
+        self.max_rows = max_rows
+        self.purge_every = purge_every
+        self._puts = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL lets readers in other workers proceed while one worker writes
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, expires REAL, etag TEXT, media_type TEXT, body BLOB)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)')
+            # Files created before the route headers were cached lack their column
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(responses)')]
+            if 'headers' not in columns:
+                self._connection.execute("ALTER TABLE responses ADD COLUMN headers TEXT NOT NULL DEFAULT '[]'")
+
+        # Drop what previous processes left behind, e.g. the entries of an older catalog
+        self.purge()
+
+    def get(self, key: str):
+        """Returns the live entry stored under the key, or None."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT body, media_type, etag, expires, headers FROM responses WHERE key = ? AND expires > ?',
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(*row[:4], headers=[tuple(header) for header in json.loads(row[4])])
+
+    def put(self, key: str, entry: CachedResponse):
+        """Stores an entry under the key, replacing any previous one, and purges every `purge_every` puts."""
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses (key, expires, etag, media_type, body, headers) VALUES (?, ?, ?, ?, ?, ?)',
+                (key, entry.expires, entry.etag, entry.media_type, entry.body, json.dumps(entry.headers)),
+            )
+            self._puts += 1
+            due = self._puts % self.purge_every == 0
+        if due:
+            self.purge()
+
+    def purge(self):
+        """Deletes the expired entries, then the entries closest to expiry beyond `max_rows`."""
+        with self._lock:
+            self._connection.execute('DELETE FROM responses WHERE expires <= ?', (time.time(),))
+            self._connection.execute(
+                'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY expires DESC LIMIT -1 OFFSET ?)',
+                (self.max_rows,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of response bodies, bounded in bytes, with optional shared backend.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, backend: SQLiteBackend = None):
+        """
+        Creates the cache.
+
+        Args:
+            max_bytes (int): The memory budget of the cached bodies.
+            ttl (float): The lifetime of an entry, in seconds.
+            backend (SQLiteBackend): Optional second tier shared between processes.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(path: str, query: str, version: str) -> str:
+        """
+        Builds the cache key of a request.
+
+        Args:
+            path (str): The request path, which identifies the route and its path parameters.
+            query (str): The raw query string.
+            version (str): The version of the data the response is computed from (catalog and model).
+
+        Returns:
+            str: The key.
+        """
+        # Order the query parameters so that equivalent URLs share an entry
+        query = '&'.join(sorted(query.split('&'))) if query else ''
+        return hashlib.sha256(f'{version}\n{path}\n{query}'.encode()).hexdigest()
+
+    def get(self, key: str):
+        """
+        Returns the live entry stored under the key, or None.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            CachedResponse: The entry, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._remove(key)
+
+        # Fall back to the shared backend, warming the local tier on a hit
+        if self.backend is not None:
+            entry = self.backend.get(key)
+            if entry is not None:
+                with self._lock:
+                    self.backend_hits += 1
+                    self._store(key, entry)
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, body: bytes, media_type: str, headers=()) -> CachedResponse:
+        """
+        Caches a response body.
+
+        Args:
+            key (str): The cache key.
+            body (bytes): The response body.
+            media_type (str): The response content type.
+            headers (iterable of tuple): The other headers to send with the body, as (name, value) pairs.
+
+        Returns:
+            CachedResponse: The new entry.
+        """
+        entry = CachedResponse(body, media_type, make_etag(body), time.time() + self.ttl, headers)
+        with self._lock:
+            self._store(key, entry)
+        if self.backend is not None:
+            self.backend.put(key, entry)
+        return entry
+
+    def _store(self, key: str, entry: CachedResponse):
+        # Bodies larger than the whole budget are never kept in memory
+        if len(entry.body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._size += len(entry.body)
+
+        # Evict the least recently used entries until the budget is met
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Hits (memory and backend), misses, evictions, entries and bytes used.
+        """
+        with self._lock:
+            lookups = self.hits + self.backend_hits + self.misses
+            return {
+                "hits": self.hits,
+                "backend hits": self.backend_hits,
+                "misses": self.misses,
+                "hit ratio": (self.hits + self.backend_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max bytes": self.max_bytes,
+                "backend": None if self.backend is None else type(self.backend).__name__,
+            }
@@ -0,0 +1,188 @@
+"""
+HTTP client of the API, used by the Streamlit front-end in remote mode.
+
+A single `requests.Session` keeps a pool of keep-alive connections to the API,
+so a page that triggers several calls pays for the TCP (and TLS) handshake once.
+Every call has a connect and a read timeout, and calls answered 502, 503 (the
+executor shedding load) or 504 are retried with backoff, honouring Retry-After.
+
+GET responses are kept in a small LRU. An entry younger than the TTL is reused
+without a request; an older one is revalidated with its ETag, and the API answers
+304 without a body when the catalog has not changed.
+"""
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class APIError(RuntimeError):
+    """Raised when the API answers with an error status."""
+
+    def __init__(self, status: int, body):
+        detail = body.get("detail") if isinstance(body, dict) else body
+        super().__init__(f"The API answered {status}: {detail}")
+        self.status = status
+        self.body = body
+
+
+class MovieMentorClient:
+    """
+    Pooled, caching client of the API routes used by the front-end.
+    """
+
+    def __init__(self, base_url: str, connect_timeout: float = 3, read_timeout: float = 30, pool_size: int = 10, retries: int = 2, cache_size: int = 512, cache_ttl: float = 300):
+        """
+        Creates the client.
+
+        Args:
+            base_url (str): The API root, e.g. 'http://localhost:8000'.
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait for a response once connected.
+            pool_size (int): The number of keep-alive connections kept open.
+            retries (int): The number of retries of failed or shed calls.
+            cache_size (int): The number of GET responses kept; 0 disables the cache.
+            cache_ttl (float): Seconds during which a cached response is used without revalidation.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+
+        # Retry connection errors and transient statuses, POSTs included since every route is read-only
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.25,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self._session = requests.Session()
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        # url -> (ETag, body, time.monotonic() of the last validation)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+
+    def _decode(self, response: requests.Response):
+        body = response.json() if response.content else None
+        if response.status_code >= 400 or response.status_code == 300:
+            raise APIError(response.status_code, body)
+        return body
+
+    def _cached(self, url: str):
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is not None:
+                self._cache.move_to_end(url)
+            return entry
+
+    def _store(self, url: str, etag: str, body):
+        with self._lock:
+            self._cache[url] = (etag, body, time.monotonic())
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, path: str, **params):
+        """
+        Calls a GET route, answering from the cache when possible.
+
+        Args:
+            path (str): The route path, already URL-encoded.
+            **params: The query parameters; None values are left out.
+
+        Returns:
+            The decoded JSON body.
+
+        Raises:
+            APIError: If the API answers with an error status.
+            requests.RequestException: If the API cannot be reached in time.
+        """
+        params = {key: value for key, value in params.items() if value is not None}
+        url = requests.Request('GET', self.base_url + path, params=params).prepare().url
+
+        entry = self._cached(url) if self.cache_size > 0 else None
+        if entry is not None and time.monotonic() - entry[2] < self.cache_ttl:
+            self._hits += 1
+            return entry[1]
+
+        # Revalidate a stale entry instead of downloading the body again
+        headers = {'If-None-Match': entry[0]} if entry is not None and entry[0] else {}
+        response = self._session.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self._revalidated += 1
+            self._store(url, entry[0], entry[1])
+            return entry[1]
+
+        self._misses += 1
+        body = self._decode(response)
+        if self.cache_size > 0:
+            self._store(url, response.headers.get('ETag'), body)
+        return body
+
+    def post(self, path: str, payload: dict):
+        """
+        Calls a POST route.
+
+        Args:
+            path (str): The route path.
+            payload (dict): The JSON body.
+
+        Returns:
+            The decoded JSON body.
+
+        Raises:
+            APIError: If the API answers with an error status.
+            requests.RequestException: If the API cannot be reached in time.
+        """
+        response = self._session.post(self.base_url + path, json=payload, timeout=self.timeout)
+        return self._decode(response)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Fresh hits, 304 revalidations, full downloads and the number of entries.
+        """
+        return {"hits": self._hits, "revalidated": self._revalidated, "misses": self._misses, "entries": len(self._cache)}
+
+    def close(self):
+        """Closes the pooled connections."""
+        self._session.close()
+
+    def search(self, query: str, kind: str = None, limit: int = None) -> dict:
+        """Returns the titles, people and genres matching a typed prefix."""
+        return self.get('/api/v1/search', q=query, kind=kind, limit=limit)
+
+    def recommendations(self, titles: list, num: int, merge: bool = False) -> dict:
+        """Returns the recommendations of several seed titles, computed by the API in one batch."""
+        return self.post('/api/v1/recommendations/batch', {"titles": list(titles), "num": num, "merge": merge})
+
+    def movie(self, title: str, year: int = None) -> dict:
+        """Returns the details of a movie."""
+        return self.get('/api/v1/movie/' + quote(title, safe=''), year=year)
+
+    def movies_by_genre(self, genre: str, limit: int = None, fields: str = None) -> dict:
+        """Returns the best-ranked movies of a genre."""
+        return self.get('/api/v1/movies_by_genre/' + quote(genre, safe=''), limit=limit, fields=fields)
+
+    def director(self, name: str, limit: int = None, fields: str = None) -> dict:
+        """Returns a director's totals and movies."""
+        return self.get('/api/v1/director/' + quote(name, safe=''), limit=limit, fields=fields)
+
+    def actor(self, name: str, limit: int = None, fields: str = None) -> dict:
+        """Returns an actor's totals and movies."""
+        return self.get('/api/v1/actor/' + quote(name, safe=''), limit=limit, fields=fields)
@@ -0,0 +1,68 @@
+"""
+Runtime settings for the API and the Streamlit front-end.
+
+Every value is read once from the environment when the module is imported, so
+a deployment can point the service at a different catalog without code changes.
+"""
+import os
+
+# Location of the cleaned movie catalog produced by the cleaning pipeline, a memory-mapped
+# Arrow file (pickles written by older pipelines are still accepted)
+CATALOG_PATH = os.environ.get('MOVIE_MENTOR_CATALOG', './data/cleaned/movies.arrow')
+
+# Directory holding the recommender artifacts written by cleaning/build_model.py,
+# one sub-directory per catalog version
+MODEL_DIR = os.environ.get('MOVIE_MENTOR_MODEL_DIR', './data/model')
+
+# Search backend of the recommender for requests deeper than the precomputed neighbor
+# table: 'brute' (exact KNN over the TF-IDF matrix) or 'lsh' (approximate, needs the
+# embeddings written by cleaning/build_ann.py)
+RECOMMENDER_BACKEND = os.environ.get('MOVIE_MENTOR_RECOMMENDER_BACKEND', 'brute')
+
+# Recall/latency knobs of the 'lsh' backend, see api/ann.py and cleaning/evaluate_ann.py
+ANN_TABLES = int(os.environ.get('MOVIE_MENTOR_ANN_TABLES', '8'))
+ANN_BITS = int(os.environ.get('MOVIE_MENTOR_ANN_BITS', '12'))
+ANN_PROBES = int(os.environ.get('MOVIE_MENTOR_ANN_PROBES', '2'))
+
+# Response cache: memory budget of the in-process LRU (0 disables the cache) and entry lifetime
+CACHE_MAX_BYTES = int(os.environ.get('MOVIE_MENTOR_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_TTL = float(os.environ.get('MOVIE_MENTOR_CACHE_TTL', '3600'))
+
+# Optional second cache tier shared by every worker of the host: 'none' or 'sqlite'
+CACHE_BACKEND = os.environ.get('MOVIE_MENTOR_CACHE_BACKEND', 'none')
+CACHE_PATH = os.environ.get('MOVIE_MENTOR_CACHE_PATH', './data/cache.sqlite3')
+
+# Entries kept in the SQLite tier; expired entries and those beyond the cap are purged every CACHE_PURGE_EVERY puts
+CACHE_BACKEND_MAX_ROWS = int(os.environ.get('MOVIE_MENTOR_CACHE_BACKEND_MAX_ROWS', '100000'))
+CACHE_PURGE_EVERY = int(os.environ.get('MOVIE_MENTOR_CACHE_PURGE_EVERY', '1000'))
+
+# Responses at least this large (in bytes) are compressed when the client accepts gzip or brotli; 0 disables compression
+COMPRESSION_MIN_SIZE = int(os.environ.get('MOVIE_MENTOR_COMPRESSION_MIN_SIZE', '1024'))
+
+# Worker threads running the heavy part of the requests (KNN queries, large person payloads)
+EXECUTOR_WORKERS = int(os.environ.get('MOVIE_MENTOR_EXECUTOR_WORKERS', str(min(8, os.cpu_count() or 1))))
+
+# Heavy requests allowed to wait for a worker; beyond that the API answers 503
+EXECUTOR_QUEUE = int(os.environ.get('MOVIE_MENTOR_EXECUTOR_QUEUE', str(4 * EXECUTOR_WORKERS)))
+
+# Seconds sent in the Retry-After header of the 503 responses
+EXECUTOR_RETRY_AFTER = int(os.environ.get('MOVIE_MENTOR_EXECUTOR_RETRY_AFTER', '1'))
+
+# Person payloads with at most this many movies are built inline instead of in the executor
+EXECUTOR_INLINE_ROWS = int(os.environ.get('MOVIE_MENTOR_EXECUTOR_INLINE_ROWS', '50'))
+
+# Base URL of the API (e.g. 'http://api:8000'). When set, streamlit.py runs in remote mode:
+# it calls the API instead of loading the catalog and model itself
+API_URL = os.environ.get('MOVIE_MENTOR_API_URL', '')
+
+# Connect and read timeouts, in seconds, of the calls to the API
+API_CONNECT_TIMEOUT = float(os.environ.get('MOVIE_MENTOR_API_CONNECT_TIMEOUT', '3'))
+API_READ_TIMEOUT = float(os.environ.get('MOVIE_MENTOR_API_READ_TIMEOUT', '30'))
+
+# Keep-alive connections kept open to the API, and retries of failed or shed (503) calls
+API_POOL_SIZE = int(os.environ.get('MOVIE_MENTOR_API_POOL_SIZE', '10'))
+API_RETRIES = int(os.environ.get('MOVIE_MENTOR_API_RETRIES', '2'))
+
+# Client-side cache of the API responses: number of entries and seconds before revalidation
+API_CACHE_SIZE = int(os.environ.get('MOVIE_MENTOR_API_CACHE_SIZE', '512'))
+API_CACHE_TTL = float(os.environ.get('MOVIE_MENTOR_API_CACHE_TTL', '300'))
@@ -0,0 +1,126 @@
+"""
+Bounded executor for the CPU-heavy part of the request handlers.
+
+Handlers are `async def` and answer cheap index lookups inline on the event
+loop. Heavy work (brute-force or approximate KNN queries, large person payloads)
+is handed to a fixed pool of worker threads. The pool admits at most
+`workers + queue` jobs at a time; past that, `Overloaded` is raised right away
+and the app answers 503 with a Retry-After header instead of letting latency
+grow without bound.
+
+Threads are used rather than processes: the work is NumPy and SciPy code that
+releases the GIL, and worker processes would each need their own copy of the
+catalog and model.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api import config
+
+
+class Overloaded(RuntimeError):
+    """Raised when the executor already holds as many jobs as it admits."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("The server is busy, retry later")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded number of running plus waiting jobs.
+    """
+
+    def __init__(self, workers: int, queue: int, retry_after: int = 1):
+        """
+        Creates the pool.
+
+        Args:
+            workers (int): The number of worker threads.
+            queue (int): The number of jobs allowed to wait for a free worker.
+            retry_after (int): Seconds suggested to rejected clients.
+        """
+        self.workers = workers
+        self.capacity = workers + queue
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='movie-mentor')
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+
+    async def run(self, fn, *args, inline: bool = False):
+        """
+        Runs a function in the pool and waits for its result without blocking the event loop.
+
+        Args:
+            fn (callable): The function to run.
+            *args: Its positional arguments.
+            inline (bool): Call the function directly on the event loop, for work known to be cheap.
+
+        Returns:
+            The function's return value.
+
+        Raises:
+            Overloaded: If the pool is full.
+        """
+        if inline:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise Overloaded(self.retry_after)
+
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # The slot is freed when the job itself ends, not when the awaiting request does: a client
+        # disconnect cancels the request, but a job already running keeps its worker busy
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        """
+        Returns the current load of the pool.
+
+        Returns:
+            dict: Workers, capacity, jobs running or queued and jobs rejected so far.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "pending": self._pending,
+                "rejected": self._rejected,
+            }
+
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor() -> BoundedExecutor:
+    """
+    Returns the process-wide `BoundedExecutor`, creating it on first use.
+
+    Returns:
+        BoundedExecutor: The shared executor.
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = BoundedExecutor(config.EXECUTOR_WORKERS, config.EXECUTOR_QUEUE, config.EXECUTOR_RETRY_AFTER)
+    return _executor
@@ -0,0 +1,672 @@
+"""
+Lookup structures built once over the catalog held by `MovieStore`.
+
+They map user-facing keys (person names, titles, ...) to row positions so that
+request handlers resolve them with a binary search instead of scanning columns.
+
+The person and title indexes hold no Python objects: their keys are packed in
+`StringTable`s and their postings in CSR arrays. `arrays()` returns those
+arrays and `from_arrays()` rebuilds an index over them, so `MovieStore` writes
+them to .npy files once and every worker memory-maps the same pages.
+"""
+import bisect
+import difflib
+import unicodedata
+
+import numpy as np
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes a name for lookups: accents removed, case folded, whitespace collapsed.
+
+    Args:
+        text (str): The raw name.
+
+    Returns:
+        str: The normalized key.
+    """
+    # Decompose accented characters and drop the combining marks
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+
+    # Fold case and collapse runs of whitespace
+    return ' '.join(text.casefold().split())
+
+
+def prefixed(prefix: str, arrays: dict) -> dict:
+    """
+    Names the arrays of a nested structure after it, e.g. 'data' of the 'keys' table becomes 'keys_data'.
+
+    Args:
+        prefix (str): The name of the nested structure.
+        arrays (dict): Its arrays, by name.
+
+    Returns:
+        dict: The arrays under their prefixed names.
+    """
+    return {f'{prefix}_{name}': array for name, array in arrays.items()}
+
+
+def unprefixed(prefix: str, arrays: dict) -> dict:
+    """
+    Selects the arrays of a nested structure named with `prefixed`.
+
+    Args:
+        prefix (str): The name of the nested structure.
+        arrays (dict): The arrays of the enclosing structure, by name.
+
+    Returns:
+        dict: The arrays of the nested structure, under their own names.
+    """
+    start = len(prefix) + 1
+    return {name[start:]: array for name, array in arrays.items() if name.startswith(prefix + '_')}
+
+
+class StringTable:
+    """
+    Immutable sequence of strings packed in two arrays.
+
+    `data` holds the UTF-8 bytes of every string back to back and the i-th string
+    is `data[offsets[i]:offsets[i + 1]]`, decoded on access. UTF-8 preserves the
+    code point order, so a table built from sorted strings can be searched with `bisect`.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        """
+        Wraps the packed arrays.
+
+        Args:
+            data (np.ndarray): The concatenated UTF-8 bytes (uint8).
+            offsets (np.ndarray): The start of every string in `data`, plus the end of the last one (int64).
+        """
+        self._data = data
+        self._offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings) -> 'StringTable':
+        """
+        Packs strings into a table.
+
+        Args:
+            strings (iterable of str): The strings, in table order.
+
+        Returns:
+            StringTable: The table.
+        """
+        encoded = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    @classmethod
+    def from_arrays(cls, arrays: dict) -> 'StringTable':
+        """
+        Rebuilds a table over the arrays returned by `arrays()`.
+
+        Args:
+            arrays (dict): The 'data' and 'offsets' arrays, e.g. memory-mapped.
+
+        Returns:
+            StringTable: The table.
+        """
+        return cls(arrays['data'], arrays['offsets'])
+
+    def arrays(self) -> dict:
+        """
+        Returns the packed arrays.
+
+        Returns:
+            dict: The 'data' and 'offsets' arrays.
+        """
+        return {'data': self._data, 'offsets': self._offsets}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        return self._data[self._offsets[position]:self._offsets[position + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        return iter(self.slice(0, len(self)))
+
+    def slice(self, start: int, stop: int) -> list:
+        """
+        Decodes a range of the table at once.
+
+        Args:
+            start (int): The first position.
+            stop (int): The position after the last one.
+
+        Returns:
+            list of str: The strings at positions start to stop - 1.
+        """
+        offsets = (self._offsets[start:stop + 1] - self._offsets[start]).tolist()
+        data = self._data[self._offsets[start]:self._offsets[stop]].tobytes()
+        return [data[begin:end].decode('utf-8') for begin, end in zip(offsets[:-1], offsets[1:])]
+
+
+class _Postings:
+    """
+    Sorted, distinct string keys with the rows of every key in CSR form:
+    `rows[offsets[i]:offsets[i + 1]]` holds the sorted, de-duplicated row
+    positions of the i-th key of `keys`.
+    """
+
+    def __init__(self, keys: StringTable, rows: np.ndarray, offsets: np.ndarray):
+        self.keys = keys
+        self.rows = rows
+        self.offsets = offsets
+
+    @classmethod
+    def group(cls, keys: list, rows: list) -> '_Postings':
+        # Assign every distinct key a slot in sorted order, so prefix ranges are contiguous
+        sorted_keys = sorted(set(keys))
+        slots = {key: slot for slot, key in enumerate(sorted_keys)}
+        key_ids = np.fromiter((slots[key] for key in keys), dtype=np.int32, count=len(keys))
+        rows = np.asarray(rows, dtype=np.int32)
+
+        # Group the rows by key, dropping the rows listed twice under the same key
+        order = np.lexsort((rows, key_ids))
+        key_ids = key_ids[order]
+        rows = rows[order]
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = (key_ids[1:] != key_ids[:-1]) | (rows[1:] != rows[:-1])
+
+        counts = np.bincount(key_ids[keep], minlength=len(sorted_keys))
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return cls(StringTable.from_strings(sorted_keys), rows[keep], offsets)
+
+    @classmethod
+    def from_arrays(cls, arrays: dict) -> '_Postings':
+        return cls(StringTable.from_arrays(unprefixed('keys', arrays)), arrays['rows'], arrays['offsets'])
+
+    def arrays(self) -> dict:
+        return {**prefixed('keys', self.keys.arrays()), 'rows': self.rows, 'offsets': self.offsets}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def find(self, key: str):
+        # The slot of the key, or None if it is not indexed
+        slot = bisect.bisect_left(self.keys, key)
+        if slot < len(self.keys) and self.keys[slot] == key:
+            return slot
+        return None
+
+    def postings(self, slot: int) -> np.ndarray:
+        return self.rows[self.offsets[slot]:self.offsets[slot + 1]]
+
+    def get(self, key: str):
+        # The rows of the key, or None if it is not indexed
+        slot = self.find(key)
+        return None if slot is None else self.postings(slot)
+
+
+class PersonIndex:
+    """
+    Inverted index from normalized person name to the rows that credit them.
+
+    Every distinct normalized name has a slot, in sorted order; the postings of
+    a slot are its sorted, de-duplicated row positions.
+    """
+
+    def __init__(self, names_per_row):
+        """
+        Builds the index.
+
+        Args:
+            names_per_row (iterable of list of str): The parsed names of every catalog row, in row order.
+        """
+        keys = []
+        rows = []
+        display = {}
+
+        # Flatten the (name, row) pairs
+        for row, names in enumerate(names_per_row):
+            for name in names:
+                key = normalize(name)
+                if not key:
+                    continue
+                keys.append(key)
+                rows.append(row)
+                display.setdefault(key, name)
+
+        self._postings = _Postings.group(keys, rows)
+        self._names = StringTable.from_strings(display[key] for key in sorted(display))
+
+    @classmethod
+    def from_arrays(cls, arrays: dict) -> 'PersonIndex':
+        """
+        Rebuilds an index over the arrays returned by `arrays()`.
+
+        Args:
+            arrays (dict): The arrays of the index, e.g. memory-mapped.
+
+        Returns:
+            PersonIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index._postings = _Postings.from_arrays(arrays)
+        index._names = StringTable.from_arrays(unprefixed('names', arrays))
+        return index
+
+    def arrays(self) -> dict:
+        """
+        Returns the arrays holding the index.
+
+        Returns:
+            dict: NumPy arrays by name.
+        """
+        return {**self._postings.arrays(), **prefixed('names', self._names.arrays())}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def __contains__(self, name: str) -> bool:
+        return self.slot(name) is not None
+
+    def slot(self, name: str):
+        """
+        Returns the slot of a person (after normalization).
+
+        Args:
+            name (str): The person's name.
+
+        Returns:
+            int: The slot, or None if the name is unknown.
+        """
+        return self._postings.find(normalize(name))
+
+    def count(self, slot: int) -> int:
+        """
+        Returns the number of movies crediting the person of a slot.
+
+        Args:
+            slot (int): A slot returned by a match method.
+
+        Returns:
+            int: The length of the slot's postings.
+        """
+        return int(self._postings.offsets[slot + 1] - self._postings.offsets[slot])
+
+    def totals(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sums a per-row column over the postings of every person.
+
+        Args:
+            values (np.ndarray): One value per catalog row.
+
+        Returns:
+            np.ndarray: One float64 sum per slot.
+        """
+        if len(self._postings) == 0:
+            return np.zeros(0)
+        # Postings are contiguous and never empty, so one reduceat covers every slot
+        gathered = np.asarray(values, dtype=np.float64)[self._postings.rows]
+        return np.add.reduceat(gathered, self._postings.offsets[:-1])
+
+    def lookup(self, name: str) -> np.ndarray:
+        """
+        Returns the rows crediting exactly this person (after normalization).
+
+        Args:
+            name (str): The person's name.
+
+        Returns:
+            np.ndarray: Sorted row positions; empty if the name is unknown.
+        """
+        rows = self._postings.get(normalize(name))
+        if rows is None:
+            return self._postings.rows[:0]
+        return rows
+
+    def prefix_matches(self, prefix: str) -> range:
+        """
+        Returns the slots of every key starting with the normalized prefix.
+
+        Args:
+            prefix (str): The name prefix.
+
+        Returns:
+            range: A contiguous range of slots in the sorted key list.
+        """
+        prefix = normalize(prefix)
+        keys = self._postings.keys
+        start = bisect.bisect_left(keys, prefix)
+        stop = bisect.bisect_left(keys, prefix + '\uffff', start)
+        return range(start, stop)
+
+    def fuzzy_matches(self, name: str, limit: int = 5, cutoff: float = 0.85) -> list:
+        """
+        Returns the slots of the keys closest to the name.
+
+        Candidates are restricted to keys sharing the first character, which keeps
+        the comparison to a small slice of the index.
+
+        Args:
+            name (str): The (possibly misspelled) name.
+            limit (int): The maximum number of matches.
+            cutoff (float): The minimum `difflib` similarity ratio.
+
+        Returns:
+            list of int: Slots ordered from best to worst match.
+        """
+        key = normalize(name)
+        if not key:
+            return []
+        first = self.prefix_matches(key[0])
+        candidates = self._postings.keys.slice(first.start, first.stop)
+        matches = difflib.get_close_matches(key, candidates, n=limit, cutoff=cutoff)
+        # The candidates are sorted, so a match is found back by binary search
+        return [first.start + bisect.bisect_left(candidates, match) for match in matches]
+
+    def search(self, name: str, match: str = 'exact') -> np.ndarray:
+        """
+        Resolves a name to row positions.
+
+        Args:
+            name (str): The person's name.
+            match (str): 'exact' for a normalized exact match, 'prefix' to include every
+                name starting with `name`, 'fuzzy' to include close spellings.
+
+        Returns:
+            np.ndarray: Sorted, unique row positions.
+        """
+        if match == 'exact':
+            return self.lookup(name)
+
+        if match == 'prefix':
+            slots = self.prefix_matches(name)
+        elif match == 'fuzzy':
+            slots = self.fuzzy_matches(name)
+        else:
+            raise ValueError(f"Unknown match mode: {match}")
+
+        if len(slots) == 0:
+            return self._postings.rows[:0]
+        return np.unique(np.concatenate([self._postings.postings(slot) for slot in slots]))
+
+    def keys(self) -> StringTable:
+        """
+        Returns the normalized names, in slot order.
+
+        Returns:
+            StringTable: The sorted keys of the index.
+        """
+        return self._postings.keys
+
+    def names(self, slots) -> list:
+        """
+        Returns the display spelling of the given slots.
+
+        Args:
+            slots (iterable of int): Slots returned by a match method.
+
+        Returns:
+            list of str: The names as first seen in the catalog.
+        """
+        return [self._names[slot] for slot in slots]
+
+
+class TitleNotFound(LookupError):
+    """Raised when a title does not match any movie."""
+
+    def __init__(self, title: str):
+        super().__init__(f"No movie found with title '{title}'")
+        self.title = title
+
+
+class AmbiguousTitle(LookupError):
+    """Raised when a title matches several movies and no year narrows it down."""
+
+    def __init__(self, title: str, matches: list):
+        super().__init__(f"Several movies are titled '{title}', pass a year to pick one")
+        self.title = title
+        self.matches = matches
+
+
+class TitleIndex:
+    """
+    Index from movie title to row positions.
+
+    Two sets of postings are kept: one keyed by the exact title and one keyed by
+    the normalized title (case and accent insensitive). Both point to arrays of
+    positions, since titles are not unique in the catalog.
+    """
+
+    def __init__(self, titles, years, ids=None):
+        """
+        Builds the index.
+
+        Args:
+            titles (sequence of str): The title of every catalog row, in row order.
+            years (sequence of int): The release year of every row, used to disambiguate.
+            ids (sequence of int): The movie id of every row, reported when disambiguating.
+        """
+        exact = []
+        folded = []
+        rows = []
+        for row, title in enumerate(titles):
+            if not isinstance(title, str):
+                continue
+            exact.append(title)
+            folded.append(normalize(title))
+            rows.append(row)
+
+        self._exact = _Postings.group(exact, rows)
+        self._folded = _Postings.group(folded, rows)
+        self._titles = titles
+        self._years = np.asarray(years)
+        self._ids = ids
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, titles, years, ids=None) -> 'TitleIndex':
+        """
+        Rebuilds an index over the arrays returned by `arrays()`.
+
+        Args:
+            arrays (dict): The arrays of the index, e.g. memory-mapped.
+            titles (sequence of str): The title of every catalog row, in row order.
+            years (sequence of int): The release year of every row.
+            ids (sequence of int): The movie id of every row.
+
+        Returns:
+            TitleIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index._exact = _Postings.from_arrays(unprefixed('exact', arrays))
+        index._folded = _Postings.from_arrays(unprefixed('folded', arrays))
+        index._titles = titles
+        index._years = np.asarray(years)
+        index._ids = ids
+        return index
+
+    def arrays(self) -> dict:
+        """
+        Returns the arrays holding the index.
+
+        Returns:
+            dict: NumPy arrays by name.
+        """
+        return {**prefixed('exact', self._exact.arrays()), **prefixed('folded', self._folded.arrays())}
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def lookup(self, title: str, insensitive: bool = False) -> np.ndarray:
+        """
+        Returns every row whose title matches.
+
+        Args:
+            title (str): The movie title.
+            insensitive (bool): Ignore case, accents and repeated whitespace.
+
+        Returns:
+            np.ndarray: Row positions in catalog order; empty if the title is unknown.
+        """
+        if insensitive:
+            rows = self._folded.get(normalize(title))
+        else:
+            rows = self._exact.get(title)
+        if rows is None:
+            return np.empty(0, dtype=np.int32)
+        return rows
+
+    def resolve(self, title: str, year: int = None, insensitive: bool = False, where=None) -> int:
+        """
+        Resolves a title to exactly one row position.
+
+        Args:
+            title (str): The movie title.
+            year (int): Optional release year to pick among movies sharing the title.
+            insensitive (bool): Ignore case, accents and repeated whitespace.
+            where (np.ndarray): Optional boolean mask over the catalog restricting the candidates.
+
+        Returns:
+            int: The row position of the movie.
+
+        Raises:
+            TitleNotFound: If no movie matches.
+            AmbiguousTitle: If several movies match; `matches` lists their title, year and id.
+        """
+        rows = self.lookup(title, insensitive)
+        if where is not None:
+            rows = rows[where[rows]]
+        if year is not None:
+            rows = rows[self._years[rows] == year]
+
+        if len(rows) == 0:
+            raise TitleNotFound(title)
+        if len(rows) > 1:
+            matches = [
+                {
+                    "title": self._titles[row],
+                    "year": int(self._years[row]),
+                    "id": None if self._ids is None else int(self._ids[row]),
+                }
+                for row in rows
+            ]
+            raise AmbiguousTitle(title, matches)
+        return int(rows[0])
+
+
+# Vote average a movie must exceed to be listed among the popular movies of a genre
+POPULAR_MIN_VOTE_AVERAGE = 5
+
+
+class GenreIndex:
+    """
+    Genre index with every genre's movies pre-ranked at load time.
+
+    For each normalized genre the index keeps a bitmap over the catalog (for
+    intersections) and the genre's rows sorted by vote average, then popularity,
+    both descending. A page of a single genre is therefore a slice, and
+    multi-genre queries only touch the rows of the genres involved.
+    """
+
+    def __init__(self, genres_per_row, vote_average, popularity):
+        """
+        Builds the index.
+
+        Args:
+            genres_per_row (iterable of list of str): The parsed genres of every catalog row, in row order.
+            vote_average (np.ndarray): The vote average of every row.
+            popularity (np.ndarray): The popularity of every row.
+        """
+        self._vote_average = np.asarray(vote_average, dtype=np.float64)
+        rows_count = len(self._vote_average)
+
+        # Global rank of every row: best vote average first, ties broken by popularity
+        order = np.lexsort((-np.asarray(popularity, dtype=np.float64), -self._vote_average))
+        self._rank = np.empty(rows_count, dtype=np.int64)
+        self._rank[order] = np.arange(rows_count)
+
+        # Group the rows by genre
+        members = {}
+        display = {}
+        for row, genres in enumerate(genres_per_row):
+            for genre in genres:
+                key = normalize(genre)
+                if key:
+                    members.setdefault(key, []).append(row)
+                    display.setdefault(key, genre)
+        self._names = display
+
+        self._bitmaps = {}
+        self._ranked = {}
+        self._ranked_votes = {}
+        for key, rows in members.items():
+            rows = np.unique(np.asarray(rows, dtype=np.int32))
+            bitmap = np.zeros(rows_count, dtype=bool)
+            bitmap[rows] = True
+            ranked = rows[np.argsort(self._rank[rows])]
+            self._bitmaps[key] = bitmap
+            self._ranked[key] = ranked
+            # Descending vote averages of the ranked rows, negated for searchsorted
+            self._ranked_votes[key] = -self._vote_average[ranked]
+
+    def genres(self) -> list:
+        """
+        Returns the genre names, as first spelled in the catalog.
+
+        Returns:
+            list of str: The genres, sorted.
+        """
+        return sorted(self._names.values())
+
+    def search(self, genres, mode: str = 'and', min_vote_average: float = None) -> np.ndarray:
+        """
+        Returns the ranked rows of the movies matching the genres.
+
+        Args:
+            genres (list of str): The genres; matched exactly, ignoring case and accents.
+            mode (str): 'and' for movies in every genre, 'or' for movies in any of them.
+            min_vote_average (float): Only keep movies with a strictly greater vote average.
+
+        Returns:
+            np.ndarray: Row positions, best vote average (then popularity) first.
+        """
+        keys = list(dict.fromkeys(normalize(genre) for genre in genres))
+        known = [key for key in keys if key in self._ranked]
+        if not known or (mode == 'and' and len(known) < len(keys)):
+            return np.empty(0, dtype=np.int32)
+
+        if len(known) == 1:
+            # A single genre is a prefix of its ranked list, cut at the vote threshold
+            key = known[0]
+            ranked = self._ranked[key]
+            if min_vote_average is not None:
+                ranked = ranked[:np.searchsorted(self._ranked_votes[key], -min_vote_average, side='left')]
+            return ranked
+
+        if mode == 'and':
+            # Walk the smallest genre's ranked rows and intersect with the other bitmaps
+            known.sort(key=lambda key: len(self._ranked[key]))
+            ranked = self._ranked[known[0]]
+            mask = np.logical_and.reduce([self._bitmaps[key][ranked] for key in known[1:]])
+            ranked = ranked[mask]
+        elif mode == 'or':
+            # Union the genres' rows and restore the global ranking
+            rows = np.unique(np.concatenate([self._ranked[key] for key in known]))
+            ranked = rows[np.argsort(self._rank[rows])]
+        else:
+            raise ValueError(f"Unknown genre mode: {mode}")
+
+        if min_vote_average is not None:
+            ranked = ranked[self._vote_average[ranked] > min_vote_average]
+        return ranked
+
+    def popular(self, genres, mode: str = 'and') -> np.ndarray:
+        """
+        Returns the popular movies of the genres, as /movies_by_genre and the Streamlit app list them.
+
+        Args:
+            genres (list of str): The genres; matched exactly, ignoring case and accents.
+            mode (str): 'and' for movies in every genre, 'or' for movies in any of them.
+
+        Returns:
+            np.ndarray: Row positions of the movies with a vote average above POPULAR_MIN_VOTE_AVERAGE,
+                best vote average (then popularity) first.
+        """
+        return self.search(genres, mode, min_vote_average=POPULAR_MIN_VOTE_AVERAGE)
@@ -0,0 +1,810 @@
+"""
+Persisted recommender model.
+
+The TF-IDF model is fitted offline by `cleaning/build_model.py` and written to a
+versioned artifact directory. Serving processes load the artifact instead of
+fitting the model at import time, and refuse to start when the artifact was
+built from a different catalog than the one they serve.
+
+`<model dir>/<catalog version>` is a symbolic link to a generation directory,
+`<model dir>/.<catalog version>.<timestamp>/`. Generations are complete and never
+modified: every write (the model, then its neighbor table or embeddings) builds a
+new generation and swaps the link in one rename, so a loading process sees either
+the previous artifact or the new one, never a mix of both.
+
+Artifact layout (inside a generation):
+
+    metadata.json     format and catalog versions, shapes, vectorizer settings
+    vocabulary.json   the vocabulary terms, ordered by column index
+    idf.npy           the fitted inverse document frequencies
+    matrix_data.npy, matrix_indices.npy, matrix_indptr.npy
+                      the CSR arrays of the sparse TF-IDF matrix, one row per catalog
+                      row; raw .npy files so every worker memory-maps the same pages.
+                      The weights are float32 unless the artifact was built with
+                      --dtype float64; the index arrays are int32 below 2**31 nonzeros
+    neighbors.npy     optional, written by cleaning/build_neighbors.py: the top-K most
+                      similar rows of every row (int32, best first)
+    scores.npy        optional, the cosine similarities matching neighbors.npy (float16)
+    embeddings.npy    optional, written by cleaning/build_ann.py: L2-normalized TruncatedSVD
+                      embeddings of the rows (float32, or float16 when built with --float16),
+                      used by the approximate backend
+    svd_components.npy  optional, the SVD components mapping TF-IDF rows to embeddings
+    row_ids.npy       the movie id of every row (int64)
+    row_fingerprints.npy
+                      a hash of every row's feature text (uint64); together with row_ids,
+                      lets cleaning/update_model.py carry unchanged rows over to the
+                      artifact of the next catalog version
+"""
+import datetime
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import scipy.sparse
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.neighbors import NearestNeighbors
+
+from api.ann import LSHIndex, normalize_rows
+
+# Version of the artifact layout; bump it whenever the files or their meaning change
+ARTIFACT_FORMAT = 4
+
+# Free-text columns of the documents the TF-IDF model is fitted on, with the number of
+# times their words are repeated (a column's weight in the similarity)
+TEXT_FEATURES = {'title': 2, 'overview': 1}
+
+# Columns of names (or single categorical values) turned into whole-entity tokens such as
+# 'person:mark_hamill', with the token prefix and the weight of each column; cast and crew
+# share a prefix so a person links movies whichever role they had
+ENTITY_FEATURES = {
+    'belongs_to_collection': ('collection', 3),
+    'original_language': ('language', 1),
+    'genres': ('genre', 2),
+    'production_companies': ('company', 1),
+    'production_countries': ('country', 1),
+    'cast': ('person', 1),
+    'crew': ('person', 1),
+}
+
+# The release date contributes a 'decade:1970s' token with this weight
+DECADE_WEIGHT = 1
+
+# Catalog columns combined into the text the TF-IDF model is fitted on
+FEATURE_COLUMNS = list(TEXT_FEATURES) + list(ENTITY_FEATURES) + ['release_date']
+
+# Settings of the TF-IDF vectorizer; the token pattern keeps 'prefix:name' entity tokens whole.
+# min_df and max_df can prune rare and common terms to shrink the matrix, but pruned terms no
+# longer weigh on the row norms, which reorders recommendations: cleaning/evaluate_compact.py
+# reports the memory saved and the recall lost, and build_model.py takes both as options
+VECTORIZER_PARAMS = {
+    'stop_words': 'english',
+    'token_pattern': r'(?u)\b\w+:\w+\b|\b\w\w+\b',
+    'min_df': 1,
+    'max_df': 1.0,
+}
+
+# Precision of the TF-IDF weights: single precision halves the matrix, and its ~7 significant
+# digits are far more than the similarity ranking needs
+MATRIX_DTYPE = np.float32
+
+
+class ArtifactMismatch(RuntimeError):
+    """Raised when no usable model artifact exists for the catalog being served."""
+
+
+def _text(values: pd.Series, weight: int) -> pd.Series:
+    # Free text with nulls as '', and colons removed so words never read as entity tokens
+    text = values.astype(object).where(values.notna(), '').astype(str).str.replace(':', ' ', regex=False)
+    return (text + ' ') * weight
+
+
+def _entity_names(names: pa.Array) -> pa.Array:
+    # 'Zoë Müller' -> 'zoe_muller': accents dropped, case folded, runs of other characters than letters and digits joined by '_'
+    names = pc.utf8_normalize(names, form='NFKD')
+    names = pc.replace_substring_regex(names, pattern=r'\p{Mn}+', replacement='')
+    names = pc.utf8_lower(names)
+    names = pc.replace_substring_regex(names, pattern=r'[^\p{L}\p{N}]+', replacement='_')
+    return pc.utf8_trim(names, characters='_')
+
+
+def _entities(values: pd.Series, prefix: str, weight: int) -> np.ndarray:
+    """
+    Turns a column of name lists, or of single values, into entity tokens.
+
+    Args:
+        values (pd.Series): The column; lists may be Python lists, NumPy arrays or an Arrow list column.
+        prefix (str): The token prefix, e.g. 'person'.
+        weight (int): The number of times every token is repeated.
+
+    Returns:
+        np.ndarray: One space-separated token string per row, '' for nulls and empty lists.
+    """
+    rows = len(values)
+    is_list = lambda value: isinstance(value, (list, tuple, np.ndarray))
+    if isinstance(values.dtype, pd.ArrowDtype):
+        lists = pa.array(values.array)
+        if isinstance(lists, pa.ChunkedArray):
+            lists = lists.combine_chunks()
+    elif values.dtype == object and values.map(is_list).any():
+        lists = pa.array([value if is_list(value) else None for value in values.tolist()], type=pa.list_(pa.string()))
+    else:
+        lists = None
+
+    if lists is not None:
+        # Flatten the lists once, remembering the row of every name
+        positions = pc.list_parent_indices(lists).to_numpy()
+        names = pc.list_flatten(lists)
+    else:
+        present = values.notna().to_numpy()
+        positions = np.flatnonzero(present)
+        names = pa.array(values.astype(object).to_numpy()[present].astype(str).tolist(), type=pa.string())
+
+    # Names repeat across movies: turn every distinct name into its token once
+    encoded = names.dictionary_encode()
+    tokens = _entity_names(encoded.dictionary)
+    tokens = pc.binary_join_element_wise(prefix + ':', tokens, '')
+    tokens = pc.take(pc.if_else(pc.equal(pc.utf8_length(tokens), len(prefix) + 1), None, tokens), encoded.indices)
+
+    # Drop null and empty names, then join the tokens of every row in order
+    keep = pc.is_valid(tokens).to_numpy(zero_copy_only=False)
+    tokens = tokens.filter(pa.array(keep))
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(positions[keep], minlength=rows)))).astype(np.int32)
+    joined = pc.binary_join(pa.ListArray.from_arrays(pa.array(offsets), tokens), ' ').to_numpy(zero_copy_only=False)
+    return (joined + ' ') * weight
+
+
+def build_features(df):
+    """
+    Builds the document of every movie the TF-IDF model is fitted on.
+
+    Column by column, free text is repeated by its weight, names become entity
+    tokens and the release date a decade token; null values contribute nothing.
+
+    Args:
+        df (pd.DataFrame): The catalog.
+
+    Returns:
+        pd.Series: One document per catalog row.
+    """
+    parts = [_text(df[column], weight).to_numpy() for column, weight in TEXT_FEATURES.items() if column in df.columns]
+    parts += [_entities(df[column], prefix, weight) for column, (prefix, weight) in ENTITY_FEATURES.items() if column in df.columns]
+
+    if 'release_date' in df.columns:
+        years = pd.to_datetime(df['release_date'], errors='coerce').dt.year
+        decades = (years // 10 * 10).astype('Int64').astype(str) + 's'
+        parts.append(_entities(decades.where(years.notna().to_numpy()), 'decade', DECADE_WEIGHT))
+
+    documents = parts[0]
+    for part in parts[1:]:
+        documents = documents + part
+    return pd.Series(documents, index=df.index, dtype=object).str.strip()
+
+
+def fit(df, dtype=MATRIX_DTYPE, **params):
+    """
+    Fits the TF-IDF model on the catalog.
+
+    Args:
+        df (pd.DataFrame): The catalog.
+        dtype (type): The precision of the TF-IDF weights.
+        **params: Vectorizer settings overriding `VECTORIZER_PARAMS`, e.g. min_df or max_df.
+
+    Returns:
+        tuple: The fitted `TfidfVectorizer` and the sparse TF-IDF matrix.
+    """
+    vectorizer = TfidfVectorizer(**{**VECTORIZER_PARAMS, **params}, dtype=np.dtype(dtype).type)
+    matrix = vectorizer.fit_transform(build_features(df))
+    return vectorizer, matrix.tocsr()
+
+
+def row_fingerprints(df) -> tuple:
+    """
+    Identifies every catalog row and the content the model sees of it.
+
+    Args:
+        df (pd.DataFrame): The catalog.
+
+    Returns:
+        tuple: The movie ids (int64) and a hash of every row's feature text (uint64).
+    """
+    ids = pd.to_numeric(df['id'], errors='coerce').fillna(-1).to_numpy(np.int64)
+    fingerprints = pd.util.hash_pandas_object(build_features(df), index=False).to_numpy()
+    return ids, fingerprints
+
+
+def _new_generation(path: str) -> str:
+    # A new, empty generation directory next to the artifact link `path`
+    directory, version = os.path.split(path)
+    generation = os.path.join(directory, f'.{version}.{time.time_ns()}')
+    os.makedirs(generation)
+    return generation
+
+
+def _publish(path: str, generation: str):
+    """
+    Points the artifact link `path` at a complete generation directory.
+
+    The link is replaced with a rename, which is atomic. The generation it pointed
+    to is kept, since a process may have resolved the link just before the swap
+    and still be opening its files; older generations are removed.
+    """
+    directory, version = os.path.split(path)
+    link = generation + '.link'
+    os.symlink(os.path.basename(generation), link)
+
+    previous = None
+    if os.path.islink(path):
+        previous = os.path.realpath(path)
+    elif os.path.isdir(path):
+        # An artifact written before generations existed: turn it into one first, the
+        # only moment when the version is briefly missing
+        previous = os.path.join(directory, f'.{version}.{time.time_ns()}')
+        os.replace(path, previous)
+    os.replace(link, path)
+
+    keep = {os.path.basename(generation), os.path.basename(previous or '')}
+    for name in os.listdir(directory):
+        if name.startswith(f'.{version}.') and name not in keep and not name.endswith('.link'):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def _revise(path: str, arrays: dict, **values):
+    """
+    Publishes a new generation of an artifact with some arrays added or replaced.
+
+    The unchanged files are hard-linked from the current generation (they are never
+    written to once published), so a revision only costs the new arrays.
+
+    Args:
+        path (str): The artifact link.
+        arrays (dict): The arrays to save, by file name.
+        **values: Metadata entries to add or replace.
+    """
+    current = os.path.realpath(path)
+    generation = _new_generation(path)
+    for name in os.listdir(current):
+        if name in arrays or name == 'metadata.json':
+            continue
+        try:
+            os.link(os.path.join(current, name), os.path.join(generation, name))
+        except OSError:
+            shutil.copy2(os.path.join(current, name), os.path.join(generation, name))
+    for name, array in arrays.items():
+        np.save(os.path.join(generation, name), array)
+
+    with open(os.path.join(current, 'metadata.json')) as file:
+        metadata = json.load(file)
+    metadata.update(values)
+    with open(os.path.join(generation, 'metadata.json'), 'w') as file:
+        json.dump(metadata, file, indent=4)
+
+    _publish(path, generation)
+
+
+def save_artifact(directory: str, version: str, vectorizer, matrix, ids=None, fingerprints=None, **extra) -> str:
+    """
+    Writes a fitted model to `<directory>/<version>`.
+
+    The files are written to a new generation directory, which then replaces the
+    previous artifact atomically, so a serving process never sees a half-written one.
+
+    Args:
+        directory (str): The model directory.
+        version (str): The version of the catalog the model was fitted on.
+        vectorizer (TfidfVectorizer): The fitted vectorizer.
+        matrix (scipy.sparse.csr_matrix): The TF-IDF matrix.
+        ids (np.ndarray): The movie id of every row, as returned by `row_fingerprints`.
+        fingerprints (np.ndarray): The feature hash of every row, as returned by `row_fingerprints`.
+        **extra: Additional metadata entries.
+
+    Returns:
+        str: The path of the artifact (the link to the new generation).
+    """
+    path = os.path.join(directory, version)
+    staging = _new_generation(path)
+
+    # Save the model itself, the matrix as its raw CSR arrays so it can be memory-mapped
+    matrix = matrix.tocsr()
+    matrix.sort_indices()
+    # (index arrays are saved in the smallest dtype SciPy accepts, the one it would convert them
+    # to on load, so loading them does not trigger a conversion copy)
+    index_dtype = np.int32 if max(matrix.nnz, matrix.shape[1]) < 2 ** 31 else np.int64
+    np.save(os.path.join(staging, 'matrix_data.npy'), matrix.data)
+    np.save(os.path.join(staging, 'matrix_indices.npy'), matrix.indices.astype(index_dtype, copy=False))
+    np.save(os.path.join(staging, 'matrix_indptr.npy'), matrix.indptr.astype(index_dtype, copy=False))
+    np.save(os.path.join(staging, 'idf.npy'), vectorizer.idf_)
+    with open(os.path.join(staging, 'vocabulary.json'), 'w') as file:
+        json.dump(vectorizer.get_feature_names_out().tolist(), file)
+
+    # Save the row identities used by incremental updates
+    if ids is not None:
+        np.save(os.path.join(staging, 'row_ids.npy'), ids)
+        np.save(os.path.join(staging, 'row_fingerprints.npy'), fingerprints)
+
+    # Save what a serving process needs to validate the artifact
+    metadata = {
+        "format": ARTIFACT_FORMAT,
+        "catalog_version": version,
+        "rows": matrix.shape[0],
+        "vocabulary_size": matrix.shape[1],
+        "nnz": int(matrix.nnz),
+        "dtype": matrix.dtype.name,
+        "features": FEATURE_COLUMNS,
+        "vectorizer": {key: vectorizer.get_params()[key] for key in VECTORIZER_PARAMS},
+        "sklearn_version": sklearn.__version__,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        **extra,
+    }
+    with open(os.path.join(staging, 'metadata.json'), 'w') as file:
+        json.dump(metadata, file, indent=4)
+
+    # Swap the new artifact into place
+    _publish(path, staging)
+    return path
+
+
+# Matrix shared with the worker processes of `top_k_neighbors`, set once per worker
+_worker_matrix = None
+
+
+def _init_worker(matrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _top_k_block(start: int, stop: int, k: int):
+    """
+    Computes the top-k neighbors of rows `start..stop` of the worker's matrix.
+    """
+    return _top_k(_worker_matrix, np.arange(start, stop), k)
+
+
+def _top_k(matrix, positions: np.ndarray, k: int):
+    """
+    Computes the top-k neighbors of the given rows of the matrix.
+    """
+    # TF-IDF rows are L2-normalized, so the dot product is the cosine similarity
+    similarities = (matrix[positions] @ matrix.T).toarray().astype(np.float32)
+
+    # A movie is never its own recommendation
+    rows = np.arange(len(positions))
+    similarities[rows, positions] = -np.inf
+
+    # Select the k best columns of every row, then order them best first
+    candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(similarities, candidates, axis=1)
+    order = np.argsort(-scores, axis=1, kind='stable')
+    return (
+        np.take_along_axis(candidates, order, axis=1).astype(np.int32),
+        np.take_along_axis(scores, order, axis=1).astype(np.float16),
+    )
+
+
+def top_k_neighbors(matrix, k: int = 100, block_size: int = 256, jobs: int = None):
+    """
+    Computes the k most similar rows of every row of the TF-IDF matrix.
+
+    The all-pairs similarity is computed in blocks of rows, spread over a process
+    pool; each worker receives the matrix once, when it starts.
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): The L2-normalized TF-IDF matrix.
+        k (int): The number of neighbors kept per row.
+        block_size (int): The number of rows per task; bounds each task's dense buffer.
+        jobs (int): The number of worker processes. Defaults to the number of cores.
+
+    Returns:
+        tuple: The neighbor positions (int32, shape (n, k)) and their similarities
+            (float16, shape (n, k)), best first.
+    """
+    rows = matrix.shape[0]
+    k = min(k, rows - 1)
+    neighbors = np.empty((rows, k), dtype=np.int32)
+    scores = np.empty((rows, k), dtype=np.float16)
+
+    starts = range(0, rows, block_size)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(matrix,)) as executor:
+        futures = [executor.submit(_top_k_block, start, min(start + block_size, rows), k) for start in starts]
+        for start, future in zip(starts, futures):
+            block_neighbors, block_scores = future.result()
+            neighbors[start:start + len(block_neighbors)] = block_neighbors
+            scores[start:start + len(block_scores)] = block_scores
+
+    return neighbors, scores
+
+
+def save_neighbors(path: str, neighbors, scores):
+    """
+    Adds a top-K neighbor table to an existing artifact, as a new generation.
+
+    Args:
+        path (str): The artifact path.
+        neighbors (np.ndarray): The neighbor positions returned by `top_k_neighbors`.
+        scores (np.ndarray): The matching similarities.
+    """
+    # Record the table's depth in the metadata
+    _revise(path, {'neighbors.npy': neighbors, 'scores.npy': scores}, neighbors_k=int(neighbors.shape[1]))
+
+
+def save_embeddings(path: str, embeddings, components):
+    """
+    Adds the dense embeddings used by the approximate backend to an existing artifact, as a new generation.
+
+    Args:
+        path (str): The artifact path.
+        embeddings (np.ndarray): The embeddings returned by `api.ann.fit_embeddings`.
+        components (np.ndarray): The matching SVD components.
+    """
+    # Record the embedding size and precision in the metadata
+    _revise(
+        path,
+        {'embeddings.npy': embeddings, 'svd_components.npy': components},
+        embedding_dim=int(embeddings.shape[1]),
+        embedding_dtype=embeddings.dtype.name,
+    )
+
+
+def match_rows(old_ids, old_fingerprints, ids, fingerprints) -> np.ndarray:
+    """
+    Matches the rows of a new catalog to the unchanged rows of the previous one.
+
+    A row is unchanged when a previous row has the same movie id and feature hash;
+    repeated ids are paired in order of appearance.
+
+    Args:
+        old_ids (np.ndarray): The movie ids of the previous rows.
+        old_fingerprints (np.ndarray): The feature hashes of the previous rows.
+        ids (np.ndarray): The movie ids of the new rows.
+        fingerprints (np.ndarray): The feature hashes of the new rows.
+
+    Returns:
+        np.ndarray: For every new row, the position of the same row in the previous
+            catalog, or -1 for new and changed rows.
+    """
+    def keyed(ids, fingerprints):
+        keys = pd.DataFrame({'id': ids, 'fingerprint': fingerprints})
+        keys['occurrence'] = keys.groupby(['id', 'fingerprint']).cumcount()
+        return keys
+
+    old = keyed(old_ids, old_fingerprints)
+    old['source'] = np.arange(len(old))
+    matched = keyed(ids, fingerprints).merge(old, on=['id', 'fingerprint', 'occurrence'], how='left')
+    return matched['source'].fillna(-1).to_numpy(np.int64)
+
+
+def update_matrix(model, df, source: np.ndarray):
+    """
+    Builds the TF-IDF matrix of a new catalog from a previous artifact.
+
+    Unchanged rows are copied from the previous matrix; new and changed rows are
+    transformed with the previous vocabulary and IDF weights.
+
+    Args:
+        model (Model): The artifact of the previous catalog.
+        df (pd.DataFrame): The new catalog.
+        source (np.ndarray): The matching returned by `match_rows`.
+
+    Returns:
+        scipy.sparse.csr_matrix: The TF-IDF matrix of the new catalog.
+    """
+    kept = np.flatnonzero(source >= 0)
+    changed = np.flatnonzero(source < 0)
+
+    # Stack the copied rows and the transformed ones, then put them back in catalog order
+    parts = [model.matrix[source[kept]]]
+    if len(changed):
+        # (a rebuilt vectorizer always weighs in float64, so cast back to the matrix precision)
+        parts.append(model.vectorizer().transform(build_features(df.iloc[changed])).astype(model.matrix.dtype))
+    stacked = scipy.sparse.vstack(parts, format='csr')
+    order = np.empty(len(source), dtype=np.int64)
+    order[np.concatenate([kept, changed])] = np.arange(len(source))
+    return stacked[order]
+
+
+def update_neighbors(matrix, source: np.ndarray, neighbors: np.ndarray, scores: np.ndarray, block_size: int = 1024):
+    """
+    Patches a previous top-K neighbor table for a new catalog.
+
+    Unchanged rows whose previous neighbors are all still unchanged only need to
+    be compared with the new and changed rows. The other rows, and the new and
+    changed rows themselves, are recomputed against the whole matrix.
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): The TF-IDF matrix of the new catalog.
+        source (np.ndarray): The matching returned by `match_rows`.
+        neighbors (np.ndarray): The previous neighbor table.
+        scores (np.ndarray): The previous similarities.
+        block_size (int): The number of rows compared at a time.
+
+    Returns:
+        tuple: The neighbor positions (int32) and similarities (float16) of the new catalog.
+    """
+    rows = matrix.shape[0]
+    k = min(neighbors.shape[1], rows - 1)
+    kept = source >= 0
+    changed = np.flatnonzero(~kept)
+
+    # Map the previous positions to the new ones (-1 for rows that changed or are gone)
+    new_position = np.full(len(neighbors), -1, dtype=np.int64)
+    new_position[source[kept]] = np.flatnonzero(kept)
+
+    result_neighbors = np.empty((rows, k), dtype=np.int32)
+    result_scores = np.empty((rows, k), dtype=np.float16)
+
+    # Unchanged rows keep a valid list only if none of its entries changed or disappeared
+    unchanged = np.flatnonzero(kept)
+    previous = new_position[neighbors[source[unchanged], :k]]
+    intact = (previous >= 0).all(axis=1)
+
+    patch = unchanged[intact]
+    previous = previous[intact]
+    for start in range(0, len(patch), block_size):
+        block = patch[start:start + block_size]
+        candidates = previous[start:start + block_size]
+        similarities = scores[source[block], :k].astype(np.float32)
+
+        if len(changed):
+            # Add the new and changed rows as candidates
+            fresh = (matrix[block] @ matrix[changed].T).toarray().astype(np.float32)
+            candidates = np.hstack([candidates, np.broadcast_to(changed, fresh.shape)])
+            similarities = np.hstack([similarities, fresh])
+
+        order = np.argsort(-similarities, axis=1, kind='stable')[:, :k]
+        result_neighbors[block] = np.take_along_axis(candidates, order, axis=1)
+        result_scores[block] = np.take_along_axis(similarities, order, axis=1)
+
+    recompute = np.concatenate([changed, unchanged[~intact]])
+    for start in range(0, len(recompute), block_size):
+        block = recompute[start:start + block_size]
+        result_neighbors[block], result_scores[block] = _top_k(matrix, block, k)
+
+    return result_neighbors, result_scores
+
+
+def update_embeddings(matrix, components: np.ndarray) -> np.ndarray:
+    """
+    Embeds a TF-IDF matrix with previously fitted SVD components.
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): The TF-IDF matrix.
+        components (np.ndarray): The components saved next to the previous embeddings.
+
+    Returns:
+        np.ndarray: The L2-normalized embeddings (float32).
+    """
+    return normalize_rows(np.asarray(matrix @ components.T, dtype=np.float32))
+
+
+def latest_artifact(directory: str, exclude: str = None) -> str:
+    """
+    Finds the most recently created artifact of the model directory in the current format.
+
+    Args:
+        directory (str): The model directory.
+        exclude (str): A version to skip, e.g. the one about to be built.
+
+    Returns:
+        str: The version of the latest artifact, or None if there is none.
+    """
+    latest = None
+    if not os.path.isdir(directory):
+        return None
+    for version in os.listdir(directory):
+        metadata_path = os.path.join(directory, version, 'metadata.json')
+        if version == exclude or version.startswith('.') or not os.path.exists(metadata_path):
+            continue
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+        if metadata.get('format') != ARTIFACT_FORMAT:
+            continue
+        created = metadata.get('created', '')
+        if latest is None or created > latest[0]:
+            latest = (created, version)
+    return latest[1] if latest else None
+
+
+class Model:
+    """
+    A recommender artifact loaded from disk.
+
+    Attributes:
+        matrix (scipy.sparse.csr_matrix): The TF-IDF matrix, row i being catalog row i.
+        neighbors (np.ndarray): The precomputed top-K neighbor table, or None.
+        scores (np.ndarray): The similarities matching `neighbors`, or None.
+        embeddings (np.ndarray): The dense row embeddings, or None.
+        ann (LSHIndex): The approximate index, once enabled with `use_lsh`.
+        metadata (dict): The artifact metadata.
+        path (str): The artifact path, passed to `save_neighbors` and `save_embeddings`.
+        generation (str): The generation directory the files were read from.
+    """
+
+    def __init__(self, path: str, metadata: dict, matrix, neighbors=None, scores=None, embeddings=None, generation: str = None):
+        self.path = path
+        self.generation = generation or path
+        self.metadata = metadata
+        self.matrix = matrix
+        self.neighbors = neighbors
+        self.scores = scores
+        self.embeddings = embeddings
+        self.ann = None
+        self._knn = None
+
+    def use_lsh(self, tables: int, bits: int, probes: int):
+        """
+        Switches queries deeper than the neighbor table to the approximate LSH backend.
+
+        Args:
+            tables (int): The number of hash tables.
+            bits (int): The number of code bits per table.
+            probes (int): The number of extra buckets visited per table.
+
+        Raises:
+            ArtifactMismatch: If the artifact has no embeddings.
+        """
+        if self.embeddings is None:
+            raise ArtifactMismatch(f"Recommender artifact '{self.path}' has no embeddings. Run cleaning/build_ann.py.")
+        self.ann = LSHIndex(np.asarray(self.embeddings), tables, bits, probes)
+
+    @property
+    def knn(self) -> NearestNeighbors:
+        """The brute-force cosine KNN model over the matrix, built on first use."""
+        if self._knn is None:
+            knn = NearestNeighbors(metric='cosine', algorithm='brute')
+            knn.fit(self.matrix)
+            self._knn = knn
+        return self._knn
+
+    def precomputed(self, num: int) -> bool:
+        """
+        Tells whether requests for `num` neighbors are served from the precomputed table.
+
+        Args:
+            num (int): The number of neighbors per movie.
+
+        Returns:
+            bool: True if `nearest` only slices the table, which is cheap enough to run inline.
+        """
+        return self.neighbors is not None and min(num, self.matrix.shape[0] - 1) <= self.neighbors.shape[1]
+
+    def nearest(self, positions, num: int):
+        """
+        Returns the most similar movies of each given movie, excluding the movie itself.
+
+        Requests for at most K neighbors are served as a slice of the precomputed table;
+        deeper ones go to the LSH index when enabled, and otherwise to a brute-force KNN query.
+
+        Args:
+            positions (array-like): Catalog positions of the query movies.
+            num (int): The number of neighbors per movie.
+
+        Returns:
+            tuple: Neighbor positions and cosine similarities, each of shape (len(positions), num).
+
+        Raises:
+            ValueError: If num is less than 1.
+        """
+        if num < 1:
+            raise ValueError(f"The number of neighbors must be at least 1, got {num}")
+        positions = np.atleast_1d(np.asarray(positions))
+        num = min(num, self.matrix.shape[0] - 1)
+
+        if self.precomputed(num):
+            return self.neighbors[positions, :num], self.scores[positions, :num].astype(np.float32)
+
+        if self.ann is not None:
+            return self._approximate(positions, num)
+
+        return self._brute(positions, num)
+
+    def _approximate(self, positions, num: int):
+        indices = np.empty((len(positions), num), dtype=np.int64)
+        similarities = np.empty((len(positions), num), dtype=np.float32)
+        short = []
+
+        for row, position in enumerate(positions.tolist()):
+            found, scores = self.ann.query(self.ann.vectors[position], num, exclude=position)
+            if len(found) < num:
+                # Too few candidates in the probed buckets, answer this one exactly
+                short.append(row)
+                continue
+            indices[row] = found
+            similarities[row] = scores
+
+        if short:
+            indices[short], similarities[short] = self._brute(positions[short], num)
+        return indices, similarities
+
+    def _brute(self, positions, num: int):
+        distances, indices = self.knn.kneighbors(self.matrix[positions], n_neighbors=num + 1)
+
+        # Drop each query's own row, or the extra last neighbor when ties pushed it out
+        keep = indices != positions[:, None]
+        keep[keep.all(axis=1), -1] = False
+        indices = indices[keep].reshape(len(positions), num)
+        similarities = (1 - distances[keep]).reshape(len(positions), num)
+        return indices, similarities
+
+    def vectorizer(self) -> TfidfVectorizer:
+        """
+        Rebuilds the fitted vectorizer, e.g. to transform new documents.
+
+        Returns:
+            TfidfVectorizer: A vectorizer with the artifact's vocabulary and IDF weights.
+        """
+        with open(os.path.join(self.generation, 'vocabulary.json')) as file:
+            terms = json.load(file)
+        vectorizer = TfidfVectorizer(**self.metadata['vectorizer'], dtype=np.dtype(self.metadata['dtype']).type)
+        vectorizer.vocabulary_ = {term: index for index, term in enumerate(terms)}
+        vectorizer.idf_ = np.load(os.path.join(self.generation, 'idf.npy'))
+        return vectorizer
+
+
+def load_artifact(directory: str, version: str, rows: int = None) -> Model:
+    """
+    Loads the model artifact fitted on the given catalog version.
+
+    Args:
+        directory (str): The model directory.
+        version (str): The version of the catalog being served.
+        rows (int): The number of catalog rows, checked against the matrix when given.
+
+    Returns:
+        Model: The loaded model.
+
+    Raises:
+        ArtifactMismatch: If there is no artifact for this catalog version, or it is
+            in an unsupported format or does not match the catalog.
+    """
+    path = os.path.join(directory, version)
+
+    # Resolve the link once, so every file comes from the same generation even if a new one is published meanwhile
+    generation = os.path.realpath(path)
+    metadata_path = os.path.join(generation, 'metadata.json')
+    if not os.path.exists(metadata_path):
+        raise ArtifactMismatch(
+            f"No recommender artifact for catalog version {version} in '{directory}'. "
+            f"Run cleaning/build_model.py after rebuilding the catalog."
+        )
+
+    with open(metadata_path) as file:
+        metadata = json.load(file)
+
+    if metadata.get('format') != ARTIFACT_FORMAT:
+        raise ArtifactMismatch(
+            f"Recommender artifact '{path}' has format {metadata.get('format')}, expected {ARTIFACT_FORMAT}. "
+            f"Rebuild it with cleaning/build_model.py."
+        )
+    if metadata.get('catalog_version') != version or (rows is not None and metadata.get('rows') != rows):
+        raise ArtifactMismatch(f"Recommender artifact '{path}' was not built from the catalog being served.")
+
+    # Memory-map the CSR arrays: workers share the page cache instead of each holding a copy
+    matrix = scipy.sparse.csr_matrix(
+        (
+            np.load(os.path.join(generation, 'matrix_data.npy'), mmap_mode='r'),
+            np.load(os.path.join(generation, 'matrix_indices.npy'), mmap_mode='r'),
+            np.load(os.path.join(generation, 'matrix_indptr.npy'), mmap_mode='r'),
+        ),
+        shape=(metadata['rows'], metadata['vocabulary_size']),
+        copy=False,
+    )
+    matrix.has_sorted_indices = True
+
+    # The neighbor table is optional and memory-mapped, so it costs nothing until read
+    neighbors = scores = None
+    if os.path.exists(os.path.join(generation, 'neighbors.npy')):
+        neighbors = np.load(os.path.join(generation, 'neighbors.npy'), mmap_mode='r')
+        scores = np.load(os.path.join(generation, 'scores.npy'), mmap_mode='r')
+
+    # So are the embeddings of the approximate backend
+    embeddings = None
+    if os.path.exists(os.path.join(generation, 'embeddings.npy')):
+        embeddings = np.load(os.path.join(generation, 'embeddings.npy'), mmap_mode='r')
+
+    return Model(path, metadata, matrix, neighbors, scores, embeddings, generation)
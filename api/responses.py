@@ -0,0 +1,88 @@
+"""
+JSON response class shared by every route of the API.
+
+Bodies are serialized compactly. When `orjson` is installed it is used and
+serializes NumPy arrays and scalars natively; otherwise the standard `json`
+module is used, with a `default` hook for the NumPy and pandas types it
+cannot encode. Pretty-printed output is produced on demand by `prettify`,
+for requests carrying `?pretty=1`.
+"""
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def encode_default(value):
+    """
+    Converts the values the JSON encoders do not handle natively.
+
+    Args:
+        value: The value to encode.
+
+    Returns:
+        A JSON-serializable equivalent.
+
+    Raises:
+        TypeError: If the value has no JSON representation.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """
+    Serializes content to compact JSON.
+
+    Args:
+        content: The data to serialize.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=encode_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(content, separators=(',', ':'), ensure_ascii=False, default=encode_default).encode('utf-8')
+
+
+def prettify(body: bytes) -> bytes:
+    """
+    Re-indents a compact JSON body for human readers.
+
+    Args:
+        body (bytes): The compact JSON.
+
+    Returns:
+        bytes: The same document indented by four spaces.
+    """
+    return json.dumps(json.loads(body), indent=4).encode('utf-8')
+
+
+class JSONResponse(Response):
+    """
+    Response rendering its content as compact JSON.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,56 +1,80 @@
-import pandas as pd
-from fastapi import FastAPI, Response, APIRouter
-import json
+from fastapi import APIRouter, Query
+from typing import Literal
+
+from api import config
+from api.executor import get_executor
+from api.responses import JSONResponse
+from api.store import get_store
+from api.serializers import movie_records, page, parse_fields
 
 # Import the FastAPI framework
 router = APIRouter()
 
-# # Read a CSV file containing movie data into a pandas DataFrame
-df = pd.read_pickle('./data/cleaned/movies.pkl')
+# # Use the catalog shared by every router instead of loading a private copy
+store = get_store()
+
+# Inverted index from normalized person name to the rows crediting them
+cast_index = store.person_index('cast')
+
+# Per-actor sums of the revenue and ROI, precomputed now rather than by the first request, which
+# would compute them on the event loop while executor threads may be computing them too
+store.person_totals('cast', 'revenue')
+store.person_totals('cast', 'ROI')
+
+# Bounded pool building the payloads of prolific people off the event loop
+executor = get_executor()
+
+def summarize(actor: str, match: str) -> tuple:
+    """
+    Resolves the actor and computes their totals over every matched movie.
+
+    Args:
+        actor (str): The name of the actor.
+        match (str): The match mode passed to `PersonIndex.search`.
+
+    Returns:
+        tuple: The matched rows, the total revenue, the average revenue and the average ROI.
+    """
+    # Resolve the actor to the rows crediting them with a single index lookup
+    positions = cast_index.search(actor, match)
+
+    # Calculate the total revenue generated by the movies in which the actor appears,
+    # from the per-person sums precomputed over the whole catalog rather than from the page
+    revenue = store.person_total('cast', 'revenue', actor, match, positions)
+
+    # Calculate the average revenue and ROI per movie for the actor, over the movies where they are known
+    avg_revenue = store.person_mean('cast', 'revenue', actor, match, positions)
+    roi = store.person_mean('cast', 'ROI', actor, match, positions)
+    return positions, revenue, avg_revenue, roi
 
 @router.get("/api/v1/actor/{actor}")
-def get_actor(actor: str):
+async def get_actor(actor: str, match: Literal['exact', 'prefix', 'fuzzy'] = 'exact', limit: int = Query(None, ge=1), offset: int = Query(0, ge=0), fields: str = None):
     """
     Endpoint to retrieve information about movies featuring a specific actor.
 
     Args:
         actor (str): The name of the actor.
+        match (str): 'exact' (default) for a case- and accent-insensitive exact name match,
+            'prefix' to include every name starting with `actor`, 'fuzzy' to include close spellings.
+        limit (int): The maximum number of movies to return; all of them by default.
+        offset (int): The number of movies to skip.
+        fields (str): Comma-separated movie fields to return, e.g. 'title,release_year'; all of them by default.
 
     Returns:
         Response: JSON response containing information about the actor's movies.
     """
     
-    # Filter the DataFrame to include only rows where the 'cast' column is not null and contains the specified actor
-    df1 = df[df['cast'].notna() & df['cast'].str.contains(actor)]
+    # Resolve the actor and compute their totals; exact matches are index lookups answered inline,
+    # prefix and fuzzy matches scan the names and go to the bounded executor
+    positions, revenue, avg_revenue, roi = await executor.run(summarize, actor, match, inline=match == 'exact')
     
     # Calculate the total number of movies in which the actor appears
-    movies_count = df1.shape[0]
-    
-    # Calculate the total revenue generated by the movies in which the actor appears
-    revenue = df1['revenue'].sum()
-    
-    # Calculate the average revenue per movie for the actor
-    avg_revenue = df1['revenue'].mean()
+    movies_count = len(positions)
 
-    roi = df1['ROI'].mean()
-
-    # Create a list to store the movie objects
-    movies = []
-    # Iterate over the rows in the filtered DataFrame
-    for _, row in df1.iterrows():
-        # Create a dictionary for each movie with the desired information
-        movie = {
-            "title": row['title'],
-            "release_year": pd.to_datetime(row['release_date']).year,
-            "overview": row['overview'],
-            "budget": row['budget'],
-            "revenue": row['revenue'],
-            "ROI": row['ROI'],
-            "cast": row['cast'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", "),
-            "crew": row['crew'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", ")
-        }
-        # Append the movie dictionary to the movies list
-        movies.append(movie)
+    # Build the movie objects of the requested page and fields, column by column;
+    # large pages are built in the bounded executor so they do not stall the event loop
+    selected = page(positions, limit, offset)
+    movies = await executor.run(movie_records, store, selected, parse_fields(fields), inline=len(selected) <= config.EXECUTOR_INLINE_ROWS)
     
     # Create a dictionary to store the data for the API response
     data = {
@@ -62,11 +86,8 @@ def get_actor(actor: str):
         "movies": movies
     }
     
-    # Convert the data dictionary to a JSON string with proper indentation
-    json_data = json.dumps(data, indent=4)
-    
-    # Create a response object with the JSON data and the appropriate media type
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
     
     # Return the response object
     return response
\ No newline at end of file
@@ -1,51 +1,77 @@
-import pandas as pd
-from fastapi import FastAPI, Response, APIRouter
-import json
+from fastapi import APIRouter, Query
+from typing import Literal
+
+from api import config
+from api.executor import get_executor
+from api.responses import JSONResponse
+from api.store import get_store
+from api.serializers import movie_records, page, parse_fields
 
 # Import the FastAPI framework
 router = APIRouter()
  
-# # Read a CSV file containing movie data into a pandas DataFrame
-df = pd.read_pickle('./data/cleaned/movies.pkl')
+# # Use the catalog shared by every router instead of loading a private copy
+store = get_store()
+
+# Inverted index from normalized person name to the rows crediting them
+crew_index = store.person_index('crew')
+
+# Per-director sums of the revenue and ROI, precomputed now rather than by the first request, which
+# would compute them on the event loop while executor threads may be computing them too
+store.person_totals('crew', 'revenue')
+store.person_totals('crew', 'ROI')
+
+# Bounded pool building the payloads of prolific people off the event loop
+executor = get_executor()
+
+def summarize(director: str, match: str) -> tuple:
+    """
+    Resolves the director and computes their totals over every matched movie.
+
+    Args:
+        director (str): The name of the director.
+        match (str): The match mode passed to `PersonIndex.search`.
+
+    Returns:
+        tuple: The matched rows, the total revenue and the average ROI.
+    """
+    # Resolve the director to the rows crediting them with a single index lookup
+    positions = crew_index.search(director, match)
+
+    # Calculate the total revenue and average ROI from the per-person sums,
+    # so they cover every matched movie and not only the returned page
+    revenue = store.person_total('crew', 'revenue', director, match, positions)
+    roi = store.person_mean('crew', 'ROI', director, match, positions)
+    return positions, revenue, roi
 
 @router.get("/api/v1/director/{director}")
-def get_director(director: str):
+async def get_director(director: str, match: Literal['exact', 'prefix', 'fuzzy'] = 'exact', limit: int = Query(None, ge=1), offset: int = Query(0, ge=0), fields: str = None):
     """
     Endpoint to retrieve information about movies directed by a specific director.
 
     Args:
         director (str): The name of the director.
+        match (str): 'exact' (default) for a case- and accent-insensitive exact name match,
+            'prefix' to include every name starting with `director`, 'fuzzy' to include close spellings.
+        limit (int): The maximum number of movies to return; all of them by default.
+        offset (int): The number of movies to skip.
+        fields (str): Comma-separated movie fields to return, e.g. 'title,release_year'; all of them by default.
 
     Returns:
         Response: JSON response containing information about the director's movies.
     """
     
-    # Filter the DataFrame to include only rows where the 'crew' column is not null and contains the specified director
-    df1 = df[df['crew'].notna() & df['crew'].str.contains(director)]
-    
-    # Create a list to store the movie objects
-    movies = []
+    # Resolve the director and compute their totals; exact matches are index lookups answered inline,
+    # prefix and fuzzy matches scan the names and go to the bounded executor
+    positions, revenue, roi = await executor.run(summarize, director, match, inline=match == 'exact')
     
-    # Iterate over the rows in the filtered DataFrame
-    for _, row in df1.iterrows():
-        # Create a dictionary for each movie with the desired information
-        movie = {
-            "title": row['title'],
-            "release_year": pd.to_datetime(row['release_date']).year,
-            "overview": row['overview'],
-            "budget": row['budget'],
-            "revenue": row['revenue'],
-            "ROI": row['ROI'],
-            "cast": row['cast'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", "),
-            "crew": row['crew'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", ")
-        }
-        # Append the movie dictionary to the movies list
-        movies.append(movie)
+    # Build the movie objects of the requested page and fields, column by column;
+    # large pages are built in the bounded executor so they do not stall the event loop
+    selected = page(positions, limit, offset)
+    movies = await executor.run(movie_records, store, selected, parse_fields(fields), inline=len(selected) <= config.EXECUTOR_INLINE_ROWS)
     
-    # Calculate the total revenue and total movies as before
-    revenue = df1['revenue'].sum()
-    roi = df1['ROI'].mean()
-    movies_count = df1.shape[0]
+    # Calculate the total movies over every match, not only the returned page
+    movies_count = len(positions)
     
     # Create the data dictionary with the updated movies list
     data = {
@@ -56,10 +82,7 @@ def get_director(director: str):
         "movies": movies
     }
 
-    # Convert the data dictionary to JSON format
-    json_data = json.dumps(data, indent=4)
-
-    # Create a JSON response with the JSON data
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
     
     return response
\ No newline at end of file
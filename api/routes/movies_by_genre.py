@@ -1,41 +1,62 @@
-import pandas as pd
-from fastapi import FastAPI, Response, APIRouter
-import json
+from fastapi import APIRouter, Query
+from typing import Literal
+
+from api import config
+from api.executor import get_executor
+from api.responses import JSONResponse
+from api.serializers import movie_records, page, parse_fields
+from api.store import get_store
 
 # Import the FastAPI framework
 router = APIRouter()
 
-# Read a CSV file containing movie data into a pandas DataFrame
-df = pd.read_pickle('./data/cleaned/movies.pkl')
+# Use the catalog shared by every router instead of loading a private copy
+store = get_store()
+
+# Genre index with every genre's movies ranked by vote average and popularity at load time
+genre_index = store.genre_index()
+
+# Bounded pool building large projected pages off the event loop
+executor = get_executor()
 
 @router.get("/api/v1/movies_by_genre/{genre}")
-def movies_by_genre(genre: str):
+async def movies_by_genre(genre: str, mode: Literal['and', 'or'] = 'and', limit: int = Query(None, ge=1), offset: int = Query(0, ge=0), fields: str = None):
     """
     Endpoint to retrieve popular movies of a specific genre.
 
     Args:
-        genre (str): The genre of movies to retrieve.
+        genre (str): The genre of movies to retrieve, matched exactly (case-insensitive).
+            Several genres can be given separated by commas, e.g. 'Action,Comedy'.
+        mode (str): With several genres, 'and' (default) for movies in all of them, 'or' for movies in any.
+        limit (int): The maximum number of movies to return; all of them by default.
+        offset (int): The number of best-ranked movies to skip.
+        fields (str): Comma-separated movie fields, e.g. 'title,vote average'. When given, full
+            movie records with those fields are returned under "movies" instead of the title list.
 
     Returns:
-        Response: JSON response containing the recommended movies.
+        Response: JSON response containing the recommended movies and the total number of matches.
     """
 
-    # Filter the DataFrame to include only rows where the 'genres' column is not null,
-    # contains the specified genre (case-insensitive), and has a vote average greater than 5
-    df1 = df[df['genres'].notna() & df['genres'].str.contains(genre, case=False) & (df['vote_average'] > 5)]
-    
-    # Sort the filtered DataFrame by vote average in descending order
-    df1 = df1.sort_values(by='vote_average', ascending=False)
+    # Get the movies of the genre(s) with a vote average greater than 5,
+    # already sorted by vote average (then popularity) in descending order
+    ranked = genre_index.popular(genre.split(','), mode)
+
+    # Keep only the requested page
+    positions = page(ranked, limit, offset)
 
     # Create a dictionary with the recommended movies
-    data = {
-        "title": df1['title'].tolist()
-    }
-    
-    # Convert the data dictionary to a JSON string with proper indentation
-    json_data = json.dumps(data, indent=4)
+    if fields:
+        data = {
+            "movies": await executor.run(movie_records, store, positions, parse_fields(fields), inline=len(positions) <= config.EXECUTOR_INLINE_ROWS),
+            "total": len(ranked)
+        }
+    else:
+        data = {
+            "title": store.values('title', positions),
+            "total": len(ranked)
+        }
     
-    # Create a response object with the JSON data and the appropriate media type
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
     
-    return response
\ No newline at end of file
+    return response
@@ -1,68 +1,164 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
-from fastapi import FastAPI, Response, APIRouter
-import json
+import numpy as np
+from fastapi import APIRouter, HTTPException, Path
+from pydantic import BaseModel
+from typing import List
+
+from api import config
+from api.indexes import TitleNotFound, AmbiguousTitle
+from api.executor import get_executor
+from api.recommender import load_artifact
+from api.responses import JSONResponse
+from api.store import get_store
 
 # Import the FastAPI framework
 router = APIRouter()
 
-# Load the dataset
-data = pd.read_pickle('./data/cleaned/movies.pkl')
+# Use the catalog shared by every router instead of loading a private copy
+store = get_store()
 
-# Select the desired columns from the dataset
-data = data[['title', 'belongs_to_collection', 'original_language', 'genres', 'overview', 'popularity', 'production_companies', 'production_countries', 'release_date', 'cast', 'crew']]
+# Index from title to row positions
+title_index = store.title_index()
 
-# Combine the features into a single column
-data['features'] = data.apply(lambda x: ' '.join(x.values.astype(str)), axis=1)
+# Load the TF-IDF matrix fitted offline by cleaning/build_model.py for this exact catalog;
+# this raises ArtifactMismatch, and the app refuses to start, if there is none
+model = load_artifact(config.MODEL_DIR, store.version, len(store))
 
-# Create the TF-IDF matrix
-tfidf = TfidfVectorizer(stop_words='english')
-tfidf_matrix = tfidf.fit_transform(data['features'])
+# Answer queries deeper than the neighbor table approximately when configured to
+if config.RECOMMENDER_BACKEND == 'lsh':
+    model.use_lsh(config.ANN_TABLES, config.ANN_BITS, config.ANN_PROBES)
 
-# Create the KNN model
-knn = NearestNeighbors(metric='cosine', algorithm='brute')
-knn.fit(tfidf_matrix)
+# Bounded pool running the KNN queries that cannot be answered from the neighbor table
+executor = get_executor()
 
 @router.get("/api/v1/recommendations/{num}/{title}")
-def get_movie_recommendations(title: str, num: int, knn_model=knn, data_func=lambda: data):
+async def get_movie_recommendations(title: str, num: int = Path(..., ge=1), year: int = None, insensitive: bool = False):
     """
     Endpoint to retrieve movie recommendations based on user input.
 
     Args:
         title (str): The title of the user's favorite movie.
-        num (int): The number of recommendations to retrieve.
-        knn_model (NearestNeighbors): The pre-trained KNN model for recommendation.
-        data_func (function): Function to access the movie data.
+        num (int): The number of recommendations to retrieve, at least 1.
+        year (int): Optional release year, required when several movies share the title.
+        insensitive (bool): Match the title ignoring case and accents.
 
     Returns:
         Response: JSON response containing the movie recommendations.
 
     """
 
-    # Get the index of the movie that matches the title 
-    data = data_func() # Access the data through the function to avoid the truth value error
-    idx = data[data['title'] == title].index[0]
+    # Get the position of the movie that matches the title
+    idx = title_index.resolve(title, year, insensitive)
 
-    # Find the nearest neighbors
-    distances, indices = knn_model.kneighbors(tfidf_matrix[idx], n_neighbors=num+1)
-
-    # Get the indices of the most similar movies (excluding the query movie)
-    movie_indices = indices.flatten()[1:]
+    # Find the nearest neighbors (excluding the query movie); table lookups run inline,
+    # deeper queries go to the bounded executor
+    indices, similarities = await executor.run(model.nearest, idx, num, inline=model.precomputed(num))
 
     # Get the titles of the recommended movies
-    movies = data['title'].iloc[movie_indices].tolist()
+    movies = store.values('title', indices[0])
 
     # Create a dictionary with the movie recommendations
-    data = {
+    response_data = {
         "recommendations": movies
     }
 
-    # Convert the data dictionary to a JSON string with proper indentation
-    json_data = json.dumps(data, indent=4)
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(response_data)
+
+    # Return the response object
+    return response
+
+# Largest number of seed titles accepted by the batch endpoint
+MAX_BATCH_TITLES = 100
+
+
+class BatchRecommendationsRequest(BaseModel):
+    """
+    Body of the batch recommendations endpoint.
+
+    Attributes:
+        titles (list of str): The seed titles.
+        num (int): The number of recommendations per title.
+        merge (bool): Also return one merged list, deduplicated and ranked by summed similarity.
+        insensitive (bool): Match the titles ignoring case and accents.
+    """
+    titles: List[str]
+    num: int = 5
+    merge: bool = False
+    insensitive: bool = False
+
+
+@router.post("/api/v1/recommendations/batch")
+async def get_batch_recommendations(request: BatchRecommendationsRequest):
+    """
+    Endpoint to retrieve recommendations for many seed movies in a single call.
+
+    All seeds are resolved first, then their neighbors are found with one stacked
+    query over their TF-IDF rows.
+
+    Args:
+        request (BatchRecommendationsRequest): The seed titles and options.
+
+    Returns:
+        Response: JSON response with the recommendations of every resolved title, the titles
+        that could not be resolved and, if requested, the merged recommendations.
+    """
+    if not request.titles or len(request.titles) > MAX_BATCH_TITLES:
+        raise HTTPException(status_code=422, detail=f"Between 1 and {MAX_BATCH_TITLES} titles are required")
+    if request.num < 1:
+        raise HTTPException(status_code=422, detail="num must be at least 1")
+
+    # Resolve every seed title, setting aside the unknown and ambiguous ones
+    titles = []
+    positions = []
+    not_found = []
+    ambiguous = []
+    for title in request.titles:
+        try:
+            positions.append(title_index.resolve(title, insensitive=request.insensitive))
+            titles.append(title)
+        except TitleNotFound:
+            not_found.append(title)
+        except AmbiguousTitle as exc:
+            ambiguous.append({"title": title, "matches": exc.matches})
+
+    results = []
+    merged = []
+    if positions:
+        # Find the neighbors of all seeds at once, in the bounded executor unless the table answers
+        positions = np.asarray(positions)
+        indices, similarities = await executor.run(model.nearest, positions, request.num, inline=model.precomputed(request.num))
+
+        # Get the titles of the recommended movies, per seed
+        width = indices.shape[1]
+        recommended = store.values('title', indices.ravel())
+        results = [
+            {"title": title, "recommendations": recommended[seed * width:(seed + 1) * width]}
+            for seed, title in enumerate(titles)
+        ]
+
+        if request.merge:
+            # Sum the similarities of each recommended movie over all seeds, leaving the seeds out
+            candidates, inverse = np.unique(indices.ravel(), return_inverse=True)
+            totals = np.bincount(inverse, weights=similarities.ravel().astype(np.float64))
+            totals[np.isin(candidates, positions)] = -np.inf
+            best = np.argsort(-totals, kind='stable')[:request.num]
+            best = best[np.isfinite(totals[best])]
+            merged = [
+                {"title": title, "score": round(float(score), 6)}
+                for title, score in zip(store.values('title', candidates[best]), totals[best])
+            ]
+
+    # Create a dictionary with the movie recommendations
+    response_data = {
+        "results": results,
+        "not_found": not_found,
+        "ambiguous": ambiguous,
+    }
+    if request.merge:
+        response_data["merged"] = merged
 
-    # Create a response object with the JSON data and the appropriate media type
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(response_data)
 
     # Return the response object
-    return response
\ No newline at end of file
+    return response
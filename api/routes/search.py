@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from api.responses import JSONResponse
+from api.search import KINDS
+from api.store import get_store
+
+# Import the FastAPI framework
+router = APIRouter()
+
+# Typeahead index over titles, people and genres, built once at import so the first keystroke is fast
+search_index = get_store().search_index()
+
+@router.get("/api/v1/search")
+async def search(q: str = '', limit: int = Query(10, ge=1, le=50), kind: str = None):
+    """
+    Endpoint to autocomplete titles, actors, directors and genres.
+
+    Args:
+        q (str): The typed text, matched against the start of any word of a name, ignoring
+            case and accents; an empty query returns the most popular entries.
+        limit (int): The maximum number of matches per kind.
+        kind (str): Comma-separated kinds to search among 'title', 'actor', 'director' and 'genre'; all of them by default.
+
+    Returns:
+        Response: JSON response with the matches of every requested kind, most popular first.
+    """
+
+    # Parse the requested kinds
+    kinds = KINDS if kind is None else [name.strip() for name in kind.split(',') if name.strip()]
+
+    # Look up the query in the sorted suffix arrays of every kind
+    try:
+        data = search_index.search(q, limit, kinds)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    data = {"query": q, **data}
+
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
+
+    return response
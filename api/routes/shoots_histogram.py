@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+
+from api.responses import JSONResponse
+from api.store import get_store
+
+# Import the FastAPI framework
+router = APIRouter()
+
+# Release counts precomputed when the catalog was loaded
+release_cube = get_store().release_cube()
+
+@router.get("/api/v1/shoots_histogram/year")
+async def shoots_histogram_year(start: int = None, end: int = None):
+    """
+    Endpoint to retrieve the number of movies released per year over a range of years.
+
+    Args:
+        start (int): The first year of the range, defaults to the earliest release.
+        end (int): The last year of the range (inclusive), defaults to the latest release.
+
+    Returns:
+        Response: JSON response mapping every year of the range to its number of releases.
+    """
+
+    # Slice the precomputed per-year counts
+    data = {
+        "year": release_cube.year_histogram(start, end)
+    }
+    
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
+    
+    # Return the response object
+    return response
+
+@router.get("/api/v1/shoots_histogram/year_month")
+async def shoots_histogram_year_month(start: int = None, end: int = None):
+    """
+    Endpoint to retrieve the number of movies released per month of every year over a range of years.
+
+    Args:
+        start (int): The first year of the range, defaults to the earliest release.
+        end (int): The last year of the range (inclusive), defaults to the latest release.
+
+    Returns:
+        Response: JSON response mapping every year of the range to its 12 monthly release counts.
+    """
+
+    # Slice the precomputed per-year-month counts
+    data = {
+        "year_month": release_cube.year_month_histogram(start, end)
+    }
+    
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
+    
+    # Return the response object
+    return response
+
+@router.get("/api/v1/shoots_histogram/weekday")
+async def shoots_histogram_weekday():
+    """
+    Endpoint to retrieve the number of movies released per weekday.
+
+    Returns:
+        Response: JSON response mapping every weekday to its number of releases.
+    """
+
+    # Read the precomputed per-weekday counts
+    data = {
+        "weekday": release_cube.weekday_histogram()
+    }
+    
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
+    
+    # Return the response object
+    return response
@@ -1,15 +1,16 @@
-import pandas as pd
-from fastapi import FastAPI, Response, APIRouter
-import json
+from fastapi import APIRouter
+
+from api.responses import JSONResponse
+from api.store import get_store
 
 # Import the FastAPI framework
 router = APIRouter()
 
-# Read a CSV file containing movie data into a pandas DataFrame
-df = pd.read_pickle('./data/cleaned/movies.pkl')
+# Release counts precomputed when the catalog was loaded
+release_cube = get_store().release_cube()
 
 @router.get("/api/v1/shoots_per_month/{month}")
-def shoots_per_month(month: int):
+async def shoots_per_month(month: int):
     """
     Endpoint to retrieve the number of movies released in a specific month.
 
@@ -20,20 +21,17 @@ def shoots_per_month(month: int):
         Response: JSON response containing the number of movies released in the specified month.
     """
 
-    # Filter the DataFrame to include only movies released in the specified month
-    df1 = df[pd.to_datetime(df["release_date"]).dt.month == month]
+    # Look up the precomputed count of movies released in the specified month
+    total_movies = release_cube.per_month(month)
     
     # Create a dictionary to store the data for the API response
     data = {
         "month": month,
-        "total movies": df1.shape[0]
+        "total movies": total_movies
     }
     
-    # Convert the data dictionary to a JSON string with proper indentation
-    json_data = json.dumps(data, indent=4)
-    
-    # Create a response object with the JSON data and the appropriate media type
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
     
     # Return the response object
     return response
\ No newline at end of file
@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+
+from api.responses import JSONResponse
+from api.store import get_store
+
+# Import the FastAPI framework
+router = APIRouter()
+
+# Release counts precomputed when the catalog was loaded
+release_cube = get_store().release_cube()
+
+@router.get("/api/v1/shoots_per_year/{year}")
+async def shoots_per_year(year: int):
+    """
+    Endpoint to retrieve the number of movies released in a specific year.
+
+    Args:
+        year (int): The year.
+
+    Returns:
+        Response: JSON response containing the number of movies released in the specified year.
+    """
+
+    # Look up the precomputed count of movies released in the specified year
+    total_movies = release_cube.per_year(year)
+    
+    # Create a dictionary to store the data for the API response
+    data = {
+        "year": year,
+        "total movies": total_movies
+    }
+    
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
+    
+    # Return the response object
+    return response
@@ -1,27 +1,33 @@
-import pandas as pd
-from fastapi import FastAPI, Response, APIRouter
-import json
+from fastapi import APIRouter
+
+from api.responses import JSONResponse
+from api.store import get_store
 
 # Import the FastAPI framework
 router = APIRouter()
 
-# Read a CSV file containing movie data into a pandas DataFrame
-df = pd.read_pickle('./data/cleaned/movies.pkl')
+# Use the catalog shared by every router instead of loading a private copy
+df = get_store().df
+
+# Index from title to row positions
+title_index = get_store().title_index()
 
 @router.get("/api/v1/title_score/{title}")
-def score_title(title: str):
+async def score_title(title: str, year: int = None, insensitive: bool = False):
     """
     Endpoint to retrieve the score of a movie by its title.
 
     Args:
         title (str): The title of the movie.
+        year (int): Optional release year, required when several movies share the title.
+        insensitive (bool): Match the title ignoring case and accents.
 
     Returns:
         Response: JSON response containing the title, release year, and vote average of the movie.
     """
   
-    # Filter the DataFrame to include only rows where the 'title' column is not null and matches the specified title
-    df1 = df[df['title'].notna() & (df['title'] == title)]
+    # Resolve the title to its row with a single index lookup
+    df1 = df.take([title_index.resolve(title, year, insensitive)])
 
     # Create a dictionary to store the data for the API response
     data = {
@@ -30,11 +36,8 @@ def score_title(title: str):
         "vote average": df1['vote_average'].tolist()[0]
     }
     
-    # Convert the data dictionary to a JSON string with proper indentation
-    json_data = json.dumps(data, indent=4)
-    
-    # Create a response object with the JSON data and the appropriate media type
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
     
     # Return the response object
     return response
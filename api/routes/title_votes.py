@@ -1,28 +1,36 @@
-import pandas as pd
-from fastapi import FastAPI, Response, APIRouter
-import json
+from fastapi import APIRouter
+
+from api.responses import JSONResponse
+from api.store import get_store
 
 # Import the FastAPI framework
 router = APIRouter()
 
-# Read a CSV file containing movie data into a pandas DataFrame
-df = pd.read_pickle('./data/cleaned/movies.pkl')
+# Use the catalog shared by every router instead of loading a private copy
+df = get_store().df
+
+# Index from title to row positions
+title_index = get_store().title_index()
+
+# Only movies with at least 2000 votes are reported by this endpoint
+enough_votes = get_store().column('vote_count') >= 2000
 
 @router.get("/api/v1/title_votes/{title}")
-def title_votes(title: str):
+async def title_votes(title: str, year: int = None, insensitive: bool = False):
     """
     Endpoint to retrieve the vote count and vote average of a movie by its title.
 
     Args:
         title (str): The title of the movie.
+        year (int): Optional release year, required when several movies share the title.
+        insensitive (bool): Match the title ignoring case and accents.
 
     Returns:
         Response: JSON response containing the title, vote count, and vote average of the movie.
     """
         
-    # Filter the DataFrame to include only rows where the 'title' column is not null, matches the specified title,
-    # and has a vote count of at least 2000
-    df1 = df[df['title'].notna() & (df['title'] == title) & (df['vote_count'] >= 2000)]
+    # Resolve the title among the movies with a vote count of at least 2000
+    df1 = df.take([title_index.resolve(title, year, insensitive, where=enough_votes)])
 
     # Create a dictionary to store the data for the API response
     data = {
@@ -31,11 +39,8 @@ def title_votes(title: str):
         "vote average": df1['vote_average'].tolist()[0]
     }
     
-    # Convert the data dictionary to a JSON string with proper indentation
-    json_data = json.dumps(data, indent=4)
-    
-    # Create a response object with the JSON data and the appropriate media type
-    response = Response(content=json_data, media_type="application/json")
+    # Create a JSON response object, serialized compactly by the shared response class
+    response = JSONResponse(data)
     
     # Return the response object
     return response
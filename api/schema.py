@@ -0,0 +1,141 @@
+"""
+Schema of the cleaned catalog file.
+
+`cleaning/data_pickle.py` casts the cleaned DataFrame to `CATALOG_SCHEMA` before
+writing it, and `MovieStore` checks the columns it reads against it, so a
+catalog written by an incompatible pipeline is rejected when the server starts
+instead of failing on the first request that touches the wrong column.
+
+Column kinds:
+
+    numeric      float64 or int64, nulls replaced by 0 for the NUMERIC_COLUMNS of api.store
+    categorical  dictionary-encoded strings (loaded as pandas categoricals)
+    date         date32 (loaded as datetime64)
+    text         plain strings
+    list         lists of names
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Type of the low-cardinality string columns
+CATEGORICAL = pa.dictionary(pa.int32(), pa.string())
+
+# Every column of the catalog, in file order
+CATALOG_SCHEMA = pa.schema([
+    ('belongs_to_collection', CATEGORICAL),
+    ('budget', pa.float64()),
+    ('genres', pa.list_(pa.string())),
+    ('id', pa.int64()),
+    ('original_language', CATEGORICAL),
+    ('overview', pa.string()),
+    ('popularity', pa.float64()),
+    ('production_companies', pa.list_(pa.string())),
+    ('production_countries', pa.list_(pa.string())),
+    ('release_date', pa.date32()),
+    ('revenue', pa.float64()),
+    ('runtime', pa.float64()),
+    ('spoken_languages', pa.list_(pa.string())),
+    ('status', CATEGORICAL),
+    ('tagline', pa.string()),
+    ('title', pa.string()),
+    ('vote_average', pa.float64()),
+    ('vote_count', pa.float64()),
+    ('cast', pa.list_(pa.string())),
+    ('crew', pa.list_(pa.string())),
+    ('release_date_year', pa.int64()),
+    ('ROI', pa.float64()),
+])
+
+
+class SchemaError(ValueError):
+    """Raised when a catalog does not match `CATALOG_SCHEMA`."""
+
+
+def _strings(values: pd.Series) -> list:
+    # Nulls stay null; anything else is stored as its string form
+    return [None if pd.isna(value) else str(value) for value in values.tolist()]
+
+
+def _names(values: pd.Series) -> list:
+    # Lists (or the NumPy arrays Parquet reads them back as) of names; [] for anything else
+    return [[str(name) for name in value] if isinstance(value, (list, tuple, np.ndarray)) else [] for value in values.tolist()]
+
+
+def _column(values: pd.Series, arrow_type) -> pa.Array:
+    """
+    Converts a DataFrame column to an Arrow array of the given type.
+    """
+    if arrow_type == CATEGORICAL:
+        return pa.array(_strings(values), type=pa.string()).dictionary_encode()
+    if pa.types.is_list(arrow_type):
+        return pa.array(_names(values), type=arrow_type)
+    if pa.types.is_date(arrow_type):
+        dates = pd.to_datetime(values, errors='coerce')
+        return pa.Array.from_pandas(dates).cast(arrow_type)
+    if pa.types.is_string(arrow_type):
+        return pa.array(_strings(values), type=arrow_type)
+    return pa.Array.from_pandas(pd.to_numeric(values, errors='coerce'), type=arrow_type)
+
+
+def to_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Casts the cleaned catalog to `CATALOG_SCHEMA`.
+
+    Args:
+        df (pd.DataFrame): The cleaned catalog, with every column of the schema.
+
+    Returns:
+        pa.Table: The catalog as an Arrow table with exactly the schema's columns and types.
+
+    Raises:
+        SchemaError: If a column is missing or cannot be converted to its type.
+    """
+    missing = [name for name in CATALOG_SCHEMA.names if name not in df.columns]
+    if missing:
+        raise SchemaError(f"The catalog lacks the columns {', '.join(missing)}")
+
+    arrays = []
+    for field in CATALOG_SCHEMA:
+        try:
+            arrays.append(_column(df[field.name], field.type))
+        except (pa.ArrowException, TypeError, ValueError) as exc:
+            raise SchemaError(f"Column '{field.name}' cannot be stored as {field.type}: {exc}") from exc
+    return pa.Table.from_arrays(arrays, schema=CATALOG_SCHEMA)
+
+
+def validate(schema: pa.Schema):
+    """
+    Checks the columns of a catalog file against `CATALOG_SCHEMA`.
+
+    Args:
+        schema (pa.Schema): The schema of the file, or of the columns read from it.
+
+    Raises:
+        SchemaError: If a column is unknown or has another type than in `CATALOG_SCHEMA`.
+    """
+    for field in schema:
+        index = CATALOG_SCHEMA.get_field_index(field.name)
+        if index < 0:
+            raise SchemaError(f"Unknown catalog column '{field.name}'")
+        expected = CATALOG_SCHEMA.field(index).type
+        if not field.type.equals(expected):
+            raise SchemaError(f"Catalog column '{field.name}' has type {field.type}, expected {expected}")
+
+
+def table_version(table: pa.Table) -> str:
+    """
+    Computes the version of a catalog from its contents.
+
+    Args:
+        table (pa.Table): The catalog, as returned by `to_table`.
+
+    Returns:
+        str: The first 16 hex digits of the SHA-256 digest of its Arrow serialization.
+    """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema.remove_metadata()) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue()).hexdigest()[:16]
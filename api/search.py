@@ -0,0 +1,283 @@
+"""
+Typeahead search over movie titles, people and genres.
+
+Every searchable name is normalized like the other indexes (accents removed,
+case folded) and indexed under each of its word-suffixes, so 'emp' finds
+'The Empire Strikes Back' and 'ham' finds 'Mark Hamill'. The suffixes are kept
+in one sorted list: the matches of a prefix are a contiguous range found with
+two binary searches, and only that range is ranked by score.
+
+Like the person and title indexes, the search index is held in NumPy arrays
+only, which `MovieStore` persists and memory-maps (see `api.indexes`).
+"""
+import bisect
+
+import numpy as np
+
+from api.indexes import StringTable, normalize, prefixed, unprefixed
+
+# Kinds of entries, in the order they are returned
+KINDS = ('title', 'actor', 'director', 'genre')
+
+# Queries up to this many characters match large ranges; the results of up to
+# SHORT_CACHE_SIZE of them are memoized
+SHORT_QUERY = 2
+SHORT_CACHE_SIZE = 4096
+
+
+class PrefixIndex:
+    """
+    Sorted word-suffix array over a list of names, each with a ranking score.
+    """
+
+    def __init__(self, keys, scores):
+        """
+        Builds the index.
+
+        Args:
+            keys (sequence of str): The normalized names (see `api.indexes.normalize`); None entries are not indexed.
+            scores (sequence of float): The score of every name, higher first.
+        """
+        suffixes = []
+        entries = []
+        full = []
+        for entry, key in enumerate(keys):
+            if not key:
+                continue
+            suffixes.append(key)
+            entries.append(entry)
+            full.append(True)
+            start = key.find(' ')
+            while start >= 0:
+                suffixes.append(key[start + 1:])
+                entries.append(entry)
+                full.append(False)
+                start = key.find(' ', start + 1)
+
+        # Sort the suffixes in C (NumPy strings compare by code point, like Python's)
+        order = np.argsort(np.array(suffixes, dtype=str), kind='stable')
+        self._keys = StringTable.from_strings(suffixes[position] for position in order.tolist())
+        self._entries = np.asarray(entries, dtype=np.int32)[order]
+        self._full = np.asarray(full, dtype=bool)[order]
+        self._scores = np.asarray(scores, dtype=np.float64)
+
+        # Scores aligned with the sorted keys, so a range is ranked without a gather
+        self._key_scores = self._scores[self._entries]
+
+        # Every indexed entry once, best first, for empty queries
+        self._ranked = np.unique(self._entries)
+        self._ranked = self._ranked[np.argsort(-self._scores[self._ranked], kind='stable')]
+        self._short = {}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict) -> 'PrefixIndex':
+        """
+        Rebuilds an index over the arrays returned by `arrays()`.
+
+        Args:
+            arrays (dict): The arrays of the index, e.g. memory-mapped.
+
+        Returns:
+            PrefixIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index._keys = StringTable.from_arrays(unprefixed('keys', arrays))
+        index._entries = arrays['entries']
+        index._full = arrays['full']
+        index._scores = arrays['scores']
+        index._key_scores = arrays['key_scores']
+        index._ranked = arrays['ranked']
+        index._short = {}
+        return index
+
+    def arrays(self) -> dict:
+        """
+        Returns the arrays holding the index.
+
+        Returns:
+            dict: NumPy arrays by name.
+        """
+        return {
+            **prefixed('keys', self._keys.arrays()),
+            'entries': self._entries,
+            'full': self._full,
+            'scores': self._scores,
+            'key_scores': self._key_scores,
+            'ranked': self._ranked,
+        }
+
+    def __len__(self) -> int:
+        return len(self._ranked)
+
+    def search(self, query: str, limit: int = 10) -> np.ndarray:
+        """
+        Returns the best-scored entries with a word starting with the query.
+
+        Args:
+            query (str): The typed text; an empty query matches every entry.
+            limit (int): The maximum number of entries.
+
+        Returns:
+            np.ndarray: Entry positions, each at most once: the names equal to the query
+            first, then the best-scored ones.
+        """
+        query = normalize(query)
+        if not query:
+            return self._ranked[:limit]
+        if len(query) <= SHORT_QUERY:
+            found = self._short.get((query, limit))
+            if found is None:
+                found = self._search(query, limit)
+                if len(self._short) < SHORT_CACHE_SIZE:
+                    self._short[(query, limit)] = found
+            return found
+        return self._search(query, limit)
+
+    def _search(self, query: str, limit: int) -> np.ndarray:
+        start = bisect.bisect_left(self._keys, query)
+        stop = bisect.bisect_left(self._keys, query + '\uffff', start)
+        entries = self._entries[start:stop]
+        scores = self._key_scores[start:stop]
+
+        # Names equal to the query sort first in the range; they lead the results
+        equal = bisect.bisect_right(self._keys, query, start, stop) - start
+        exact = entries[:equal][self._full[start:start + equal]]
+        exact = exact[np.argsort(-self._scores[exact], kind='stable')]
+
+        # Rank only the best candidates; an entry matching through several words takes
+        # several of them, so widen the selection until enough distinct entries remain
+        wanted = limit
+        while True:
+            if wanted < len(entries):
+                best = np.argpartition(-scores, wanted - 1)[:wanted]
+            else:
+                best = np.arange(len(entries))
+            best = best[np.argsort(-scores[best], kind='stable')]
+            found = np.concatenate((exact, entries[best]))
+            _, first = np.unique(found, return_index=True)
+            found = found[np.sort(first)]
+            if len(found) >= limit or wanted >= len(entries):
+                return found[:limit]
+            wanted *= 4
+
+
+class SearchIndex:
+    """
+    Typeahead index over the titles, cast, crew and genres of the catalog.
+
+    Titles are ranked by the popularity of the movie, people and genres by the
+    summed popularity of their movies.
+    """
+
+    def __init__(self, titles, years, popularity, cast_index, crew_index, genres_per_row, ids=None):
+        """
+        Builds the index.
+
+        Args:
+            titles (sequence of str): The title of every catalog row, in row order.
+            years (sequence of int): The release year of every row.
+            popularity (np.ndarray): The popularity of every row.
+            cast_index (PersonIndex): The person index over the 'cast' column.
+            crew_index (PersonIndex): The person index over the 'crew' column.
+            genres_per_row (iterable of list of str): The parsed genres of every row.
+            ids (sequence of int): The movie id of every row, reported with the titles.
+        """
+        self._attach(titles, years, popularity, cast_index, crew_index, ids)
+        self._indexes = {'title': PrefixIndex([normalize(title) if isinstance(title, str) else None for title in titles], self._popularity)}
+
+        # One entry per person, in the slot order of the person index
+        for kind, index in self._people.items():
+            self._indexes[kind] = PrefixIndex(index.keys(), index.totals(self._popularity))
+
+        # One entry per genre, spelled as first seen in the catalog
+        genres = {}
+        for row, names in enumerate(genres_per_row):
+            for name in names:
+                genre = genres.setdefault(normalize(name), [name, 0, 0.0])
+                genre[1] += 1
+                genre[2] += self._popularity[row]
+        self._genres = StringTable.from_strings(name for name, _, _ in genres.values())
+        self._genre_counts = np.array([count for _, count, _ in genres.values()], dtype=np.int64)
+        self._indexes['genre'] = PrefixIndex(list(genres), [score for _, _, score in genres.values()])
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, titles, years, popularity, cast_index, crew_index, ids=None) -> 'SearchIndex':
+        """
+        Rebuilds an index over the arrays returned by `arrays()`.
+
+        Args:
+            arrays (dict): The arrays of the index, e.g. memory-mapped.
+            titles (sequence of str): The title of every catalog row, in row order.
+            years (sequence of int): The release year of every row.
+            popularity (np.ndarray): The popularity of every row.
+            cast_index (PersonIndex): The person index the arrays were built with over the 'cast' column.
+            crew_index (PersonIndex): The person index the arrays were built with over the 'crew' column.
+            ids (sequence of int): The movie id of every row.
+
+        Returns:
+            SearchIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index._attach(titles, years, popularity, cast_index, crew_index, ids)
+        index._indexes = {kind: PrefixIndex.from_arrays(unprefixed(kind, arrays)) for kind in KINDS}
+        index._genres = StringTable.from_arrays(unprefixed('genres', arrays))
+        index._genre_counts = arrays['movies_per_genre']
+        return index
+
+    def _attach(self, titles, years, popularity, cast_index, crew_index, ids):
+        # The catalog columns and person indexes the results are read from
+        self._titles = titles
+        self._years = np.asarray(years)
+        self._ids = None if ids is None else np.asarray(ids)
+        self._popularity = np.nan_to_num(np.asarray(popularity, dtype=np.float64))
+        self._people = {'actor': cast_index, 'director': crew_index}
+
+    def arrays(self) -> dict:
+        """
+        Returns the arrays holding the index.
+
+        Returns:
+            dict: NumPy arrays by name.
+        """
+        arrays = {}
+        for kind, index in self._indexes.items():
+            arrays.update(prefixed(kind, index.arrays()))
+        arrays.update(prefixed('genres', self._genres.arrays()))
+        arrays['movies_per_genre'] = self._genre_counts
+        return arrays
+
+    def search(self, query: str, limit: int = 10, kinds=KINDS) -> dict:
+        """
+        Returns the best matches of the query of every requested kind.
+
+        Args:
+            query (str): The typed text, matched against the start of any word of a name.
+            limit (int): The maximum number of matches per kind.
+            kinds (iterable of str): The kinds to search, among `KINDS`.
+
+        Returns:
+            dict: The matches per kind ('titles', 'actors', 'directors', 'genres'), best first.
+
+        Raises:
+            ValueError: If a kind is unknown.
+        """
+        unknown = [kind for kind in kinds if kind not in self._indexes]
+        if unknown:
+            raise ValueError(f"Unknown search kinds: {', '.join(unknown)}. Available kinds: {', '.join(KINDS)}")
+
+        results = {}
+        for kind in KINDS:
+            if kind not in kinds:
+                continue
+            found = self._indexes[kind].search(query, limit).tolist()
+            if kind == 'title':
+                results['titles'] = [
+                    {"title": self._titles[row], "year": int(self._years[row]), "id": None if self._ids is None else int(self._ids[row]), "popularity": float(self._popularity[row])}
+                    for row in found
+                ]
+            elif kind == 'genre':
+                results['genres'] = [{"name": self._genres[entry], "movies": int(self._genre_counts[entry])} for entry in found]
+            else:
+                index = self._people[kind]
+                results[kind + 's'] = [{"name": name, "movies": index.count(slot)} for name, slot in zip(index.names(found), found)]
+        return results
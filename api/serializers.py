@@ -0,0 +1,107 @@
+"""
+Columnar builders for the list-of-movies payloads returned by the API.
+
+Instead of iterating DataFrame rows, every field is gathered for all selected
+rows at once from the store's columns and the records are zipped together in a
+single pass.
+"""
+import numpy as np
+
+# Fields of a movie record in the person endpoints, in output order
+PERSON_MOVIE_FIELDS = ('title', 'release_year', 'overview', 'budget', 'revenue', 'ROI', 'cast', 'crew')
+
+# Fields of the movie endpoint, in output order
+MOVIE_FIELDS = (
+    'title', 'release_year', 'overview', 'popularity', 'vote average', 'vote count', 'budget', 'revenue', 'ROI', 'cast', 'crew',
+)
+
+# Fields read from plain catalog columns, mapped to their column name
+SCALAR_FIELDS = {
+    'title': 'title',
+    'release_year': 'release_date_year',
+    'overview': 'overview',
+    'budget': 'budget',
+    'revenue': 'revenue',
+    'ROI': 'ROI',
+    'popularity': 'popularity',
+    'vote average': 'vote_average',
+    'vote count': 'vote_count',
+}
+
+# Fields read from list-like columns, returned as lists of names
+LIST_FIELDS = {
+    'cast': 'cast',
+    'crew': 'crew',
+    'genres': 'genres',
+}
+
+# Every field a `fields=` projection may select
+AVAILABLE_FIELDS = tuple(SCALAR_FIELDS) + tuple(LIST_FIELDS)
+
+
+class UnknownField(ValueError):
+    """Raised when a `fields=` projection names a field that does not exist."""
+
+    def __init__(self, fields: list):
+        super().__init__(f"Unknown fields: {', '.join(fields)}. Available fields: {', '.join(AVAILABLE_FIELDS)}")
+        self.fields = fields
+
+
+def parse_fields(fields: str, default=PERSON_MOVIE_FIELDS) -> tuple:
+    """
+    Parses a comma-separated `fields=` projection.
+
+    Args:
+        fields (str): The requested fields, e.g. 'title,release_year'. None or empty selects `default`.
+        default (sequence of str): The fields returned without a projection.
+
+    Returns:
+        tuple of str: The fields in the requested order, without duplicates.
+
+    Raises:
+        UnknownField: If a requested field does not exist.
+    """
+    if not fields:
+        return tuple(default)
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    unknown = [field for field in requested if field not in AVAILABLE_FIELDS]
+    if unknown:
+        raise UnknownField(unknown)
+    return requested
+
+
+def page(positions, limit: int = None, offset: int = 0):
+    """
+    Slices the requested page out of the matched rows.
+
+    Args:
+        positions (np.ndarray): Every matched row, in output order.
+        limit (int): The maximum number of rows; all remaining rows if None.
+        offset (int): The number of rows to skip.
+
+    Returns:
+        np.ndarray: The rows of the page.
+    """
+    return positions[offset:] if limit is None else positions[offset:offset + limit]
+
+
+def movie_records(store, positions, fields=PERSON_MOVIE_FIELDS) -> list:
+    """
+    Builds one dictionary per selected movie.
+
+    Args:
+        store (MovieStore): The catalog.
+        positions (np.ndarray): Row positions of the movies, in output order.
+        fields (sequence of str): The record fields, in output order.
+
+    Returns:
+        list of dict: The movie records.
+    """
+    positions = np.asarray(positions)
+    columns = []
+
+    for field in fields:
+        # Only the selected rows are converted to Python values, from the shared (memory-mapped) columns
+        columns.append(store.values(LIST_FIELDS.get(field) or SCALAR_FIELDS[field], positions))
+
+    return [dict(zip(fields, values)) for values in zip(*columns)]
@@ -0,0 +1,666 @@
+"""
+Shared, in-process data layer for the API.
+
+The cleaned catalog is loaded exactly once per process and every router reads
+from the same `MovieStore` instance instead of unpickling its own copy.
+
+The catalog is an uncompressed Arrow IPC (Feather) file written by
+`cleaning/data_pickle.py` with the typed schema of `api.schema`. That file is
+memory-mapped: numeric columns are zero-copy NumPy views and text columns stay
+in Arrow buffers, so every worker of a multi-process server shares the same
+pages of the OS page cache instead of holding a private copy of the catalog.
+The API only reads the `SERVING_COLUMNS`. Pickles written by older pipelines
+can still be loaded.
+
+The person, title and search indexes are built by the pipeline too: the
+catalog's `indexes/<catalog version>/` directory holds their arrays as .npy
+files (see `build_indexes`), which are memory-mapped as well. When the
+directory is missing, the store builds the indexes in memory on first use.
+"""
+import ast
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from api import config
+from api.aggregates import ReleaseCube
+from api.indexes import GenreIndex, PersonIndex, TitleIndex, prefixed, unprefixed
+from api.schema import CATALOG_SCHEMA, table_version, to_table, validate
+from api.search import SearchIndex
+
+# Numeric columns and the dtype they are coerced to when the catalog is loaded
+NUMERIC_COLUMNS = {
+    'id': 'int64',
+    'budget': 'float64',
+    'revenue': 'float64',
+    'ROI': 'float64',
+    'popularity': 'float64',
+    'vote_average': 'float64',
+    'vote_count': 'float64',
+    'release_date_year': 'int64',
+}
+
+# Columns read by the API; the recommender features and the other columns are only needed offline
+SERVING_COLUMNS = [
+    'id', 'title', 'overview', 'release_date', 'release_date_year', 'budget', 'revenue', 'ROI',
+    'popularity', 'vote_average', 'vote_count', 'genres', 'cast', 'crew',
+]
+
+# Columns holding lists of names
+LIST_COLUMNS = [field.name for field in CATALOG_SCHEMA if pa.types.is_list(field.type)]
+
+# Schema metadata key of the Arrow catalog holding its version
+ARROW_VERSION_KEY = b'movie_mentor_version'
+
+# Person columns, and the per-person sums of numeric columns the routes read, persisted with the indexes
+PERSON_COLUMNS = ('cast', 'crew')
+PERSON_TOTALS = (('cast', 'revenue'), ('cast', 'ROI'), ('crew', 'revenue'), ('crew', 'ROI'))
+
+# Version of the layout of the persisted indexes; bump it whenever their arrays or their meaning change
+INDEX_FORMAT = 1
+
+
+def catalog_version(path: str) -> str:
+    """
+    Returns the version of a catalog file.
+
+    Arrow catalogs carry their version in their schema metadata, so only the
+    file footer is read; other files are hashed.
+
+    Args:
+        path (str): Location of the catalog file.
+
+    Returns:
+        str: The first 16 hex digits of a SHA-256 digest of the catalog's contents.
+    """
+    if path.endswith(('.arrow', '.feather')):
+        with pa.memory_map(path) as source:
+            version = (pa.ipc.open_file(source).schema.metadata or {}).get(ARROW_VERSION_KEY)
+        if version:
+            return version.decode()
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def parse_names(value) -> list:
+    """
+    Parses a list-like catalog cell (e.g. cast or crew) into a list of names.
+
+    The cleaning pipeline stores these columns as real lists. Catalogs written
+    by older pipelines hold the `str()` of a Python list instead, so those are
+    decoded once here rather than on every request.
+
+    Args:
+        value: The cell value: a list, an array, its string representation, or a null.
+
+    Returns:
+        list of str: The names, empty for nulls.
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if not isinstance(value, str):
+        return []
+    try:
+        names = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        # Fall back to the historical split for values that are not valid literals
+        names = value.replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", ")
+    if not isinstance(names, (list, tuple)):
+        return []
+    return [str(name) for name in names if name]
+
+
+def coerce_numeric(df: pd.DataFrame, keep_missing: bool = False) -> pd.DataFrame:
+    """
+    Gives the numeric columns their `NUMERIC_COLUMNS` dtype, with nulls replaced by 0.
+
+    Columns that already have that dtype and no nulls are left untouched, so
+    memory-mapped columns are not copied.
+
+    Args:
+        df (pd.DataFrame): The catalog, modified in place.
+        keep_missing (bool): Leave the nulls of the float columns as NaN, e.g. to write them
+            to the catalog file, where `MovieStore` records which values are missing.
+
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    for column, dtype in NUMERIC_COLUMNS.items():
+        if column in df.columns:
+            if df[column].dtype == dtype and not df[column].isna().any():
+                continue
+            values = pd.to_numeric(df[column], errors='coerce')
+            if not (keep_missing and dtype == 'float64'):
+                values = values.fillna(0)
+            df[column] = values.astype(dtype)
+    return df
+
+
+def write_arrow(df: pd.DataFrame, path: str) -> str:
+    """
+    Writes the catalog as an uncompressed, typed Arrow IPC file that `MovieStore.load` memory-maps.
+
+    Args:
+        df (pd.DataFrame): The cleaned catalog.
+        path (str): Location of the file, conventionally ending in '.arrow'.
+
+    Returns:
+        str: The catalog version, a hash of the table's contents, also stored in the file's metadata.
+
+    Raises:
+        SchemaError: If the catalog does not fit `api.schema.CATALOG_SCHEMA`.
+    """
+    table = to_table(coerce_numeric(df.reset_index(drop=True).copy(), keep_missing=True))
+    version = table_version(table)
+    table = table.replace_schema_metadata({ARROW_VERSION_KEY: version.encode()})
+
+    # Write next to the target and move it into place, so serving processes never map a partial file
+    staging = path + '.tmp'
+    feather.write_feather(table, staging, compression='uncompressed')
+    os.replace(staging, path)
+    return version
+
+
+def index_directory(path: str, version: str) -> str:
+    """
+    Returns the directory holding the persisted indexes of a catalog.
+
+    Args:
+        path (str): Location of the catalog file.
+        version (str): The catalog version.
+
+    Returns:
+        str: `indexes/<version>` next to the catalog file.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(path)), 'indexes', version)
+
+
+def save_arrays(directory: str, arrays: dict):
+    """
+    Writes named arrays as .npy files, with a metadata.json listing them.
+
+    The files are written to a staging directory that is then renamed, so a loading
+    process sees either every array or none.
+
+    Args:
+        directory (str): The directory to create (replaced if it exists).
+        arrays (dict): NumPy arrays by name.
+    """
+    parent, name = os.path.split(directory)
+    os.makedirs(parent, exist_ok=True)
+    staging = os.path.join(parent, f'.{name}.{time.time_ns()}')
+    os.makedirs(staging)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(staging, array_name + '.npy'), np.ascontiguousarray(array))
+    with open(os.path.join(staging, 'metadata.json'), 'w') as file:
+        json.dump({"format": INDEX_FORMAT, "arrays": sorted(arrays)}, file, indent=4)
+
+    # A directory cannot replace a non-empty one, so a previous one is moved aside first
+    stale = None
+    if os.path.exists(directory):
+        stale = staging + '.stale'
+        os.replace(directory, stale)
+    os.replace(staging, directory)
+    if stale:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def load_arrays(directory: str) -> dict:
+    """
+    Memory-maps the arrays written by `save_arrays`.
+
+    Args:
+        directory (str): The directory.
+
+    Returns:
+        dict: Read-only NumPy arrays by name; empty if the directory is missing or in another format.
+    """
+    metadata_path = os.path.join(directory, 'metadata.json')
+    if not os.path.exists(metadata_path):
+        return {}
+    with open(metadata_path) as file:
+        metadata = json.load(file)
+    if metadata.get('format') != INDEX_FORMAT:
+        return {}
+    return {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name in metadata['arrays']}
+
+
+def _arrow_types(arrow_type):
+    # Keep text and list columns in their (memory-mapped) Arrow buffers instead of Python objects
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) or pa.types.is_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+class MovieStore:
+    """
+    Read-only view over the cleaned movie catalog.
+
+    Rows are addressed by position (0..n-1). Routes must treat `df` and every
+    array returned by `column()` as immutable, since they are shared by all
+    requests handled by the process.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: str = None, indexes: dict = None):
+        # Positions are the only row identifiers used by the indexes built on top of the store
+        # (skipped when the index already is 0..n-1, since resetting copies every column, mapped ones included)
+        if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+            df = df.reset_index(drop=True)
+
+        # Remember which numeric values are missing before they are filled with 0, so averages
+        # skip them (a column without missing values needs no mask)
+        self._known = {
+            column: df[column].notna().to_numpy()
+            for column in NUMERIC_COLUMNS
+            if column in df.columns and df[column].isna().any()
+        }
+
+        # Give the numeric columns a stable dtype regardless of how the artifact was written
+        coerce_numeric(df)
+
+        self._df = df
+        self._columns = {}
+
+        # Content hash of the catalog file, used to match derived artifacts to this catalog
+        self.version = version
+
+        # Persisted index arrays, by name (see `index_arrays`); the indexes they lack are built on first use
+        self._indexes = indexes or {}
+        self._person_indexes = {}
+        self._person_totals = {}
+        self._title_index = None
+        self._genre_index = None
+        self._release_cube = None
+        self._search_index = None
+
+    @classmethod
+    def load(cls, path: str = None, columns: list = None) -> 'MovieStore':
+        """
+        Loads the catalog written by the cleaning pipeline.
+
+        Files ending in '.arrow' or '.feather' are memory-mapped; anything else is read as a legacy pickle.
+
+        Args:
+            path (str): Location of the catalog. Defaults to `config.CATALOG_PATH`.
+            columns (list of str): The columns to load; all of them by default.
+
+        Returns:
+            MovieStore: The loaded store.
+        """
+        path = path or config.CATALOG_PATH
+        if path.endswith(('.arrow', '.feather')):
+            return cls.load_arrow(path, columns)
+        df = pd.read_pickle(path)
+        if columns is not None:
+            df = df[[column for column in columns if column in df.columns]]
+        version = catalog_version(path)
+        return cls(df, version, load_arrays(index_directory(path, version)))
+
+    @classmethod
+    def load_arrow(cls, path: str, columns: list = None) -> 'MovieStore':
+        """
+        Memory-maps an Arrow IPC catalog written by `write_arrow`, and the indexes persisted next to it.
+
+        Args:
+            path (str): Location of the file.
+            columns (list of str): The columns to load; all of them by default.
+
+        Returns:
+            MovieStore: The store, backed by the mapped file.
+
+        Raises:
+            SchemaError: If a column does not have the type of `api.schema.CATALOG_SCHEMA`.
+        """
+        # Read the whole mapped table and select the columns afterwards: `feather.read_table(columns=...)`
+        # copies the selected columns out of the map
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        validate(table.schema)
+        version = (table.schema.metadata or {}).get(ARROW_VERSION_KEY)
+        version = version.decode() if version else catalog_version(path)
+
+        # `split_blocks` keeps each numeric column a zero-copy view of its mapped buffer
+        df = table.to_pandas(split_blocks=True, types_mapper=_arrow_types, date_as_object=False)
+        return cls(df, version, load_arrays(index_directory(path, version)))
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The shared catalog DataFrame. Do not modify it."""
+        return self._df
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Returns a read-only NumPy view of a catalog column.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            np.ndarray: The column values, flagged as non-writeable.
+        """
+        values = self._columns.get(name)
+        if values is None:
+            values = self._df[name].to_numpy()
+            # Work on a view so flagging it does not affect the DataFrame's own buffer
+            values = values.view()
+            values.flags.writeable = False
+            self._columns[name] = values
+        return values
+
+    def values(self, name: str, positions) -> list:
+        """
+        Returns the values of a catalog column at the given rows as Python objects, e.g. for a JSON payload.
+
+        Only the selected rows are converted: text and list columns are gathered out of their
+        Arrow buffers, and list-like columns are parsed like `names` does.
+
+        Args:
+            name (str): The column name.
+            positions (array-like): Row positions.
+
+        Returns:
+            list: One value per position, in the order given.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        series = self._df[name]
+        if isinstance(series.dtype, pd.ArrowDtype):
+            values = series.array.__arrow_array__().take(positions).combine_chunks()
+            if pa.types.is_list(values.type):
+                # Converting all the names at once through NumPy is much faster than `to_pylist()`
+                names = values.flatten().to_numpy(zero_copy_only=False).tolist()
+                ends = np.cumsum(pc.list_value_length(values).fill_null(0).to_numpy()).tolist()
+                return [names[start:end] for start, end in zip([0] + ends[:-1], ends)]
+            values = values.to_numpy(zero_copy_only=False).tolist()
+        elif series.dtype == object:
+            values = series.to_numpy()[positions].tolist()
+        else:
+            # `tolist()` converts NumPy scalars to native Python values
+            return self.column(name)[positions].tolist()
+        if name in LIST_COLUMNS:
+            return [parse_names(value) for value in values]
+        return values
+
+    def names(self, column: str) -> list:
+        """
+        Returns a list-like column (cast, crew, genres, ...) parsed into lists of names.
+
+        The lists are not kept: they are meant for building indexes. Requests read rows with `values`.
+
+        Args:
+            column (str): The column name.
+
+        Returns:
+            list of list of str: One list per row, in row order.
+        """
+        return [parse_names(value) for value in self._df[column].tolist()]
+
+    def person_index(self, column: str) -> PersonIndex:
+        """
+        Returns the inverted person index over the 'cast' or 'crew' column.
+
+        Args:
+            column (str): The column name.
+
+        Returns:
+            PersonIndex: The persisted index, or one built on first use.
+        """
+        index = self._person_indexes.get(column)
+        if index is None:
+            arrays = unprefixed(column, self._indexes)
+            index = PersonIndex.from_arrays(arrays) if arrays else PersonIndex(self.names(column))
+            self._person_indexes[column] = index
+        return index
+
+    def known(self, name: str) -> np.ndarray:
+        """
+        Returns which rows of a numeric column hold a value, as opposed to a missing one stored as 0.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            np.ndarray: A boolean mask, or None if no value of the column is missing.
+        """
+        return self._known.get(name)
+
+    def person_totals(self, column: str, value_column: str) -> tuple:
+        """
+        Returns the per-person sums of a numeric column, built on first use.
+
+        Routes call it when they are imported, as they do for the other indexes, so that
+        requests only read the sums.
+
+        Args:
+            column (str): The person column, 'cast' or 'crew'.
+            value_column (str): The numeric column to sum, e.g. 'revenue'.
+
+        Returns:
+            tuple: One float64 sum per person slot, and one count of known values per slot,
+                or None if no value of the column is missing.
+        """
+        totals = self._person_totals.get((column, value_column))
+        if totals is None:
+            name = f'totals_{column}_{value_column}'
+            if name + '_sums' in self._indexes:
+                totals = (self._indexes[name + '_sums'], self._indexes.get(name + '_counts'))
+            else:
+                index = self.person_index(column)
+                known = self.known(value_column)
+                totals = (index.totals(self.column(value_column)), None if known is None else index.totals(known))
+            self._person_totals[(column, value_column)] = totals
+        return totals
+
+    def _person_sums(self, column: str, value_column: str, name: str, match: str, positions) -> tuple:
+        # Exact matches read the per-person sums precomputed over the whole index;
+        # prefix and fuzzy matches, which may merge several people, sum the matched rows
+        index = self.person_index(column)
+        slot = index.slot(name) if match == 'exact' else None
+        if slot is not None:
+            sums, counts = self.person_totals(column, value_column)
+            return float(sums[slot]), None if counts is None else float(counts[slot])
+
+        if positions is None:
+            positions = index.search(name, match)
+        known = self.known(value_column)
+        total = float(self.column(value_column)[positions].sum())
+        return total, None if known is None else float(known[positions].sum())
+
+    def person_total(self, column: str, value_column: str, name: str, match: str = 'exact', positions=None) -> float:
+        """
+        Returns the sum of a numeric column over the movies crediting a person.
+
+        Args:
+            column (str): The person column, 'cast' or 'crew'.
+            value_column (str): The numeric column to sum, e.g. 'revenue'.
+            name (str): The person's name.
+            match (str): The match mode passed to `PersonIndex.search`.
+            positions (np.ndarray): The matched rows, if already resolved.
+
+        Returns:
+            float: The sum over every matched movie, regardless of paging.
+        """
+        return self._person_sums(column, value_column, name, match, positions)[0]
+
+    def person_mean(self, column: str, value_column: str, name: str, match: str = 'exact', positions=None) -> float:
+        """
+        Returns the average of a numeric column over the movies crediting a person, skipping missing values.
+
+        Args:
+            column (str): The person column, 'cast' or 'crew'.
+            value_column (str): The numeric column to average, e.g. 'revenue'.
+            name (str): The person's name.
+            match (str): The match mode passed to `PersonIndex.search`.
+            positions (np.ndarray): The matched rows, if already resolved.
+
+        Returns:
+            float: The average over every matched movie with a value, NaN if there is none.
+        """
+        if positions is None:
+            positions = self.person_index(column).search(name, match)
+
+        # Missing values are stored as 0, so they add nothing to the sum; only the count must skip them
+        total, count = self._person_sums(column, value_column, name, match, positions)
+        if count is None:
+            count = len(positions)
+        if not count:
+            return float('nan')
+        return total / count
+
+    def title_index(self) -> TitleIndex:
+        """
+        Returns the title index.
+
+        Returns:
+            TitleIndex: The persisted index over the 'title' column, or one built on first use.
+        """
+        if self._title_index is None:
+            # The index reports titles straight from the column's buffers rather than from a list of its own
+            titles = self._df['title'].array
+            ids = self.column('id') if 'id' in self._df.columns else None
+            arrays = unprefixed('title', self._indexes)
+            if arrays:
+                self._title_index = TitleIndex.from_arrays(arrays, titles, self.column('release_date_year'), ids)
+            else:
+                self._title_index = TitleIndex(titles, self.column('release_date_year'), ids)
+        return self._title_index
+
+    def genre_index(self) -> GenreIndex:
+        """
+        Returns the genre index, built on first use.
+
+        Returns:
+            GenreIndex: The index over the 'genres' column.
+        """
+        if self._genre_index is None:
+            self._genre_index = GenreIndex(self.names('genres'), self.column('vote_average'), self.column('popularity'))
+        return self._genre_index
+
+    def release_cube(self) -> ReleaseCube:
+        """
+        Returns the release date aggregates, built on first use.
+
+        Returns:
+            ReleaseCube: The aggregates over the 'release_date' column.
+        """
+        if self._release_cube is None:
+            self._release_cube = ReleaseCube(self._df['release_date'].tolist())
+        return self._release_cube
+
+    def search_index(self) -> SearchIndex:
+        """
+        Returns the typeahead index over titles, people and genres.
+
+        Returns:
+            SearchIndex: The persisted index, or one built on first use, ranked by the 'popularity' column.
+        """
+        if self._search_index is None:
+            columns = (
+                self._df['title'].array,
+                self.column('release_date_year'),
+                self.column('popularity'),
+                self.person_index('cast'),
+                self.person_index('crew'),
+            )
+            ids = self.column('id') if 'id' in self._df.columns else None
+            arrays = unprefixed('search', self._indexes)
+            if arrays:
+                self._search_index = SearchIndex.from_arrays(arrays, *columns, ids)
+            else:
+                self._search_index = SearchIndex(*columns, self.names('genres'), ids)
+        return self._search_index
+
+    def index_arrays(self) -> dict:
+        """
+        Returns the arrays of the person, title and search indexes and of the `PERSON_TOTALS`.
+
+        Returns:
+            dict: NumPy arrays by name, as `save_arrays` writes them and the store reads them back.
+        """
+        arrays = {}
+        for column in PERSON_COLUMNS:
+            arrays.update(prefixed(column, self.person_index(column).arrays()))
+        arrays.update(prefixed('title', self.title_index().arrays()))
+        arrays.update(prefixed('search', self.search_index().arrays()))
+        for column, value_column in PERSON_TOTALS:
+            sums, counts = self.person_totals(column, value_column)
+            arrays[f'totals_{column}_{value_column}_sums'] = sums
+            if counts is not None:
+                arrays[f'totals_{column}_{value_column}_counts'] = counts
+        return arrays
+
+    def take(self, positions) -> pd.DataFrame:
+        """
+        Returns the catalog rows at the given positions.
+
+        Args:
+            positions (array-like): Row positions.
+
+        Returns:
+            pd.DataFrame: The selected rows, in the order given.
+        """
+        return self._df.take(positions)
+
+
+def build_indexes(path: str, keep=()) -> str:
+    """
+    Builds the indexes of a catalog file and persists them next to it, where `MovieStore.load` memory-maps them.
+
+    Nothing is rebuilt if the indexes of this catalog version already exist. The
+    indexes of the other versions are removed, except those listed in `keep`.
+
+    Args:
+        path (str): Location of the catalog file.
+        keep (iterable of str): Catalog versions whose indexes must be kept, e.g. the one
+            still served by running processes.
+
+    Returns:
+        str: The directory holding the indexes.
+    """
+    store = MovieStore.load(path, columns=SERVING_COLUMNS)
+    directory = index_directory(path, store.version)
+    if not load_arrays(directory):
+        save_arrays(directory, store.index_arrays())
+
+    parent = os.path.dirname(directory)
+    for name in os.listdir(parent):
+        if name != store.version and name not in keep:
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+    return directory
+
+
+_store = None
+_lock = threading.Lock()
+
+
+def get_store() -> MovieStore:
+    """
+    Returns the process-wide `MovieStore`, loading it on first use.
+
+    Returns:
+        MovieStore: The shared store.
+    """
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = MovieStore.load(columns=SERVING_COLUMNS)
+    return _store
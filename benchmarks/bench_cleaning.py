@@ -0,0 +1,67 @@
+'''
+Benchmark of the cleaning pipeline's `--jobs` option.
+
+Runs `cleaning/data_cleaning.py` once per job count, checks that every run writes
+byte-identical "movies.csv" and "movies.parquet" files, and reports the wall
+time and speedup over the serial run. The outputs of the real pipeline are
+overwritten, with the same contents.
+
+Run from the repository root, with the raw datasets in "data/not cleaned/":
+
+    python benchmarks/bench_cleaning.py [--jobs 1 2 4 8] [--repeat 3] [--chunksize 10000]
+'''
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import time
+
+# The cleaning script resolves its paths relative to the "cleaning" directory
+CLEANING_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cleaning')
+OUTPUTS = ['../data/cleaned/movies.csv', '../data/cleaned/movies.parquet']
+
+
+def digest(path):
+    '''
+    Returns the SHA-256 digest of a file.
+    '''
+    with open(os.path.join(CLEANING_DIR, path), 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def run(jobs, chunksize):
+    '''
+    Runs the cleaning script once and returns its wall time and the digests of its outputs.
+    '''
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, 'data_cleaning.py', '--jobs', str(jobs), '--chunksize', str(chunksize)],
+        cwd=CLEANING_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start, [digest(path) for path in OUTPUTS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8], help='job counts to compare')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per job count, the best one is reported')
+    parser.add_argument('--chunksize', type=int, default=10000, help='rows of the raw files read at a time')
+    args = parser.parse_args()
+
+    # The serial run is the reference for both the timing and the outputs
+    job_counts = [1] + [jobs for jobs in args.jobs if jobs != 1]
+    baseline = reference = None
+
+    print(f"{'jobs':>4}  {'time':>9}  {'speedup':>7}  output")
+    for jobs in job_counts:
+        runs = [run(jobs, args.chunksize) for _ in range(args.repeat)]
+        best = min(elapsed for elapsed, _ in runs)
+        if reference is None:
+            baseline, reference = best, runs[0][1]
+        identical = all(digests == reference for _, digests in runs)
+        print(f"{jobs:>4}  {best:8.2f}s  {baseline / best:6.2f}x  {'identical' if identical else 'DIFFERENT'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+"""
+The script reduces the recommender's TF-IDF matrix to dense embeddings with a TruncatedSVD and adds
+them to the current artifact directory as "embeddings.npy" and "svd_components.npy". They back the
+approximate (LSH) recommender backend, enabled with MOVIE_MENTOR_RECOMMENDER_BACKEND=lsh; use
+evaluate_ann.py to choose its settings. With --float16 the embeddings are stored in half precision,
+which halves them; evaluate_compact.py reports how close their neighbors are to the TF-IDF ones.
+
+Run it after build_model.py, from the "cleaning" directory:
+
+    python build_ann.py [--components 128] [--float16]
+"""
+
+# Make the `api` package importable from the cleaning directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.ann import fit_embeddings
+from api.recommender import load_artifact, save_embeddings
+from api.store import catalog_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the dense embeddings of the approximate recommender backend.')
+    parser.add_argument('--components', type=int, default=128, help='embedding dimension')
+    parser.add_argument('--float16', action='store_true', help='store the embeddings in half precision')
+    args = parser.parse_args()
+
+    # Load the artifact built for the current catalog
+    model = load_artifact('../data/model', catalog_version('../data/cleaned/movies.arrow'))
+
+    # Fit the SVD and save the embeddings next to the TF-IDF matrix
+    start = time.perf_counter()
+    embeddings, components = fit_embeddings(model.matrix, args.components)
+    if args.float16:
+        embeddings = embeddings.astype(np.float16)
+    save_embeddings(model.path, embeddings, components)
+
+    print(f"Wrote {embeddings.shape[1]}-dimensional {embeddings.dtype} embeddings of {embeddings.shape[0]} movies to {model.path} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+
+"""
+The script fits the recommender's TF-IDF model on the cleaned catalog and writes it to a versioned
+artifact directory, "../data/model/<catalog version>/", where the catalog version is the hash of
+the contents of "movies.arrow" recorded in that file. The API and the Streamlit app load this artifact instead of fitting the model when
+they start, and refuse to start if no artifact matches the catalog they serve.
+
+The weights are stored in float32 by default, which halves the matrix without changing the
+recommendations. --min-df and --max-df prune rare and common terms to shrink it further, at the
+cost of some recall; evaluate_compact.py reports both for a range of settings.
+
+Run it after data_cleaning.py and data_pickle.py, from the "cleaning" directory:
+
+    python build_model.py [--dtype float32] [--min-df 1] [--max-df 1.0]
+"""
+
+# Make the `api` package importable from the cleaning directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.recommender import VECTORIZER_PARAMS, fit, row_fingerprints, save_artifact
+from api.store import MovieStore
+
+
+def document_frequency(value):
+    # An integer is a document count, a decimal a share of the catalog, as for TfidfVectorizer
+    return float(value) if '.' in value else int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit the recommender model for the current catalog.')
+    parser.add_argument('--dtype', choices=['float32', 'float64'], default='float32', help='precision of the TF-IDF weights')
+    parser.add_argument('--min-df', type=document_frequency, default=VECTORIZER_PARAMS['min_df'],
+                        help='ignore the terms found in fewer movies (a count, or a share such as 0.001)')
+    parser.add_argument('--max-df', type=document_frequency, default=VECTORIZER_PARAMS['max_df'],
+                        help='ignore the terms found in more movies (a count, or a share such as 0.5)')
+    args = parser.parse_args()
+
+    # Load the catalog exactly as the serving processes do, so that matrix rows line up with catalog positions
+    store = MovieStore.load('../data/cleaned/movies.arrow')
+
+    # Fit the TF-IDF model on the combined features
+    vectorizer, matrix = fit(store.df, dtype=args.dtype, min_df=args.min_df, max_df=args.max_df)
+
+    # Write the versioned artifact, with the row fingerprints used by update_model.py
+    ids, fingerprints = row_fingerprints(store.df)
+    path = save_artifact('../data/model', store.version, vectorizer, matrix, ids, fingerprints)
+
+    size = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    print(f"Wrote {matrix.shape[0]} x {matrix.shape[1]} {matrix.dtype} TF-IDF matrix ({size / 2 ** 20:.1f} MiB) "
+          f"for catalog version {store.version} to {path}")
+
+
+if __name__ == '__main__':
+    main()
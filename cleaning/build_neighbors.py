@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+
+"""
+The script precomputes the top-K most similar movies of every movie of the catalog, from the TF-IDF
+matrix written by build_model.py, and adds them to the same artifact directory as "neighbors.npy"
+(int32 positions) and "scores.npy" (float16 cosine similarities). The API then serves any request
+for at most K recommendations as a slice of this table instead of running a KNN query.
+
+The all-pairs computation is done in blocks of rows spread over a process pool.
+
+Run it after build_model.py, from the "cleaning" directory:
+
+    python build_neighbors.py [--k 100] [--jobs N] [--block-size 256]
+"""
+
+# Make the `api` package importable from the cleaning directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.recommender import load_artifact, save_neighbors, top_k_neighbors
+from api.store import catalog_version
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute the top-K neighbor table of the recommender.')
+    parser.add_argument('--k', type=int, default=100, help='number of neighbors kept per movie')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--block-size', type=int, default=256, help='rows per task')
+    args = parser.parse_args()
+
+    # Load the artifact built for the current catalog
+    model = load_artifact('../data/model', catalog_version('../data/cleaned/movies.arrow'))
+
+    # Compute and save the neighbor table
+    start = time.perf_counter()
+    neighbors, scores = top_k_neighbors(model.matrix, args.k, args.block_size, args.jobs)
+    save_neighbors(model.path, neighbors, scores)
+
+    print(f"Wrote top-{neighbors.shape[1]} neighbors of {neighbors.shape[0]} movies to {model.path} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
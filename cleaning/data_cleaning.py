@@ -1,30 +1,48 @@
+import argparse
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-import ast
-import re
 
 """
 The script starts by importing necessary libraries and setting display options for Pandas.
-It then reads two CSV files, "movies_dataset.csv" and "credits.csv", into separate DataFrames.
-The script defines various utility functions to remove null values, convert values to strings,
-extract names from string values, fill null values with zeros, clean date columns, calculate
+It then reads the CSV files "movies_dataset.csv" and "credits1.csv" to "credits3.csv" in chunks of
+`--chunksize` rows (10000 by default), every column read as text. The script defines various utility
+functions to extract names from the raw values, remove null values, clean date columns, calculate
 return on investment (ROI), drop columns, and perform inner joins.
 
-After defining the functions, the script proceeds to execute a series of operations on the DataFrame.
-It performs an inner join between the two DataFrames based on the "id" column.
+The raw JSON-like values ("[{'id': 0, 'name': 'Lucasfilm'}, ...]") are by far the largest part of the input.
+Each chunk is reduced as soon as it is read: the columns declared in LIST_COLUMNS become lists of names and
+those in NAME_COLUMNS a single name, with one vectorized regular expression per column (`str.extractall`),
+and the unused columns are dropped. Only these compact chunks are kept, so peak memory is bounded by the
+chunk size plus the size of the cleaned catalog, not by the size of the raw files.
+
+Every raw row is fingerprinted with a hash of its values (which include the movie id), and the compact rows
+are saved with their fingerprints in "../data/cleaned/compact/". With `--incremental`, rows whose fingerprint
+is found there are taken from the previous run and only new or changed rows go through the extraction.
+
+With `--jobs N`, the extraction of the chunks and the parsing of the release dates run in a pool of N worker
+processes. Results are reassembled in input order, and every date partition is parsed with the date format
+guessed from the whole column, so the output files are byte-identical to those of a serial run.
+
+After the extraction, the script proceeds to execute a series of operations on the DataFrame.
+It performs an inner join between the movies and the credits based on the "id" column.
 Then, it drops several unnecessary columns from the DataFrame.
-Next, it fills null values in the "revenue" and "budget" columns with zeros.
+Null values in the "revenue" and "budget" columns are kept: they are unknown, not zero, and the API
+averages these columns over the known values only.
 It removes rows with null values in the "release_date" column.
 
 The script further cleans the "release_date" column by converting it to
 a standard format and creating a new column with only the year component.
-It calculates the ROI by dividing the "revenue" by the "budget" and stores the result in a new "ROI" column.
+It calculates the ROI by dividing the "revenue" by the "budget" and stores the result in a new "ROI" column,
+null when the revenue or the budget is unknown.
 
-Next, the script iterates over each column in the DataFrame and checks if there are occurrences of "{" character.
-If a column has at least two occurrences, it applies string conversion and extracts multiple names from the values.
-If a column has at least one occurrence, it applies string conversion and extracts a single name.
+Columns holding several names (genres, cast, crew, ...) are kept as real Python lists, with an empty
+list where no name was found, so that nothing downstream has to parse them back from strings.
 
-Finally, the transformed DataFrame is saved as a CSV file named "movies.csv" in the "./transformedData/" directory.
+Finally, the transformed DataFrame is saved as a CSV file named "movies.csv" for inspection and as
+"movies.parquet", a columnar file in which the list columns survive the round trip natively.
 
 Overall, this script performs various data preprocessing and transformation tasks,
 including data cleaning, feature extraction, and column manipulation, to transform the movie datasets into a more structured and usable format.
@@ -32,170 +50,279 @@ including data cleaning, feature extraction, and column manipulation, to transfo
 """
 pd.set_option('display.max_columns', None)
 
-df = pd.read_csv('../data/not cleaned/movies_dataset.csv', sep=',', quotechar='"', dtype={'overview': str})
-df2 = pd.read_csv('../data/not cleaned/credits1.csv')
-df3 = pd.read_csv('../data/not cleaned/credits2.csv')
-df4 = pd.read_csv('../data/not cleaned/credits3.csv')
+parser = argparse.ArgumentParser(description="Clean the raw movie and credits datasets.")
+parser.add_argument('--chunksize', type=int, default=10000, help="rows of the raw CSV files read at a time")
+parser.add_argument('--incremental', action='store_true', help="reuse the rows of the previous run whose raw values did not change")
+parser.add_argument('--jobs', type=int, default=1, help="worker processes for the extraction and the date parsing")
+
+# Pattern of a name inside the raw JSON-like values
+NAME_PATTERN = r"'name': '([^']*)'"
+
+# Columns holding a list of objects, kept as the list of their names
+LIST_COLUMNS = ['genres', 'production_companies', 'production_countries', 'spoken_languages', 'cast', 'crew']
+
+# Columns holding a single object, kept as its name
+NAME_COLUMNS = ['belongs_to_collection']
+
+# Raw columns not used by the API nor the recommender
+columns_to_drop = ['video', 'imdb_id', 'adult', 'original_title', 'poster_path', 'homepage']
+
+# Compact rows of the previous run, with the fingerprint of the raw row they come from
+COMPACT_MOVIES = '../data/cleaned/compact/movies.parquet'
+COMPACT_CREDITS = '../data/cleaned/compact/credits.parquet'
 
-def combineDataframes(df1, df2):
+# Paths of the credits files, which share the same columns
+CREDITS_FILES = ['../data/not cleaned/credits1.csv', '../data/not cleaned/credits2.csv', '../data/not cleaned/credits3.csv']
+
+def extractAllNames(values):
     """
-    Combines two DataFrames into a single one by vertically concatenating them.
+    Extracts every name from the raw values of a list column.
 
-    This function takes two DataFrames (`df1` and `df2`) as input and uses the pandas `concat()` function
-    to vertically concatenate them into a single DataFrame called `df_combined`.
+    This function applies the pattern "'name': '([^']*)'" to the whole column at once
+    with `str.extractall()`, and groups the matches back by row.
 
     Parameters
     ----------
-    df1 : pandas DataFrame
-        The first DataFrame to be combined.
-    df2 : pandas DataFrame
-        The second DataFrame to be combined.
+    values : pandas Series of str
+        The raw values, e.g. "[{'id': 0, 'name': 'Lucasfilm'}, ...]".
 
     Returns
     -------
-    pandas DataFrame
-        The resulting DataFrame after vertical concatenation.
+    pandas Series of list of str
+        The names of every row, in order of appearance; an empty list where there is none.
 
     """
-    df = pd.concat([df1, df2], ignore_index=True)
-    return df
+    # One row per match, indexed by (row, match number)
+    matches = values.str.extractall(NAME_PATTERN)[0]
 
-def removeNulls(column):
-    """
-    Removes null values from a specific column in a DataFrame.
+    # Gather the matches of each row into a list
+    names = matches.groupby(level=0).agg(list)
 
-    This function takes a column name as input and removes any null
-    values from that column in the DataFrame `df`. It modifies the
-    DataFrame in-place by using the `dropna()` method of the column.
+    # Rows without any match (or null) get an empty list
+    return pd.Series([names.get(row, []) for row in values.index], index=values.index, dtype=object)
+
+def extractFirstName(values):
+    """
+    Extracts the first name from the raw values of a single-object column.
 
     Parameters
     ----------
-    column : str
-        The name of the column to remove null values from.
+    values : pandas Series of str
+        The raw values, e.g. "{'id': 10, 'name': 'Star Wars Collection', ...}".
 
     Returns
     -------
-    None
+    pandas Series of str
+        The first name of every row; None where there is none.
 
     """
-    # Use the `dropna()` method of the specified column to remove null values
-    df[column].dropna(inplace=True)
+    names = values.str.extract(NAME_PATTERN, expand=False)
+    return names.astype(object).where(names.notna(), None)
 
-def stringConverter(value):
+def compactChunk(chunk):
     """
-    Converts a value to a string representation.
-
-    This function takes a value as input and converts it to a string.
-    If the value is a list or a dictionary, it is first converted to a JSON string
-    using the `json.dumps()` function. For other types of values, the `str()` function
-    is used for the conversion.
+    Reduces a chunk of a raw CSV file to the columns and names that are kept.
 
     Parameters
     ----------
-    value : any
-        The value to be converted to a string.
+    chunk : pandas DataFrame
+        Rows of a raw file, every column read as text.
 
     Returns
     -------
-    str
-        The string representation of the value.
+    pandas DataFrame
+        The chunk without the dropped columns, its list and single-object columns replaced by names.
 
     """
-    # Check if the value is an instance of a list or a dictionary
-    if isinstance(value, (list, dict)):
-        # If it is, convert the value to a JSON string and return it
-        return json.dumps(value)
-    return str(value)
+    # Drop the unused columns before anything else, so their raw values are released right away
+    chunk = dropColumns(chunk, [column for column in columns_to_drop if column in chunk.columns])
 
-def extractNames(value):
-    """
-    Extracts a single name from a given string value.
+    # Replace the raw values of the declared columns by the names they hold
+
+    for column in chunk.columns:
+        if column in LIST_COLUMNS:
+            chunk[column] = extractAllNames(chunk[column])
+        elif column in NAME_COLUMNS:
+            chunk[column] = extractFirstName(chunk[column])
 
-    This function uses regular expressions to find and extract
-    a name that matches the pattern "'name': '([^']*)'" from
-    the provided value. The first matching name is returned.
+    return chunk
+
+def readPrevious(path):
+    """
+    Reads the compact rows saved by the previous run, indexed by fingerprint.
 
     Parameters
     ----------
-    value : str
-        The string value to extract the name from.
+    path : str
+        The compact file of the previous run.
 
     Returns
     -------
-    str or None
-        The extracted name if a match is found, otherwise returns None.
+    pandas DataFrame or None
+        One row per distinct fingerprint, or None if there is no previous run.
 
     """
-    # Define the regular expression pattern to match a name
-    pattern = r"'name': '([^']*)'"
+    if not os.path.exists(path):
+        return None
+    previous = pd.read_parquet(path)
 
-    # Find all matches of the pattern in the value
-    matches = re.findall(pattern, value)
+    # Parquet list columns are read back as NumPy arrays
+    for column in previous.columns:
+        if column in LIST_COLUMNS:
+            previous[column] = previous[column].map(lambda value: value.tolist() if isinstance(value, np.ndarray) else [])
 
-    # If any matches are found, assign the first match to the names variable and return it
-    if len(matches) > 0:
-        names = matches[0]
-        return names
-    else:
-        # If no matches are found, return None
-        return None
-    
-def extractMultipleNames(value):
+    return previous.drop_duplicates('fingerprint').set_index('fingerprint')
+
+def readCompact(paths, chunksize, previous=None, pool=None, jobs=1):
     """
-    Extracts multiple names from a given string value.
+    Reads raw CSV files in chunks, reducing every chunk as soon as it is read.
 
-    This function uses regular expressions to find and extract
-    names that match the pattern "'name': '([^']*)'" from the
-    provided value. The names are returned as a list.
+    Parameters
+    ----------
+    paths : list of str
+        The files to read; they must share the same columns.
+    chunksize : int
+        The number of rows read at a time.
+    previous : pandas DataFrame, optional
+        The compact rows of the previous run, indexed by fingerprint; matching rows are reused.
+    pool : concurrent.futures.ProcessPoolExecutor, optional
+        Workers running the extraction of the chunks; the chunks are reduced in this process otherwise.
+    jobs : int
+        The number of workers of `pool`, which bounds the number of chunks in flight.
+
+    Returns
+    -------
+    pandas DataFrame
+        The compact rows of all the files, in file order, with a 'fingerprint' column.
+    int
+        The number of rows that went through the extraction.
+
+    """
+    chunks = []
+    processed = 0
+    pending = collections.deque()
+    for path in paths:
+        for chunk in pd.read_csv(path, sep=',', quotechar='"', dtype=str, chunksize=chunksize):
+            # Fingerprint every raw row from its values
+            fingerprints = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+            known = np.zeros(len(chunk), dtype=bool) if previous is None else np.isin(fingerprints, previous.index.to_numpy())
+            changed = chunk[~known]
+            processed += len(changed)
+            compact = pool.submit(compactChunk, changed) if pool is not None else compactChunk(changed)
+            pending.append((compact, chunk.index, fingerprints, known))
+
+            # Keep at most two chunks per worker in flight, so memory stays bounded by the chunk size
+            while len(pending) > 2 * jobs:
+                chunks.append(finishChunk(*pending.popleft(), previous))
+
+    # Collect the remaining chunks, still in file order
+    while pending:
+        chunks.append(finishChunk(*pending.popleft(), previous))
+    return pd.concat(chunks, ignore_index=True), processed
+
+def finishChunk(compact, index, fingerprints, known, previous):
+    """
+    Completes a chunk reduced by `compactChunk` with the rows reused from the previous run.
 
     Parameters
     ----------
-    value : str
-        The string value to extract names from.
+    compact : pandas DataFrame or Future
+        The reduced new and changed rows, or the future of a worker reducing them.
+    index : pandas Index
+        The index of the raw chunk.
+    fingerprints : numpy array
+        The fingerprint of every raw row.
+    known : numpy array of bool
+        Which raw rows were found in the previous run.
+    previous : pandas DataFrame or None
+        The compact rows of the previous run, indexed by fingerprint.
 
     Returns
     -------
-    list or None
-        A list containing the extracted names if any are found,
-        otherwise returns None.
+    pandas DataFrame
+        The compact rows of the whole chunk, in file order, with a 'fingerprint' column.
 
     """
-    # Define the regular expression pattern to match names
-    pattern = r"'name': '([^']*)'"
+    if not isinstance(compact, pd.DataFrame):
+        compact = compact.result()
+    compact['fingerprint'] = fingerprints[~known]
 
-    # Find all matches of the pattern in the value
-    matches = re.findall(pattern, value)
+    if known.any():
+        # Take the unchanged rows from the previous run and restore the file order
+        reused = previous.loc[fingerprints[known]].reset_index()
+        reused.index = index[known]
+        compact = pd.concat([compact, reused[compact.columns]]).loc[index]
 
-    # If any matches are found, assign them to the names variable and return the list of names
-    if len(matches) > 0:
-        names = matches
-        return names
-    else:
-        # If no matches are found, return None
-        return None
+    return compact
+
+def saveCompact(compact, path):
+    """
+    Saves compact rows with their fingerprints for the next incremental run.
+
+    Parameters
+    ----------
+    compact : pandas DataFrame
+        The rows returned by `readCompact`.
+    path : str
+        The compact file.
 
-def fillNull0(column):
+    Returns
+    -------
+    None
+
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compact.to_parquet(path, index=False)
+
+def removeNulls(column):
     """
-    Fills null values in a specific column of a DataFrame with zero.
+    Removes null values from a specific column in a DataFrame.
 
-    This function takes a column name as input and fills any null
-    values in that column of the DataFrame `df` with zero. It uses
-    the `fillna()` method of the column to perform the operation.
+    This function takes a column name as input and removes any null
+    values from that column in the DataFrame `df`. It modifies the
+    DataFrame in-place by using the `dropna()` method of the column.
 
     Parameters
     ----------
     column : str
-        The name of the column to fill null values in.
+        The name of the column to remove null values from.
 
     Returns
     -------
     None
 
     """
-    # Fill null values in the specified column with zero using the `fillna()` method
-    return df[column].fillna(0, inplace=True)
+    # Use the `dropna()` method of the specified column to remove null values
+    df[column].dropna(inplace=True)
 
-def cleanDate(column):
+def parseDates(values, reference=None):
+    """
+    Converts date strings to the 'YYYY-MM-DD' format.
+
+    Parameters
+    ----------
+    values : pandas Series
+        The raw date values.
+    reference : str, optional
+        The first non-null value of the whole column. It is parsed along with `values` so that
+        pandas guesses the date format from it, as it does when parsing the whole column at once.
+
+    Returns
+    -------
+    pandas Series
+        The formatted dates; NaN where a value could not be parsed.
+
+    """
+    if reference is not None:
+        values = pd.concat([pd.Series([reference]), values])
+
+    # Convert the values to datetime format, then format them as 'YYYY-MM-DD'
+    dates = pd.to_datetime(values, errors='coerce').dt.strftime('%Y-%m-%d')
+
+    return dates.iloc[1:] if reference is not None else dates
+
+def cleanDate(column, pool=None, jobs=1):
     """
     Cleans a column containing date values in a DataFrame.
 
@@ -216,17 +343,29 @@ def cleanDate(column):
     ----------
     column : str
         The name of the column containing date values to be cleaned.
+    pool : concurrent.futures.ProcessPoolExecutor, optional
+        Workers parsing one partition of the column each; the column is parsed in this process otherwise.
+    jobs : int
+        The number of workers of `pool`, i.e. of partitions.
 
     Returns
     -------
     None
 
     """
-    # Convert the column values to datetime format
-    df[column] = pd.to_datetime(df[column], errors='coerce')
+    if pool is None:
+        # Convert the column values to datetime format
+        df[column] = pd.to_datetime(df[column], errors='coerce')
 
-    # Format the datetime values as 'YYYY-MM-DD'
-    df[column] = df[column].dt.strftime('%Y-%m-%d')
+        # Format the datetime values as 'YYYY-MM-DD'
+        df[column] = df[column].dt.strftime('%Y-%m-%d')
+    else:
+        # Parse one partition per worker, each guessing the date format from the column's first value
+        values = df[column]
+        reference = values.dropna().iloc[0] if values.notna().any() else None
+        partitions = np.array_split(np.arange(len(values)), jobs)
+        futures = [pool.submit(parseDates, values.iloc[positions], reference) for positions in partitions]
+        df[column] = pd.concat([future.result() for future in futures])
 
     # Extract the year component and create a new column with the name '{column}_year'
     df[f'{column}_year'] = pd.to_datetime(df[column], errors='coerce').dt.year
@@ -245,16 +384,16 @@ def roiColumn(column1, column2, column3):
     Before the calculation, the function performs the following data preprocessing steps:
 
     1. Converts the values in `column2` to numeric format using `pd.to_numeric()`.
-       Any values that cannot be converted are set to NaN (Not a Number), and then
-       filled with 0 using the `.fillna()` method.
+       Missing values, and any values that cannot be converted, are set to NaN (Not a Number):
+       they are unknown, not zero.
 
     2. Converts the values in `column3` to numeric format using `pd.to_numeric()`.
-       Any values that cannot be converted are set to NaN, and then filled with 0.
+       Missing values, and any values that cannot be converted, are set to NaN.
 
     The calculation is done using the `np.where()` function, which checks if the values
     in `column3` are equal to 0. If they are, the corresponding ROI in `column1` is set to 0.
     Otherwise, the ROI is calculated as the division of the values in `column2` by the values
-    in `column3`.
+    in `column3`. The ROI is NaN wherever either value is unknown.
 
     Parameters
     ----------
@@ -270,14 +409,38 @@ def roiColumn(column1, column2, column3):
     None
 
     """
-    # Convert column2 values to numeric format, replace non-convertible values with NaN, and fill NaN with 0
-    df[column2] = pd.to_numeric(df[column2], errors='coerce').fillna(0)
+    # Convert column2 values to numeric format, keeping missing and non-convertible values as NaN
+    df[column2] = pd.to_numeric(df[column2], errors='coerce')
 
-    # Convert column3 values to numeric format, replace non-convertible values with NaN, and fill NaN with 0
-    df[column3] = pd.to_numeric(df[column3], errors='coerce').fillna(0)
+    # Convert column3 values to numeric format, keeping missing and non-convertible values as NaN
+    df[column3] = pd.to_numeric(df[column3], errors='coerce')
 
-    # Calculate ROI and assign it to column1 using np.where()
-    df[column1] = np.where(df[column3] == 0, 0, df[column2] / df[column3])
+    # Calculate ROI and assign it to column1 using np.where(); it is unknown when either value is
+    roi = np.where(df[column3] == 0, 0, df[column2] / df[column3])
+    df[column1] = np.where(df[column2].isna() | df[column3].isna(), np.nan, roi)
+
+def numericColumns(columns):
+    """
+    Converts columns of the DataFrame to numeric types.
+
+    This function takes a list of column names as input and converts the values
+    of each column in the DataFrame `df` with `pd.to_numeric()`. Values that cannot
+    be converted are set to NaN, so every column ends up with a single numeric dtype
+    that columnar formats can store.
+
+    Parameters
+    ----------
+    columns : list of str
+        The names of the columns to convert.
+
+    Returns
+    -------
+    None
+
+    """
+    for column in columns:
+        # Replace non-convertible values with NaN
+        df[column] = pd.to_numeric(df[column], errors='coerce')
 
 def dropColumns(df, columns):
     """
@@ -366,56 +529,53 @@ def innerJoin(df1, df2, id):
     # Return the resulting merged DataFrame
     return df
 
-# Combine df2, df3 and df4 DataFrames by vertically concatenating them
-df2 = combineDataframes(df2, df3)
-df2 = combineDataframes(df2, df4)
-
-# Perform an inner join operation between `df` and `df2` based on the 'id' column
-df = innerJoin(df, df2, 'id')
+def print_column_info(df):
+    print(df.head())
+    for column in df.columns:
+        data_type = df[column].dtype
+        null_count = df[column].isnull().sum()
+        print(f"Column: {column}\nData Type: {data_type}\nNull Count: {null_count}\n")
 
-# Define a list of column names to be dropped from the DataFrame
-columns_to_drop = ['video', 'imdb_id', 'adult', 'original_title', 'poster_path', 'homepage']
+# The worker processes import this module, so the pipeline only runs in the main process
+if __name__ == '__main__':
+    args = parser.parse_args()
 
-# Drop the specified columns from the DataFrame using the `dropColumns` function
-df = dropColumns(df, columns_to_drop)
+    # Worker processes for --jobs; everything runs in this process otherwise
+    pool = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
 
-# Fill null values in the 'revenue' column with 0
-fillNull0('revenue')
+    # Read the movies and the credits in chunks, keeping only the extracted names
+    df, movies_processed = readCompact(['../data/not cleaned/movies_dataset.csv'], args.chunksize, readPrevious(COMPACT_MOVIES) if args.incremental else None, pool, args.jobs)
+    df2, credits_processed = readCompact(CREDITS_FILES, args.chunksize, readPrevious(COMPACT_CREDITS) if args.incremental else None, pool, args.jobs)
+    print(f"Extracted {movies_processed} of {len(df)} movie rows and {credits_processed} of {len(df2)} credit rows")
 
-# Fill null values in the 'budget' column with 0
-fillNull0('budget')
+    # Keep the compact rows and their fingerprints for the next incremental run
+    saveCompact(df, COMPACT_MOVIES)
+    saveCompact(df2, COMPACT_CREDITS)
+    df = df.drop(columns='fingerprint')
+    df2 = df2.drop(columns='fingerprint')
 
-# Remove rows with null values in the 'release_date' column
-removeNulls('release_date')
+    # Perform an inner join operation between `df` and `df2` based on the 'id' column
+    df = innerJoin(df, df2, 'id')
 
-# Clean the 'release_date' column by converting it to a standard format
-cleanDate('release_date')
+    # Remove rows with null values in the 'release_date' column
+    removeNulls('release_date')
 
-# Calculate the Return on Investment (ROI) and store the result in the 'ROI' column
-roiColumn('ROI', 'revenue', 'budget')
+    # Clean the 'release_date' column by converting it to a standard format
+    cleanDate('release_date', pool, args.jobs)
 
-# Iterate over each column in the DataFrame
-for column in df.columns:
-    if column != 'overview':
-        # Check if the column has at least 2 occurrences of '{' character
-        if df[column].astype(str).str.count('{').ge(2).sum():
-            # Apply string conversion and extract multiple names from the column values
-            df[column] = df[column].apply(stringConverter).apply(extractMultipleNames)
+    # Calculate the Return on Investment (ROI) and store the result in the 'ROI' column
+    roiColumn('ROI', 'revenue', 'budget')
 
-        # Check if the column has at least 1 occurrence of '{' character
-        if df[column].astype(str).str.count('{').ge(1).sum():
-            # Apply string conversion and extract a single name from the column values
-            df[column] = df[column].apply(stringConverter).apply(extractNames)
+    # Give the remaining numeric columns a single numeric dtype
+    numericColumns(['popularity', 'runtime', 'vote_average', 'vote_count'])
 
-# Save the DataFrame as a CSV file in the specified path
-df.to_csv('../data/cleaned/movies.csv')
+    if pool is not None:
+        pool.shutdown()
 
+    # Save the DataFrame as a CSV file in the specified path
+    df.to_csv('../data/cleaned/movies.csv')
 
-def print_column_info(df):
-    print(df.head())
-    for column in df.columns:
-        data_type = df[column].dtype
-        null_count = df[column].isnull().sum()
-        print(f"Column: {column}\nData Type: {data_type}\nNull Count: {null_count}\n")
+    # Save the DataFrame as a Parquet file, which keeps the list columns as native lists
+    df.to_parquet('../data/cleaned/movies.parquet', index=False)
 
-print_column_info(df)
\ No newline at end of file
+    print_column_info(df)
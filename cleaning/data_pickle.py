@@ -1,9 +1,40 @@
+import os
+import sys
 import pandas as pd
-import pickle
 
-# Read the CSV file into a pandas DataFrame
-df = pd.read_csv('../data/cleaned/movies.csv')
+"""
+The script turns the Parquet file written by data_cleaning.py into the catalog served by the API and the
+Streamlit app, "../data/cleaned/movies.arrow". Every column is cast to the typed schema of `api.schema`
+(numeric budget, revenue and ROI, categorical language, collection and status, a date type for the release
+date, lists of names for genres, cast, crew, ...) and the script fails if the data does not fit it.
 
-# Save the DataFrame to a pickle file
-with open('../data/cleaned/movies.pkl', 'wb') as file:
-    pickle.dump(df, file)
\ No newline at end of file
+The file is an uncompressed Arrow IPC (Feather) file: it does not depend on the pandas version, servers
+memory-map it and read only the columns they need. Its version, a hash of its contents, is stored in its
+metadata and keys the model artifacts built by build_model.py. It replaces the pickle this script used to write.
+
+The script then builds the person, title and search indexes of the catalog and writes them to
+"../data/cleaned/indexes/<catalog version>/" as .npy files, which the API memory-maps instead of building
+private copies in every worker. The indexes of the catalog being replaced are kept for the processes still
+serving it; older ones are removed.
+"""
+
+# Make the `api` package importable from the cleaning directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.store import build_indexes, catalog_version, write_arrow
+
+# Read the Parquet file written by data_cleaning.py into a pandas DataFrame
+df = pd.read_parquet('../data/cleaned/movies.parquet')
+
+# Remember the version of the catalog being replaced, still served until the servers restart
+previous = catalog_version('../data/cleaned/movies.arrow') if os.path.exists('../data/cleaned/movies.arrow') else None
+
+# Validate the catalog against the schema and write it as a memory-mappable Arrow file
+version = write_arrow(df, '../data/cleaned/movies.arrow')
+
+print(f"Wrote {len(df)} movies to ../data/cleaned/movies.arrow, catalog version {version}")
+
+# Build the serving indexes of the new catalog
+directory = build_indexes('../data/cleaned/movies.arrow', keep=[previous])
+
+print(f"Wrote the indexes to {directory}")
@@ -0,0 +1,90 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+"""
+The script measures how well the approximate (LSH) recommender backend reproduces the exact,
+brute-force recommendations, so that its settings can be chosen with data.
+
+For a random sample of movies it computes the exact top-K neighbors over the TF-IDF matrix, then,
+for every combination of the given LSH settings, the recall@K of the approximate neighbors (the
+share of the exact top-K they contain), the average number of candidates compared per query and
+the average latency per query. The "svd exact" row is an exhaustive search over the embeddings: the
+best recall any LSH setting can reach with these embeddings.
+
+Run it after build_ann.py, from the "cleaning" directory:
+
+    python evaluate_ann.py [--k 10] [--queries 500] [--tables 4,8,16] [--bits 10,12,14] [--probes 0,2,4]
+"""
+
+# Make the `api` package importable from the cleaning directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.ann import LSHIndex
+from api.recommender import load_artifact
+from api.store import catalog_version
+
+
+def integers(value):
+    return [int(item) for item in value.split(',')]
+
+
+def recall(found, exact):
+    """
+    Returns the share of the exact neighbors found, averaged over the queries.
+    """
+    return np.mean([len(np.intersect1d(a, b)) / len(b) for a, b in zip(found, exact)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate the recall and latency of the LSH recommender backend.')
+    parser.add_argument('--k', type=int, default=10, help='number of recommendations compared')
+    parser.add_argument('--queries', type=int, default=500, help='number of sampled query movies')
+    parser.add_argument('--tables', type=integers, default=[4, 8, 16], help='comma-separated table counts')
+    parser.add_argument('--bits', type=integers, default=[10, 12, 14], help='comma-separated bits per table')
+    parser.add_argument('--probes', type=integers, default=[0, 2, 4], help='comma-separated extra buckets per table')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Load the artifact built for the current catalog
+    model = load_artifact('../data/model', catalog_version('../data/cleaned/movies.arrow'))
+    if model.embeddings is None:
+        sys.exit("The artifact has no embeddings, run build_ann.py first.")
+    embeddings = np.asarray(model.embeddings, dtype=np.float32)
+
+    # Sample the query movies and compute their exact neighbors over the TF-IDF matrix
+    rng = np.random.default_rng(args.seed)
+    queries = rng.choice(len(embeddings), size=min(args.queries, len(embeddings)), replace=False)
+    exact, _ = model._brute(queries, args.k)
+
+    print(f"recall@{args.k} against brute force, {len(queries)} queries, {len(embeddings)} movies")
+    print(f"{'tables':>6} {'bits':>5} {'probes':>6} {'recall':>8} {'candidates':>11} {'ms/query':>9}")
+
+    # Exhaustive search over the embeddings, the ceiling of any LSH setting
+    similarities = embeddings[queries] @ embeddings.T
+    similarities[np.arange(len(queries)), queries] = -np.inf
+    svd_exact = np.argsort(-similarities, axis=1)[:, :args.k]
+    print(f"{'svd exact':>19} {recall(svd_exact, exact):8.3f} {len(embeddings):11d}")
+
+    for tables, bits in itertools.product(args.tables, args.bits):
+        index = LSHIndex(embeddings, tables, bits, seed=args.seed)
+        for probes in args.probes:
+            found = []
+            candidates = 0
+            start = time.perf_counter()
+            for position in queries.tolist():
+                neighbors, _ = index.query(embeddings[position], args.k, exclude=position, probes=probes)
+                found.append(neighbors)
+            elapsed = time.perf_counter() - start
+            for position in queries.tolist():
+                candidates += len(index.candidates(embeddings[position], probes))
+            print(f"{tables:6d} {bits:5d} {probes:6d} {recall(found, exact):8.3f} "
+                  f"{candidates / len(queries):11.0f} {elapsed * 1000 / len(queries):9.3f}")
+
+
+if __name__ == '__main__':
+    main()
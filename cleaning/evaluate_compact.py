@@ -0,0 +1,107 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+"""
+The script measures the memory the recommender saves with a compact TF-IDF matrix, and the
+recommendations it loses in exchange, so that the settings of build_model.py can be chosen with data.
+
+The reference is the uncompressed model: float64 weights over the full vocabulary. For a random sample
+of movies it computes the reference top-K neighbors, then, for every combination of the given
+precisions and min_df / max_df pruning settings, refits the model and reports the size of its matrix
+(weights plus CSR index arrays), its vocabulary size, and the recall@K of its neighbors (the share of
+the reference top-K they contain). The "svd" rows replace the matrix with TruncatedSVD embeddings
+stored in float16, as build_ann.py --float16 writes them, searched exhaustively.
+
+Run it from the "cleaning" directory:
+
+    python evaluate_compact.py [--k 10] [--queries 1000] [--min-df 1,2,3,5] [--max-df 1.0,0.5] [--components 64,128]
+"""
+
+# Make the `api` package importable from the cleaning directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.ann import fit_embeddings
+from api.recommender import _top_k, fit
+from api.store import MovieStore
+
+
+def integers(value):
+    return [int(item) for item in value.split(',')]
+
+
+def document_frequencies(value):
+    # Integers are document counts, decimals shares of the catalog, as for TfidfVectorizer
+    return [float(item) if '.' in item else int(item) for item in value.split(',')]
+
+
+def recall(found, exact):
+    """
+    Returns the share of the exact neighbors found, averaged over the queries.
+    """
+    return np.mean([len(np.intersect1d(a, b)) / len(b) for a, b in zip(found, exact)])
+
+
+def matrix_bytes(matrix) -> int:
+    """
+    Returns the size of the CSR arrays of a matrix, as save_artifact writes them.
+    """
+    index_dtype = np.int32 if max(matrix.nnz, matrix.shape[1]) < 2 ** 31 else np.int64
+    return matrix.data.nbytes + (matrix.nnz + matrix.shape[0] + 1) * np.dtype(index_dtype).itemsize
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate the memory and recall of compact TF-IDF matrices.')
+    parser.add_argument('--k', type=int, default=10, help='number of recommendations compared')
+    parser.add_argument('--queries', type=int, default=1000, help='number of sampled query movies')
+    parser.add_argument('--dtypes', default='float64,float32', help='comma-separated weight precisions')
+    parser.add_argument('--min-df', type=document_frequencies, default=[1, 2, 3, 5],
+                        help='comma-separated minimum document frequencies')
+    parser.add_argument('--max-df', type=document_frequencies, default=[1.0, 0.5],
+                        help='comma-separated maximum document frequencies')
+    parser.add_argument('--components', type=integers, default=[64, 128], help='comma-separated SVD dimensions')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Load the catalog exactly as the serving processes do
+    store = MovieStore.load('../data/cleaned/movies.arrow')
+
+    # Fit the reference model and compute its neighbors for a sample of movies
+    _, reference = fit(store.df, dtype=np.float64, min_df=1, max_df=1.0)
+    rng = np.random.default_rng(args.seed)
+    queries = np.sort(rng.choice(reference.shape[0], size=min(args.queries, reference.shape[0]), replace=False))
+    exact, _ = _top_k(reference, queries, args.k)
+    baseline = matrix_bytes(reference)
+
+    print(f"recall@{args.k} against float64 without pruning, {len(queries)} queries, {reference.shape[0]} movies")
+    print(f"{'model':>8} {'min_df':>6} {'max_df':>6} {'terms':>7} {'nnz':>9} {'MiB':>8} {'saved':>6} {'recall':>7} {'fit s':>6}")
+
+    for dtype in args.dtypes.split(','):
+        for min_df in args.min_df:
+            for max_df in args.max_df:
+                start = time.perf_counter()
+                _, matrix = fit(store.df, dtype=np.dtype(dtype), min_df=min_df, max_df=max_df)
+                elapsed = time.perf_counter() - start
+                found, _ = _top_k(matrix, queries, args.k)
+                size = matrix_bytes(matrix)
+                print(f"{dtype:>8} {min_df:>6} {max_df:>6} {matrix.shape[1]:7d} {matrix.nnz:9d} "
+                      f"{size / 2 ** 20:8.2f} {1 - size / baseline:6.1%} {recall(found, exact):7.3f} {elapsed:6.2f}")
+
+    # Dense float16 embeddings of the default model, searched exhaustively
+    _, matrix = fit(store.df)
+    for components in args.components:
+        embeddings, _ = fit_embeddings(matrix, components, seed=args.seed)
+        embeddings = embeddings.astype(np.float16)
+        similarities = embeddings[queries].astype(np.float32) @ embeddings.T.astype(np.float32)
+        similarities[np.arange(len(queries)), queries] = -np.inf
+        found = np.argsort(-similarities, axis=1)[:, :args.k]
+        size = embeddings.nbytes
+        print(f"{'svd ' + str(embeddings.shape[1]):>8} {'':>6} {'':>6} {embeddings.shape[1]:7d} {embeddings.size:9d} "
+              f"{size / 2 ** 20:8.2f} {1 - size / baseline:6.1%} {recall(found, exact):7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+"""
+The script builds the recommender artifact of the current catalog incrementally, from the artifact of a
+previous catalog (by default the most recently created one in "../data/model/").
+
+Rows are matched by movie id and by a hash of their feature text. Unchanged rows keep their TF-IDF row,
+new and changed rows are transformed with the previous vocabulary and IDF weights, and the neighbor table
+and embeddings of the previous artifact, when present, are patched rather than recomputed. When the share
+of new, changed and removed rows exceeds `--max-drift`, or the previous artifact has no row fingerprints,
+the model is refitted from scratch as build_model.py does, since a stale vocabulary would then cover too
+much of the catalog. A refit keeps the precision and vocabulary pruning of the previous artifact, and so
+do the embeddings.
+
+Run it after data_cleaning.py (possibly with --incremental) and data_pickle.py, from the "cleaning" directory:
+
+    python update_model.py [--base VERSION] [--max-drift 0.1]
+"""
+
+# Make the `api` package importable from the cleaning directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.ann import fit_embeddings
+from api.recommender import (
+    fit, latest_artifact, load_artifact, match_rows, row_fingerprints, save_artifact, save_embeddings,
+    save_neighbors, top_k_neighbors, update_embeddings, update_matrix, update_neighbors,
+)
+from api.store import MovieStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Update the recommender artifact for the current catalog.')
+    parser.add_argument('--base', default=None, help='catalog version of the artifact to start from (default: the latest)')
+    parser.add_argument('--max-drift', type=float, default=0.1,
+                        help='share of new, changed and removed rows above which the model is refitted')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    # Load the catalog exactly as the serving processes do
+    store = MovieStore.load('../data/cleaned/movies.arrow')
+    ids, fingerprints = row_fingerprints(store.df)
+
+    base_version = args.base or latest_artifact('../data/model', exclude=store.version)
+    if base_version is None:
+        parser.error("No previous artifact to start from; run build_model.py instead")
+    base = load_artifact('../data/model', base_version)
+
+    # Match the rows of the catalog to the rows of the previous artifact
+    source = None
+    drift = 1.0
+    if os.path.exists(os.path.join(base.generation, 'row_fingerprints.npy')):
+        source = match_rows(
+            np.load(os.path.join(base.generation, 'row_ids.npy')),
+            np.load(os.path.join(base.generation, 'row_fingerprints.npy')),
+            ids,
+            fingerprints,
+        )
+        kept = int((source >= 0).sum())
+        drift = ((len(source) - kept) + (base.matrix.shape[0] - kept)) / max(len(source), 1)
+
+    if source is None or drift > args.max_drift:
+        # Too much has changed for the previous vocabulary: refit everything, with the same settings
+        settings = {key: base.metadata['vectorizer'][key] for key in ('min_df', 'max_df')}
+        vectorizer, matrix = fit(store.df, dtype=base.matrix.dtype, **settings)
+        path = save_artifact('../data/model', store.version, vectorizer, matrix, ids, fingerprints,
+                             base_version=base_version, drift=round(drift, 6), refit=True)
+        print(f"Refitted the model for catalog version {store.version} (drift {drift:.1%}) in {path}")
+
+        if base.neighbors is not None:
+            neighbors, scores = top_k_neighbors(matrix, base.neighbors.shape[1])
+            save_neighbors(path, neighbors, scores)
+        if base.embeddings is not None:
+            embeddings, components = fit_embeddings(matrix, base.embeddings.shape[1])
+            save_embeddings(path, embeddings.astype(base.embeddings.dtype), components)
+    else:
+        # Carry the unchanged rows over and transform the others with the previous vocabulary
+        matrix = update_matrix(base, store.df, source)
+        path = save_artifact('../data/model', store.version, base.vectorizer(), matrix, ids, fingerprints,
+                             base_version=base_version, drift=round(drift, 6), refit=False)
+        print(f"Updated {int((source < 0).sum())} of {len(source)} rows from catalog version {base_version} "
+              f"(drift {drift:.1%}) in {path}")
+
+        if base.neighbors is not None:
+            save_neighbors(path, *update_neighbors(matrix, source, base.neighbors, base.scores))
+        if base.embeddings is not None:
+            components = np.load(os.path.join(base.generation, 'svd_components.npy'))
+            save_embeddings(path, update_embeddings(matrix, components).astype(base.embeddings.dtype), components)
+
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,44 +5,142 @@ It showcases the main functionalities of a movie recommendation system powered b
 '''
 import streamlit as st
 import requests
-import pandas as pd
 import subprocess
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
+from api import config
+from api.client import APIError, MovieMentorClient
+from api.indexes import AmbiguousTitle, TitleNotFound
+from api.recommender import load_artifact
+from api.serializers import movie_records
+from api.store import MovieStore
 
-# Load the preprocessed movie data
-df = pd.read_pickle('./data/cleaned/movies.pkl')
-df1 = df
+# Catalog columns used by the app
+COLUMNS = ['id', 'title', 'overview', 'popularity', 'vote_average', 'release_date_year', 'genres', 'cast', 'crew']
 
-# Extract movie titles and sort them
-movies = df['title'].astype(str).tolist()
-movies = sorted(movies)
+# Number of matches offered by the search boxes
+SEARCH_LIMIT = 20
 
-# Extract genres and sort them
-genres = df['genres'].astype(str).str.replace("[", "").str.replace("]", "").str.replace("'", "").str.replace(",", "").str.split(' ').tolist()
-genres = sorted(list(set([item for sublist in genres for item in sublist])))
+# Fields of the movies listed for a director or an actor
+PERSON_FIELDS = 'title,release_year,overview,cast,crew'
 
-# Extract cast members and sort them
-cast = df['cast'].astype(str).str.replace("[", "").str.replace("]", "").str.replace("'", "").str.split(', ').tolist()
-cast = sorted(list(set([item for sublist in cast for item in sublist])))
+# Fields of the movie details, in output order
+MOVIE_FIELDS = ('title', 'release_year', 'overview', 'popularity', 'cast', 'crew')
 
-# Extract crew members and sort them
-crew = df['crew'].astype(str).str.split(', ').replace("[", "").replace("]", "").replace("'", "").replace('"', "")
-crew = sorted(list(set([item for sublist in crew for item in sublist])))
+# Remote mode: with MOVIE_MENTOR_API_URL set, every query goes to the API, and this process
+# holds neither the catalog nor the model. Results are then only cached for API_CACHE_TTL seconds.
+REMOTE = bool(config.API_URL)
+CACHE_TTL = config.API_CACHE_TTL if REMOTE else None
 
-# Prepare the dataframe with relevant features for recommendation
-df = df[['title', 'belongs_to_collection', 'original_language', 'genres', 'overview', 'popularity', 'production_companies', 'production_countries', 'release_date', 'cast', 'crew']]
+# Streamlit re-executes this script on every widget interaction. The catalog, the option lists and
+# the model (or the API client) are therefore loaded by the `st.cache_resource` functions below: they
+# run once per process, and every rerun and every session shares the objects they return.
 
-# Combine features into a single column for TF-IDF vectorization
-df.loc[:, 'features'] = df.apply(lambda x: ' '.join(x.values.astype(str)), axis=1)
+@st.cache_resource
+def load_client():
+    '''
+    Function to create the pooled, caching client of the API used in remote mode.
+
+    Returns:
+        MovieMentorClient: The client, shared by every session.
+
+    '''
+    return MovieMentorClient(
+        config.API_URL,
+        connect_timeout=config.API_CONNECT_TIMEOUT,
+        read_timeout=config.API_READ_TIMEOUT,
+        pool_size=config.API_POOL_SIZE,
+        retries=config.API_RETRIES,
+        cache_size=config.API_CACHE_SIZE,
+        cache_ttl=config.API_CACHE_TTL,
+    )
+
+@st.cache_resource
+def load_store():
+    '''
+    Function to load the preprocessed movie data.
+
+    Returns:
+        MovieStore: The memory-mapped catalog, shared by every session.
+
+    '''
+    return MovieStore.load(config.CATALOG_PATH, columns=COLUMNS)
+
+@st.cache_resource
+def load_model():
+    '''
+    Function to load the TF-IDF matrix and neighbor table fitted offline by cleaning/build_model.py.
+
+    Returns:
+        Model: The artifact matching the catalog version, shared by every session.
+
+    '''
+    store = load_store()
+    return load_artifact(config.MODEL_DIR, store.version, len(store))
 
-# Apply TF-IDF vectorization to the combined features
-tfidf = TfidfVectorizer(stop_words='english')
-tfidf_matrix = tfidf.fit_transform(df['features'])
+@st.cache_data(ttl=CACHE_TTL)
+def search(query: str, kind: str, limit: int = SEARCH_LIMIT):
+    '''
+    Function to autocomplete a movie title, a person or a genre.
+
+    Args:
+        query (str): The typed text, matched against the start of any word of a name.
+        kind (str): What to search: 'title', 'actor', 'director' or 'genre'.
+        limit (int): The maximum number of matches.
+
+    Returns:
+        list: The distinct matching names, most popular first.
+
+    '''
+    if REMOTE:
+        result = load_client().search(query, kind, limit)
+    else:
+        result = load_store().search_index().search(query, limit, [kind])
+
+    # Titles shared by several movies are offered once
+    field = "title" if kind == "title" else "name"
+    return list(dict.fromkeys(match[field] for match in result[kind + "s"]))
+
+def search_box(label: str, kind: str, default: str = ""):
+    '''
+    Function to display an incremental search: a text input narrowing a select box to the best matches,
+    so the browser only receives a handful of options instead of the whole catalog.
+
+    Args:
+        label (str): The label of the select box.
+        kind (str): What to search: 'title', 'actor' or 'director'.
+        default (str): The initial text of the search input.
+
+    Returns:
+        str: The selected name, or None if nothing matches the query.
+
+    '''
+    query = st.text_input("Type to search:", value=default, key=label + " query")
+    matches = search(query, kind)
+    if not matches:
+        st.write("No match, check the spelling.")
+        return None
 
-# Build the K-Nearest Neighbors model for recommendation
-knn = NearestNeighbors(metric='cosine', algorithm='brute')
-knn.fit(tfidf_matrix)
+    # Preselect the exact match of the query, when there is one
+    index = matches.index(query) if query in matches else 0
+    return st.selectbox(label, matches, index=index, key=label)
+
+def resolve_title(title: str):
+    '''
+    Function to resolve a title to its catalog row, as the API routes do.
+
+    Args:
+        title (str): The movie title.
+
+    Returns:
+        tuple: The row position, or None, and the error body the API returns for this title, or None.
+
+    '''
+    try:
+        return load_store().title_index().resolve(title), None
+    except TitleNotFound as exc:
+        return None, {"detail": str(exc)}
+    except AmbiguousTitle as exc:
+        # Duplicate titles return the candidates, like the API's 300 response
+        return None, {"detail": str(exc), "matches": exc.matches}
 
 def main():
     '''
@@ -58,12 +156,11 @@ def main():
     st.write("Say goodbye to decision fatigue and let our advanced algorithms do the work for you. Our powerful recommendation engine, fueled by machine learning, will suggest the perfect movies tailored to your unique tastes.")
 
     # Get user input for the favorite movie and the number of recommendations
-    default_movie_index = movies.index("Star Wars")
-    user_input = st.selectbox("Select your favourite movie:", movies, index=default_movie_index)
+    user_input = search_box("Select your favourite movie:", "title", "Star Wars")
     num_recommendations = st.selectbox("Select the number of recommended movies:", [5, 10, 20, 50], index=0)
 
     # Retrieve movie recommendations based on user input
-    if st.button("Get Recommendations"):
+    if st.button("Get Recommendations") and user_input:
         recommendations = get_movie_recommendations(user_input, num_recommendations)
         st.write("Recommendations:")
         st.json(recommendations)
@@ -71,11 +168,10 @@ def main():
     # Get user input for a recommended movie to get detailed information
     st.subheader("Acquire the details about the recommended movie...")
     st.write("Please select one of the recommended movies to get all the juicy details about it, my distinguished friend!")
-    default_movie_index = movies.index("The Empire Strikes Back")
-    user_input = st.selectbox("Select the recommended movie:", movies, index=default_movie_index)
+    user_input = search_box("Select the recommended movie:", "title", "The Empire Strikes Back")
 
     # Retrieve detailed information about the selected movie
-    if st.button("Get Movie"):
+    if st.button("Get Movie") and user_input:
         recommendations = get_movie(user_input)
         st.write("Details:")
         st.json(recommendations)
@@ -83,7 +179,7 @@ def main():
     # Get popular movies from a selected genre
     st.subheader("Perhaps you're in pursuit of popular movies sorted by genre...")
     st.write("Choose the genre you're looking for and receive a curated list of popular movies from that genre.")
-    user_input = st.selectbox("Select the Genre:", genres)
+    user_input = st.selectbox("Select the Genre:", sorted(search("", "genre", 50)))
     num_recommendations = st.selectbox("Select the number of recommended movies:", [10, 25, 50, 100, 500], index=0)
 
     if st.button("Get the movies"):
@@ -97,82 +193,92 @@ def main():
     user_input = st.selectbox("Select Director or Actor:", director_actor)
 
     if user_input == 'director':
-        default_movie_index = crew.index("'George Lucas'")
-        user_director = st.selectbox("Select the director:", crew, index=default_movie_index)
+        user_director = search_box("Select the director:", "director", "George Lucas")
         
-        if st.button("Get the director"):
+        if st.button("Get the director") and user_director:
             recommendations = get_director(user_director)
             st.write("Director:")
             st.json(recommendations)
 
     elif user_input == 'actor':
-        default_movie_index = cast.index("Mark Hamill")
-        user_director = st.selectbox("Select the actor:", cast, index=default_movie_index)
+        user_director = search_box("Select the actor:", "actor", "Mark Hamill")
         
-        if st.button("Get the actor"):
+        if st.button("Get the actor") and user_director:
             recommendations = get_actor(user_director)
             st.write("Actor:")
             st.json(recommendations)
 
-@st.cache_data
-def get_movie_recommendations(title, num, knn_model=knn, data=df):
+@st.cache_data(ttl=CACHE_TTL)
+def get_movie_recommendations(title, num):
     '''
     Function to retrieve movie recommendations based on user input.
     
     Args:
         title (str): The title of the user's favorite movie.
         num (int): The number of recommendations to retrieve.
-        knn_model (NearestNeighbors): The pre-trained KNN model for recommendation.
-        data (DataFrame): The preprocessed movie data.
 
     Returns:
         dict: A dictionary containing the movie recommendations.
 
     '''
-
-    # Find the index of the user's favorite movie
-    idx = data[data['title'] == title].index[0]
-
-    # Perform KNN search to get similar movies
-    distances, indices = knn_model.kneighbors(tfidf_matrix[idx], n_neighbors=num+1)
-    movie_indices = indices.flatten()[1:]
+    if REMOTE:
+        # Ask the batch endpoint, which resolves the title and queries the model in one call
+        try:
+            result = load_client().recommendations([title], num)
+        except APIError as exc:
+            return exc.body
+        if not result["results"]:
+            return result
+        return {"recommendations": result["results"][0]["recommendations"]}
+
+    store = load_store()
+
+    # Find the index of the user's favorite movie, reporting unknown and duplicate titles
+    idx, error = resolve_title(title)
+    if error:
+        return error
+
+    # Read its nearest neighbors from the precomputed table, or query the KNN model for deeper lists
+    indices, similarities = load_model().nearest(idx, num)
 
     # Retrieve the recommended movies
-    movies = data['title'].iloc[movie_indices].tolist()
+    movies = store.values('title', indices[0])
     data = {
         "recommendations": movies
     }
 
     return data
 
-@st.cache_data
-def movies_by_genre(genre: str, num: int, data=df):
+@st.cache_data(ttl=CACHE_TTL)
+def movies_by_genre(genre: str, num: int):
     '''
     Function to retrieve popular movies of a specific genre.
 
     Args:
         genre (str): The genre of movies to retrieve.
         num (int): The number of movies to recommend.
-        data (DataFrame): The preprocessed movie data.
 
     Returns:
         dict: A dictionary containing the recommended movies.
 
     '''
+    if REMOTE:
+        try:
+            return {"title": load_client().movies_by_genre(genre, limit=num)["title"]}
+        except APIError as exc:
+            return exc.body
 
-    # Filter movies by the specified genre
-    df1 = df[df['genres'].notna() & df['genres'].str.contains(genre, case=False)]
-
-    # Sort movies by popularity and select the desired number of movies
-    df1 = df1.sort_values(by='popularity', ascending=False)
-    df1 = df1.head(num)
+    # Get the popular movies of the genre ranked as the API ranks them: a vote average
+    # greater than 5, best vote average (then popularity) first
+    store = load_store()
+    positions = store.genre_index().popular([genre])[:num]
 
     data = {
-        "title": df1['title'].tolist()
+        "title": store.values('title', positions)
     }
     return data
 
-@st.cache_data
+@st.cache_data(ttl=CACHE_TTL)
 def get_movie(title: str):
     '''
     Function to retrieve detailed information about a movie.
@@ -185,20 +291,38 @@ def get_movie(title: str):
         
     '''
 
-    # Filter the DataFrame to get the movie details
-    df1 = df[df['title'] == title]
-    
-    data = {
-        "title": title,
-        "release_year": pd.to_datetime(df1['release_date'].tolist()[0]).year,
-        "overview": df1['overview'].tolist()[0],
-        "popularity": df1['popularity'].tolist()[0],
-        "cast": df1['cast'].tolist()[0].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", "),
-        "crew": df1['crew'].tolist()[0].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", ")
-    }
-    return data
+    if REMOTE:
+        try:
+            return load_client().movie(title)
+        except APIError as exc:
+            return exc.body
+
+    # Get the movie details, reporting unknown and duplicate titles
+    position, error = resolve_title(title)
+    if error:
+        return error
 
-@st.cache_data
+    return movie_records(load_store(), [position], MOVIE_FIELDS)[0]
+
+def get_person(column: str, name: str) -> list:
+    '''
+    Function to list the movies crediting a person.
+
+    Args:
+        column (str): The person column, 'cast' or 'crew'.
+        name (str): The person's name.
+
+    Returns:
+        list: One dictionary of details per movie, in catalog order.
+
+    '''
+
+    # Get the movies crediting the person from the inverted person index, and build their
+    # records column by column, as the API's person endpoints do
+    store = load_store()
+    return movie_records(store, store.person_index(column).lookup(name), PERSON_FIELDS.split(','))
+
+@st.cache_data(ttl=CACHE_TTL)
 def get_director(director: str):
     '''
     Function to retrieve information about a director and their movies.
@@ -210,33 +334,22 @@ def get_director(director: str):
         dict: A dictionary containing the director's information and movies.
         
     '''
+    if REMOTE:
+        try:
+            return load_client().director(director, fields=PERSON_FIELDS)
+        except APIError as exc:
+            return exc.body
 
-    # Filter the DataFrame to get movies directed by the specified director
-    df1 = df[df['crew'].notna() & df['crew'].str.contains(director)]
-    
-    movies = []
-    
-    for _, row in df1.iterrows():
-        # Create a movie dictionary with details
-        movie = {
-            "title": row['title'],
-            "release_year": pd.to_datetime(row['release_date']).year,
-            "overview": row['overview'],
-            "cast": row['cast'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", "),
-            "crew": row['crew'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", ")
-        }
-        movies.append(movie)
-    
-    movies_count = df1.shape[0]
+    movies = get_person('crew', director)
     
     data = {
         "name": director,
-        "total movies": movies_count,
+        "total movies": len(movies),
         "movies": movies
     }
     return data
 
-@st.cache_data
+@st.cache_data(ttl=CACHE_TTL)
 def get_actor(actor: str):
     '''
     Function to retrieve information about an actor and their movies.
@@ -248,27 +361,17 @@ def get_actor(actor: str):
         dict: A dictionary containing the actor's information and movies.
         
     '''
+    if REMOTE:
+        try:
+            return load_client().actor(actor, fields=PERSON_FIELDS)
+        except APIError as exc:
+            return exc.body
 
-    # Filter the DataFrame to get movies featuring the specified actor
-    df1 = df[df['cast'].notna() & df['cast'].str.contains(actor)]
-    
-    movies_count = df1.shape[0]
-    
-    movies = []
-    for _, row in df1.iterrows():
-        # Create a movie dictionary with details    
-        movie = {
-            "title": row['title'],
-            "release_year": pd.to_datetime(row['release_date']).year,
-            "overview": row['overview'],
-            "cast": row['cast'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", "),
-            "crew": row['crew'].replace("'", "").replace('"', "").replace("[", "").replace("]", "").split(", ")
-        }
-        movies.append(movie)
+    movies = get_person('cast', actor)
     
     data = {
         "name": actor,
-        "total movies": movies_count,
+        "total movies": len(movies),
         "movies": movies
     }
     return data
@@ -0,0 +1,173 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+import api.store
+from api import config
+from api.recommender import fit, row_fingerprints, save_artifact
+from api.schema import CATALOG_SCHEMA
+from api.store import MovieStore, build_indexes, write_arrow
+
+# id, title, release date, genres, cast, crew, popularity, vote average, budget, revenue
+MOVIES = [
+    (1, 'Star Wars', '1977-05-25', ['Adventure', 'Science Fiction'], ['Mark Hamill', 'Harrison Ford', 'Carrie Fisher'], ['George Lucas'], 50.0, 8.1, 11000000.0, 775398007.0),
+    (2, 'The Empire Strikes Back', '1980-05-20', ['Adventure', 'Science Fiction'], ['Mark Hamill', 'Harrison Ford', 'Carrie Fisher'], ['Irvin Kershner'], 40.0, 8.2, 18000000.0, 538400000.0),
+    (3, 'Return of the Jedi', '1983-05-25', ['Adventure', 'Science Fiction'], ['Mark Hamill', 'Harrison Ford'], ['Richard Marquand'], 30.0, 7.9, 32500000.0, 475106177.0),
+    (4, 'Solaris', '1972-03-20', ['Drama', 'Science Fiction'], ['Natalya Bondarchuk'], ['Andrei Tarkovsky'], 10.0, 7.7, None, None),
+    (5, 'Solaris', '2002-11-27', ['Drama', 'Science Fiction'], ['George Clooney'], ['Steven Soderbergh'], 12.0, 6.2, 47000000.0, 30002758.0),
+    (6, 'Raiders of the Lost Ark', '1981-06-12', ['Adventure', 'Action'], ['Harrison Ford'], ['Steven Spielberg'], 45.0, 7.7, 18000000.0, 389925971.0),
+    (7, 'Amélie', '2001-04-25', ['Comedy', 'Romance'], ['Audrey Tautou'], ['Jean-Pierre Jeunet'], 20.0, 7.8, 10000000.0, 173921954.0),
+    (8, 'Plan 9 from Outer Space', '1957-07-22', ['Science Fiction', 'Horror'], ['Bela Lugosi'], ['Ed Wood'], 3.0, 3.2, 60000.0, None),
+]
+
+
+def catalog() -> pd.DataFrame:
+    # Every other column of the schema is left null
+    df = pa.Table.from_pydict({field.name: pa.nulls(len(MOVIES), field.type) for field in CATALOG_SCHEMA}).to_pandas()
+    columns = ['id', 'title', 'release_date', 'genres', 'cast', 'crew', 'popularity', 'vote_average', 'budget', 'revenue']
+    for column, values in zip(columns, zip(*MOVIES)):
+        df[column] = list(values)
+    df['release_date'] = pd.to_datetime(df['release_date'])
+    df['release_date_year'] = df['release_date'].dt.year
+    df['overview'] = [f'{title} overview' for title in df['title']]
+    # Plan 9 has too few votes to be reported by /title_votes
+    df['vote_count'] = [100.0 if title == 'Plan 9 from Outer Space' else 5000.0 for title in df['title']]
+    df['ROI'] = df['revenue'] / df['budget']
+    return df
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    # Build the catalog, its indexes and its model as the pipeline does
+    root = tmp_path_factory.mktemp('api')
+    path = str(root / 'movies.arrow')
+    write_arrow(catalog(), path)
+    build_indexes(path)
+    store = MovieStore.load(path)
+    vectorizer, matrix = fit(store.df)
+    save_artifact(str(root / 'model'), store.version, vectorizer, matrix, *row_fingerprints(store.df))
+
+    # The routes load the shared store and the model when the app is imported
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(config, 'CATALOG_PATH', path)
+        monkeypatch.setattr(config, 'MODEL_DIR', str(root / 'model'))
+        monkeypatch.setattr(config, 'CACHE_MAX_BYTES', 0)
+        monkeypatch.setattr(api.store, '_store', None)
+        from api.app import app
+        yield TestClient(app)
+
+
+def test_titles_resolve_to_one_movie(client):
+    response = client.get('/api/v1/title_score/Star Wars')
+    assert response.status_code == 200
+    assert response.json() == {"title": 'Star Wars', "year": 1977, "vote average": 8.1}
+
+    # Unknown titles are not found, and case is only ignored on request
+    assert client.get('/api/v1/title_score/Dune').status_code == 404
+    assert client.get('/api/v1/movie/star wars').status_code == 404
+    assert client.get('/api/v1/movie/AMELIE', params={'insensitive': 'true'}).json()['title'] == 'Amélie'
+
+
+def test_shared_titles_need_a_year(client):
+    response = client.get('/api/v1/title_votes/Solaris')
+    assert response.status_code == 300
+    assert response.json()['matches'] == [
+        {"title": 'Solaris', "year": 1972, "id": 4},
+        {"title": 'Solaris', "year": 2002, "id": 5},
+    ]
+
+    response = client.get('/api/v1/title_votes/Solaris', params={'year': 2002})
+    assert response.status_code == 200
+    assert response.json()['vote average'] == 6.2
+    assert client.get('/api/v1/title_votes/Solaris', params={'year': 1990}).status_code == 404
+    assert client.get('/api/v1/title_votes/Plan 9 from Outer Space').status_code == 404
+
+
+def test_person_payloads_are_paged_and_projected(client):
+    response = client.get('/api/v1/actor/harrison ford', params={'limit': 2, 'offset': 1, 'fields': 'title,release_year'})
+    assert response.status_code == 200
+    data = response.json()
+
+    # The totals cover every movie of the actor, not only the page
+    assert data['total movies'] == 4
+    assert data['total revenue'] == 775398007 + 538400000 + 475106177 + 389925971
+    assert data['movies'] == [
+        {"title": 'The Empire Strikes Back', "release_year": 1980},
+        {"title": 'Return of the Jedi', "release_year": 1983},
+    ]
+
+    response = client.get('/api/v1/director/Ed Wood', params={'fields': 'title,year'})
+    assert response.status_code == 400
+    assert response.json()['fields'] == ['year']
+
+
+def test_genre_payloads_are_paged_and_projected(client):
+    response = client.get('/api/v1/movies_by_genre/science fiction', params={'limit': 2, 'offset': 1})
+    assert response.json() == {"title": ['Star Wars', 'Return of the Jedi'], "total": 5}
+
+    response = client.get('/api/v1/movies_by_genre/Adventure', params={'limit': 1, 'fields': 'title,cast'})
+    assert response.json() == {
+        "movies": [{"title": 'The Empire Strikes Back', "cast": ['Mark Hamill', 'Harrison Ford', 'Carrie Fisher']}],
+        "total": 4,
+    }
+
+
+def test_batch_recommendations_match_the_single_ones(client):
+    response = client.post('/api/v1/recommendations/batch', json={
+        "titles": ['Star Wars', 'return of the jedi', 'Solaris', 'Dune'],
+        "num": 3,
+        "merge": True,
+        "insensitive": True,
+    })
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data['not_found'] == ['Dune']
+    assert [match['year'] for match in data['ambiguous'][0]['matches']] == [1972, 2002]
+    for result in data['results']:
+        single = client.get(f"/api/v1/recommendations/3/{result['title']}", params={'insensitive': 'true'})
+        assert result['recommendations'] == single.json()['recommendations']
+
+    # The merged list leaves the seeds out
+    merged = [movie['title'] for movie in data['merged']]
+    assert len(merged) == 3 and not {'Star Wars', 'Return of the Jedi'} & set(merged)
+
+    assert client.post('/api/v1/recommendations/batch', json={"titles": []}).status_code == 422
+
+
+def test_search_completes_every_kind(client):
+    response = client.get('/api/v1/search', params={'q': 'so'})
+    assert response.status_code == 200
+    data = response.json()
+
+    # Titles are ranked by popularity, the other kinds by the summed popularity of their movies
+    assert data['query'] == 'so'
+    assert [(title['title'], title['year']) for title in data['titles']] == [('Solaris', 2002), ('Solaris', 1972)]
+    assert data['directors'] == [{"name": 'Steven Soderbergh', "movies": 1}]
+    assert data['actors'] == [] and data['genres'] == []
+
+    # Any word of a name matches, ignoring case and accents
+    data = client.get('/api/v1/search', params={'q': 'FICT', 'kind': 'genre,actor'}).json()
+    assert data == {"query": 'FICT', "actors": [], "genres": [{"name": 'Science Fiction', "movies": 6}]}
+    assert client.get('/api/v1/search', params={'q': 'ame', 'kind': 'title', 'limit': 1}).json()['titles'][0]['title'] == 'Amélie'
+
+    assert client.get('/api/v1/search', params={'kind': 'studio'}).status_code == 422
+
+
+def test_movie_payload_lists_the_names(client):
+    response = client.get('/api/v1/movie/Return of the Jedi')
+    assert response.status_code == 200
+    assert response.json() == {
+        "title": 'Return of the Jedi',
+        "release_year": 1983,
+        "overview": 'Return of the Jedi overview',
+        "popularity": 30.0,
+        "vote average": 7.9,
+        "vote count": 5000.0,
+        "budget": 32500000.0,
+        "revenue": 475106177.0,
+        "ROI": 475106177.0 / 32500000.0,
+        "cast": ['Mark Hamill', 'Harrison Ford'],
+        "crew": ['Richard Marquand'],
+    }
@@ -0,0 +1,60 @@
+import time
+
+from api.cache import CachedResponse, ResponseCache, SQLiteBackend, etag_matches
+
+
+def entry(expires: float) -> CachedResponse:
+    return CachedResponse(b'{}', 'application/json', '"etag"', expires)
+
+
+def test_purge_removes_expired_rows(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite3'))
+    backend.put('expired', entry(time.time() - 1))
+    backend.put('live', entry(time.time() + 60))
+    assert len(backend) == 2
+
+    backend.purge()
+
+    assert len(backend) == 1
+    assert backend.get('live') is not None
+
+
+def test_puts_purge_periodically(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite3'), purge_every=3)
+    for number in range(5):
+        backend.put(f'expired {number}', entry(time.time() - 1))
+
+    # The third put purged the first three rows
+    assert len(backend) == 2
+
+
+def test_purge_caps_rows_keeping_the_latest_expiries(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite3'), max_rows=2)
+    for number in range(4):
+        backend.put(f'key {number}', entry(time.time() + 60 + number))
+
+    backend.purge()
+
+    assert len(backend) == 2
+    assert backend.get('key 0') is None
+    assert backend.get('key 3') is not None
+
+
+def test_opening_purges_rows_left_by_previous_processes(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = ResponseCache(1024, ttl=-1, backend=SQLiteBackend(path))
+    cache.put('stale', b'{}', 'application/json')
+    assert len(cache.backend) == 1
+
+    assert len(SQLiteBackend(path)) == 0
+
+
+def test_etags_are_weak_and_compared_weakly():
+    cache = ResponseCache(1024, ttl=60)
+    entry = cache.put('key', b'{}', 'application/json')
+
+    # Compressed and identity bodies share the ETag, so it must not claim byte equality
+    assert entry.etag.startswith('W/"')
+    assert etag_matches(entry.etag, entry.etag)
+    assert etag_matches(entry.etag.removeprefix('W/'), entry.etag)
+    assert not etag_matches('W/"other"', entry.etag)
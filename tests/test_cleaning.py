@@ -0,0 +1,139 @@
+import csv
+import math
+import os
+import subprocess
+import sys
+
+import pytest
+
+from api.store import MovieStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MOVIE_COLUMNS = [
+    'adult', 'belongs_to_collection', 'budget', 'genres', 'homepage', 'id', 'imdb_id', 'original_language',
+    'original_title', 'overview', 'popularity', 'poster_path', 'production_companies', 'production_countries',
+    'release_date', 'revenue', 'runtime', 'spoken_languages', 'status', 'tagline', 'title', 'video',
+    'vote_average', 'vote_count',
+]
+
+
+def names(*values) -> str:
+    # The raw JSON-like notation of a list of named objects
+    return str([{'id': number, 'name': value} for number, value in enumerate(values)])
+
+
+def movie(id: int, title: str, budget: str, revenue: str, release_date: str = '1977-05-25') -> dict:
+    row = dict.fromkeys(MOVIE_COLUMNS, '')
+    row.update(
+        id=str(id), title=title, original_title=title, budget=budget, revenue=revenue, release_date=release_date,
+        genres=names('Adventure', 'Science Fiction'), production_companies=names('Lucasfilm'),
+        original_language='en', overview=f'{title} overview', popularity=str(id), status='Released',
+        vote_average='7.5', vote_count='100', runtime='120', adult='False', video='False',
+    )
+    return row
+
+
+MOVIES = [
+    movie(1, 'Star Wars', '11000000', '775398007'),
+    movie(2, 'The Empire Strikes Back', '18000000', '', '1980-05-20'),
+    movie(3, 'Return of the Jedi', '', '475106177', '1983-05-25'),
+    movie(4, 'Undated', '1', '1', ''),
+]
+
+CREDITS = [
+    {'id': '1', 'cast': names('Mark Hamill', 'Carrie Fisher'), 'crew': names('George Lucas')},
+    {'id': '2', 'cast': names('Mark Hamill'), 'crew': names('Irvin Kershner')},
+    {'id': '3', 'cast': names('Mark Hamill', 'Carrie Fisher'), 'crew': names('Richard Marquand')},
+    {'id': '4', 'cast': names('Nobody'), 'crew': names('Nobody')},
+]
+
+
+def write_raw(root, movies=MOVIES, credits=CREDITS):
+    # The raw files, laid out as the cleaning scripts expect them relative to "cleaning/"
+    raw = os.path.join(root, 'data', 'not cleaned')
+    os.makedirs(raw, exist_ok=True)
+    os.makedirs(os.path.join(root, 'data', 'cleaned'), exist_ok=True)
+    os.makedirs(os.path.join(root, 'cleaning'), exist_ok=True)
+    with open(os.path.join(raw, 'movies_dataset.csv'), 'w', newline='') as file:
+        writer = csv.DictWriter(file, MOVIE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(movies)
+    for number in range(3):
+        with open(os.path.join(raw, f'credits{number + 1}.csv'), 'w', newline='') as file:
+            writer = csv.DictWriter(file, ['cast', 'crew', 'id'])
+            writer.writeheader()
+            writer.writerows(credits[number::3])
+
+
+def run(root, script, *args) -> str:
+    process = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'cleaning', script), *args],
+        cwd=os.path.join(root, 'cleaning'), check=True, capture_output=True, text=True,
+    )
+    return process.stdout
+
+
+def cleaned(root) -> tuple:
+    # The contents of the files written by data_cleaning.py
+    files = [os.path.join(root, 'data', 'cleaned', name) for name in ('movies.csv', 'movies.parquet')]
+    return tuple(open(path, 'rb').read() for path in files)
+
+
+@pytest.fixture(scope='module')
+def catalog(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp('pipeline'))
+    write_raw(root)
+    run(root, 'data_cleaning.py')
+    run(root, 'data_pickle.py')
+    return MovieStore.load(os.path.join(root, 'data', 'cleaned', 'movies.arrow'))
+
+
+def test_unknown_revenue_and_budget_stay_unknown(catalog):
+    titles = catalog.column('title').tolist()
+    empire = titles.index('The Empire Strikes Back')
+    jedi = titles.index('Return of the Jedi')
+
+    # Served as 0, but recorded as missing, and no ROI is made up for them
+    assert catalog.column('revenue')[empire] == 0
+    assert not catalog.known('revenue')[empire]
+    assert not catalog.known('budget')[jedi]
+    assert not catalog.known('ROI')[empire] and not catalog.known('ROI')[jedi]
+
+    assert catalog.person_mean('cast', 'revenue', 'Mark Hamill') == (775398007 + 475106177) / 2
+    assert catalog.person_mean('cast', 'ROI', 'Mark Hamill') == 775398007 / 11000000
+    assert math.isnan(catalog.person_mean('crew', 'revenue', 'Irvin Kershner'))
+
+
+def test_incremental_cleaning_writes_the_same_files(tmp_path):
+    full = str(tmp_path / 'full')
+    incremental = str(tmp_path / 'incremental')
+    write_raw(incremental)
+    run(incremental, 'data_cleaning.py')
+
+    # Change a movie and add another one after the first run
+    movies = [movie(2, 'The Empire Strikes Back', '18000000', '538400000', '1980-05-20') if row['id'] == '2' else row for row in MOVIES]
+    movies.append(movie(5, 'Raiders of the Lost Ark', '18000000', '389925971', '1981-06-12'))
+    credits = CREDITS + [{'id': '5', 'cast': names('Harrison Ford'), 'crew': names('Steven Spielberg')}]
+    write_raw(full, movies, credits)
+    write_raw(incremental, movies, credits)
+
+    run(full, 'data_cleaning.py')
+    output = run(incremental, 'data_cleaning.py', '--incremental')
+
+    # Only the new and changed rows were extracted again
+    assert 'Extracted 2 of 5 movie rows and 1 of 5 credit rows' in output
+    assert cleaned(incremental) == cleaned(full)
+
+
+def test_parallel_cleaning_writes_the_same_files(tmp_path):
+    serial = str(tmp_path / 'serial')
+    parallel = str(tmp_path / 'parallel')
+    write_raw(serial)
+    write_raw(parallel)
+
+    # Small chunks, so that the pool extracts several of them
+    run(serial, 'data_cleaning.py', '--chunksize', '2')
+    run(parallel, 'data_cleaning.py', '--chunksize', '2', '--jobs', '2')
+
+    assert cleaned(parallel) == cleaned(serial)
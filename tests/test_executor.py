@@ -0,0 +1,25 @@
+import asyncio
+import time
+
+import pytest
+
+from api.executor import BoundedExecutor, Overloaded
+
+
+def test_cancelled_request_keeps_its_slot_until_the_job_ends():
+    async def scenario():
+        executor = BoundedExecutor(workers=1, queue=0)
+        request = asyncio.create_task(executor.run(time.sleep, 0.3))
+        await asyncio.sleep(0.05)
+
+        # A client disconnect cancels the request, but the job still occupies the worker
+        request.cancel()
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await executor.run(time.sleep, 0)
+
+        await asyncio.sleep(0.35)
+        await executor.run(time.sleep, 0)
+        assert executor.stats()["pending"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+import numpy as np
+
+from api.indexes import GenreIndex, PersonIndex
+
+
+def test_person_index_matches_normalized_names():
+    index = PersonIndex([['Zoë Saldaña', 'Sam Worthington'], ['Sam  worthington', 'Sam Worthington'], [], ['Samuel L. Jackson']])
+
+    # Accents, case and repeated whitespace are ignored, and a person credited twice on a movie counts once
+    assert index.lookup('zoe saldana').tolist() == [0]
+    assert index.search('SAM WORTHINGTON').tolist() == [0, 1]
+    assert index.names([index.slot('zoe saldana')]) == ['Zoë Saldaña']
+    assert 'Nobody' not in index and index.lookup('Nobody').tolist() == []
+
+    assert index.search('sam', 'prefix').tolist() == [0, 1, 3]
+    assert index.search('Samuel L Jackson', 'fuzzy').tolist() == [3]
+    assert index.search('Quentin', 'fuzzy').tolist() == []
+
+
+def test_genre_index_intersects_and_unites_genres():
+    genres = [['Drama'], ['Drama', 'Comedy'], ['Comedy'], ['Horror'], []]
+    index = GenreIndex(genres, vote_average=np.array([6.0, 8.0, 7.0, 9.0, 5.0]), popularity=np.ones(5))
+
+    assert index.genres() == ['Comedy', 'Drama', 'Horror']
+    assert index.search(['DRAMA']).tolist() == [1, 0]
+    assert index.search(['Drama', 'Comedy']).tolist() == [1]
+    assert index.search(['Drama', 'Comedy'], 'or').tolist() == [1, 2, 0]
+    assert index.search(['Drama', 'Comedy', 'Horror'], 'or', min_vote_average=6.5).tolist() == [3, 1, 2]
+
+    # Every genre must be known when they are intersected
+    assert index.search(['Drama', 'Western']).tolist() == []
+    assert index.search(['Drama', 'Western'], 'or').tolist() == [1, 0]
+
+
+def test_popular_keeps_the_movies_voted_above_5_best_first():
+    genres = [['Drama'], ['Drama', 'Comedy'], ['Drama'], ['Comedy']]
+    index = GenreIndex(genres, vote_average=np.array([7.0, 5.0, 8.0, 6.0]), popularity=np.array([1.0, 9.0, 2.0, 3.0]))
+
+    # The vote threshold applies even though the second movie is the most popular
+    assert index.popular(['drama']).tolist() == [2, 0]
+    assert index.popular(['Drama', 'Comedy'], 'or').tolist() == [2, 0, 3]
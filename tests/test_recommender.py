@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.recommender import (
+    ArtifactMismatch, build_features, fit, load_artifact, match_rows, row_fingerprints, save_artifact,
+    top_k_neighbors, update_matrix, update_neighbors,
+)
+
+
+def catalog() -> pd.DataFrame:
+    genres = [['Adventure', 'Science Fiction'], ['Drama'], ['Comedy', 'Romance'], ['Science Fiction', 'Horror']]
+    return pd.DataFrame({
+        'id': range(1, 13),
+        'title': [f'Movie {number}' for number in range(1, 13)],
+        'overview': [f'A story about {word} and {other}' for word, other in zip(
+            ['space', 'war', 'love', 'ghosts', 'robots', 'family'] * 2, ['rebels', 'kings', 'paris', 'ships'] * 3)],
+        'genres': [genres[number % 4] for number in range(12)],
+        'cast': [[f'Actor {number % 5}', f'Actor {number % 3 + 5}'] for number in range(12)],
+        'crew': [[f'Director {number % 4}'] for number in range(12)],
+        'release_date': pd.to_datetime([f'{1970 + 4 * number}-01-01' for number in range(12)]),
+    })
+
+
+def test_artifact_round_trip(tmp_path):
+    df = catalog()
+    vectorizer, matrix = fit(df)
+    save_artifact(str(tmp_path), 'v1', vectorizer, matrix, *row_fingerprints(df))
+
+    model = load_artifact(str(tmp_path), 'v1', len(df))
+    assert model.matrix.dtype == np.float32
+    assert (model.matrix != matrix).nnz == 0
+    np.testing.assert_allclose(model.vectorizer().transform(build_features(df)).toarray(), matrix.toarray(), rtol=1e-6)
+
+    # Artifacts of another catalog, or of a catalog with another number of rows, are refused
+    with pytest.raises(ArtifactMismatch):
+        load_artifact(str(tmp_path), 'v2')
+    with pytest.raises(ArtifactMismatch):
+        load_artifact(str(tmp_path), 'v1', len(df) + 1)
+
+
+def test_incremental_update_matches_a_full_recomputation(tmp_path):
+    old = catalog()
+    vectorizer, matrix = fit(old)
+    save_artifact(str(tmp_path), 'v1', vectorizer, matrix, *row_fingerprints(old))
+    model = load_artifact(str(tmp_path), 'v1')
+    neighbors, scores = top_k_neighbors(matrix, 4, jobs=1)
+
+    # Change one movie, remove another and add a new one
+    new = old.drop(index=3).reset_index(drop=True)
+    new.loc[5, 'overview'] = 'A story about robots and kings'
+    new.loc[len(new)] = [99, 'Movie 99', 'A story about space and ships', ['Drama'], ['Actor 1'], ['Director 2'], pd.Timestamp('2001-01-01')]
+
+    source = match_rows(*row_fingerprints(old), *row_fingerprints(new))
+    assert (source < 0).sum() == 2
+
+    updated = update_matrix(model, new, source)
+    np.testing.assert_allclose(updated.toarray(), vectorizer.transform(build_features(new)).toarray(), rtol=1e-6)
+
+    # The patched table holds the same similarities as a table computed from scratch, with neighbors
+    # that really have them (tied neighbors may come in another order), and never the row itself
+    patched_neighbors, patched_scores = update_neighbors(updated, source, neighbors, scores)
+    _, expected_scores = top_k_neighbors(updated, 4, jobs=1)
+    np.testing.assert_array_equal(patched_scores, expected_scores)
+    similarities = (updated @ updated.T).toarray()
+    for row in range(len(new)):
+        np.testing.assert_allclose(similarities[row, patched_neighbors[row]], expected_scores[row], atol=1e-3)
+        assert row not in patched_neighbors[row]
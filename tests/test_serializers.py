@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from api.serializers import PERSON_MOVIE_FIELDS, UnknownField, page, parse_fields
+
+
+def test_parse_fields_keeps_the_requested_order():
+    assert parse_fields(None) == PERSON_MOVIE_FIELDS
+    assert parse_fields('') == PERSON_MOVIE_FIELDS
+    assert parse_fields(' cast,title, cast ,') == ('cast', 'title')
+
+    with pytest.raises(UnknownField) as error:
+        parse_fields('title,year,plot')
+    assert error.value.fields == ['year', 'plot']
+
+
+def test_page_slices_the_matched_rows():
+    positions = np.arange(10, 20)
+    assert page(positions).tolist() == positions.tolist()
+    assert page(positions, 3, 2).tolist() == [12, 13, 14]
+    assert page(positions, offset=8).tolist() == [18, 19]
+    assert page(positions, 5, 12).tolist() == []
@@ -0,0 +1,93 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from api.schema import CATALOG_SCHEMA
+from api.store import MovieStore, build_indexes, write_arrow
+
+
+def catalog() -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': [1, 2, 3],
+        'title': ['A', 'B', 'C'],
+        'revenue': [100.0, np.nan, 50.0],
+        'ROI': [2.0, np.nan, np.nan],
+        'cast': ["['Mark Hamill']", "['Mark Hamill']", "['Mark Hamill', 'Carrie Fisher']"],
+    })
+
+
+def test_person_mean_skips_missing_values():
+    store = MovieStore(catalog())
+
+    # Missing values add nothing to the total, and are not counted in the averages
+    assert store.person_total('cast', 'revenue', 'Mark Hamill') == 150.0
+    assert store.person_mean('cast', 'revenue', 'Mark Hamill') == 75.0
+    assert store.person_mean('cast', 'ROI', 'Mark Hamill') == 2.0
+    assert math.isnan(store.person_mean('cast', 'ROI', 'Carrie Fisher'))
+
+    # Prefix matches sum the matched rows instead of the precomputed totals
+    assert store.person_mean('cast', 'revenue', 'mark', 'prefix') == 75.0
+
+
+def write_catalog(path: str):
+    # Every other column of the schema is left null
+    df = pa.Table.from_pydict({field.name: pa.nulls(3, field.type) for field in CATALOG_SCHEMA}).to_pandas()
+    for column, values in catalog().items():
+        df[column] = values
+    df['title'] = ['A New Hope', 'Élan', 'A New Hope']
+    df['release_date_year'] = [1977, 1980, 2024]
+    df['popularity'] = [3.0, 1.0, 2.0]
+    df['genres'] = [['Adventure'], ['Drama'], ['Adventure', 'Drama']]
+    df['cast'] = [['Mark Hamill'], ['Mark Hamill'], ['Mark Hamill', 'Carrie Fisher']]
+    df['crew'] = [['George Lucas'], [], ['George Lucas']]
+    write_arrow(df, path)
+
+
+def test_arrow_catalog_keeps_missing_values(tmp_path):
+    path = str(tmp_path / 'movies.arrow')
+    write_catalog(path)
+    store = MovieStore.load(path)
+
+    assert store.column('revenue').tolist() == [100.0, 0.0, 50.0]
+    assert store.person_mean('cast', 'revenue', 'Mark Hamill') == 75.0
+
+
+def test_persisted_indexes_answer_like_built_ones(tmp_path):
+    path = str(tmp_path / 'movies.arrow')
+    write_catalog(path)
+    built = MovieStore.load(path)
+    directory = build_indexes(path)
+    persisted = MovieStore.load(path)
+
+    assert os.path.exists(os.path.join(directory, 'metadata.json'))
+    assert isinstance(persisted.person_index('cast').lookup('mark hamill'), np.memmap)
+    for store in (built, persisted):
+        cast = store.person_index('cast')
+        assert cast.search('MARK hamill').tolist() == [0, 1, 2]
+        assert cast.search('car', 'prefix').tolist() == [2]
+        assert cast.search('Carie Fisher', 'fuzzy').tolist() == [2]
+        assert cast.names(cast.fuzzy_matches('Carie Fisher')) == ['Carrie Fisher']
+        assert 'george lucas' in store.person_index('crew') and 'nobody' not in store.person_index('crew')
+        assert store.person_mean('cast', 'revenue', 'Mark Hamill') == 75.0
+
+        titles = store.title_index()
+        assert titles.resolve('elan', insensitive=True) == 1
+        assert titles.resolve('A New Hope', year=2024) == 2
+        assert titles.lookup('a new hope').tolist() == []
+        assert titles.lookup('a new hope', insensitive=True).tolist() == [0, 2]
+
+        results = store.search_index().search('a', kinds=('title', 'actor', 'genre'))
+        assert results['titles'] == [
+            {"title": 'A New Hope', "year": 1977, "id": 1, "popularity": 3.0},
+            {"title": 'A New Hope', "year": 2024, "id": 3, "popularity": 2.0},
+        ]
+        assert results['actors'] == []
+        assert results['genres'] == [{"name": 'Adventure', "movies": 2}]
+        assert store.search_index().search('fish')['actors'] == [{"name": 'Carrie Fisher', "movies": 1}]
+
+        assert store.values('cast', [2, 1]) == [['Mark Hamill', 'Carrie Fisher'], ['Mark Hamill']]
+        assert store.values('crew', [1]) == [[]]
+        assert store.values('title', np.array([1])) == ['Élan']